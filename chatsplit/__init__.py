@@ -0,0 +1,27 @@
+"""chatsplit : moteur de découpe des fils ChatGPT, sans dépendance à Django ni à Qt
+
+Partagé par le site web (application ``filchat``), l'application de bureau
+et la ligne de commande de ``filchat-0.0``.
+"""
+
+from chatsplit.archive import iter_zip
+from chatsplit.conversations import iter_conversations
+from chatsplit.dialects import Dialect, detect_dialect, register_dialect
+from chatsplit.markdown import iter_markdown_entries, render_markdown
+from chatsplit.parser import iter_exchanges, parse_chat_file
+from chatsplit.writer import MarkdownWriter, TarMarkdownWriter, ZipMarkdownWriter
+
+__all__ = [
+    "Dialect",
+    "MarkdownWriter",
+    "TarMarkdownWriter",
+    "ZipMarkdownWriter",
+    "detect_dialect",
+    "iter_conversations",
+    "iter_exchanges",
+    "iter_markdown_entries",
+    "iter_zip",
+    "parse_chat_file",
+    "register_dialect",
+    "render_markdown",
+]
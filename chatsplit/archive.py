@@ -0,0 +1,130 @@
+"""Archives ZIP produites à la volée, sans fichier intermédiaire"""
+
+import io
+import os
+import shutil
+import zipfile
+import zlib
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from chatsplit.staging import replacing_file
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Sortie non positionnable : ZipFile y écrit, le générateur vide au fur et à mesure"""
+
+    def __init__(self):
+        super().__init__()
+        self._morceaux: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._morceaux.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return data
+
+
+def iter_zip(
+    entries: Iterable[Tuple[str, str]],
+    compression: int = zipfile.ZIP_DEFLATED,
+    compresslevel: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Produit les octets d'une archive ZIP contenant les couples (nom, contenu)
+
+    Chaque membre est émis dès qu'il est compressé : seul le membre en cours
+    est gardé en mémoire, et le premier octet part avant la fin du parsing.
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, "w", compression, compresslevel=compresslevel) as zipf:
+        for arcname, contenu in entries:
+            zipf.writestr(arcname, contenu)
+            data = buffer.pop()
+            if data:
+                yield data
+    # répertoire central
+    yield buffer.pop()
+
+
+def append_to_archive(
+    chemin_archive: str,
+    source_dir: str,
+    fichiers: Iterable[str],
+    compression: int = zipfile.ZIP_DEFLATED,
+):
+    """Ajoute des fichiers de `source_dir` à la fin d'une archive existante
+
+    Les membres déjà présents ne sont ni relus ni recompressés ; les noms
+    ajoutés ne doivent pas déjà figurer dans l'archive. L'archive est copiée
+    telle quelle sous un nom temporaire, complétée, puis mise à sa place :
+    une interruption laisse l'archive d'origine intacte.
+    """
+    with replacing_file(chemin_archive) as temporaire:
+        shutil.copyfile(chemin_archive, temporaire)
+        with zipfile.ZipFile(temporaire, "a", compression) as zipf:
+            for chemin_fichier in fichiers:
+                arcname = os.path.relpath(chemin_fichier, source_dir)
+                zipf.write(chemin_fichier, arcname)
+
+
+def parallel_supported(zipf: zipfile.ZipFile) -> bool:
+    """Vrai si `compress_member` et `write_compressed` fonctionnent avec ce zipfile
+
+    Ils s'appuient sur des éléments internes de zipfile, qui peuvent changer
+    d'une version de Python à l'autre : sans eux, les membres sont écrits un
+    par un avec ZipFile.writestr.
+    """
+    return (
+        hasattr(zipfile, "_get_compressor")
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+        and all(
+            hasattr(zipf, nom) for nom in ("_writecheck", "_didModify", "start_dir")
+        )
+    )
+
+
+def compress_member(
+    info: zipfile.ZipInfo, contenu: bytes, compresslevel: Optional[int] = None
+) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Compresse un membre hors de l'archive ; zlib, bz2 et lzma libèrent le GIL
+
+    Retourne l'entrée complétée (CRC, tailles) et les données compressées,
+    à écrire ensuite avec `write_compressed`.
+    """
+    info.file_size = len(contenu)
+    info.CRC = zlib.crc32(contenu)
+    compresseur = zipfile._get_compressor(info.compress_type, compresslevel)
+    if compresseur is None:
+        donnees = contenu
+    else:
+        donnees = compresseur.compress(contenu) + compresseur.flush()
+    info.compress_size = len(donnees)
+    return info, donnees
+
+
+def write_compressed(zipf: zipfile.ZipFile, info: zipfile.ZipInfo, donnees: bytes):
+    """Ecrit dans `zipf` un membre déjà compressé par `compress_member`
+
+    Reprend les étapes de ZipFile.open(mode="w") sans recompresser ;
+    l'archive produite est identique à celle de ZipFile.writestr.
+    """
+    info.flag_bits = 0
+    if info.compress_type == zipfile.ZIP_LZMA:
+        info.flag_bits |= 0x02  # flux LZMA précédé de son en-tête
+    zip64 = (
+        info.file_size > zipfile.ZIP64_LIMIT
+        or info.compress_size > zipfile.ZIP64_LIMIT
+    )
+    info.header_offset = zipf.fp.tell()
+    zipf._writecheck(info)
+    zipf._didModify = True
+    zipf.fp.write(info.FileHeader(zip64))
+    zipf.fp.write(donnees)
+    zipf.filelist.append(info)
+    zipf.NameToInfo[info.filename] = info
+    zipf.start_dir = zipf.fp.tell()
@@ -0,0 +1,109 @@
+"""Exécution parallèle des traitements fichier par fichier
+
+Les fichiers sont répartis sur un pool de processus (un cœur chacun) ; le
+nombre de traitements soumis et non encore récupérés est borné, et les
+résultats sont rendus dans l'ordre des tâches pour que le déroulé soit
+identique à une exécution en série.
+
+L'annulation et la pause d'un JobControl sont transmises aux processus du
+pool par deux événements multiprocessing : un traitement en cours s'arrête
+ou se met en pause à son prochain point de contrôle (`worker_checkpoint`,
+appelé entre deux échanges par le suivi de `worker_progress`), sans
+attendre la fin du fichier.
+"""
+
+import multiprocessing
+import signal
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+from chatsplit.control import JobCancelled, JobControl
+from chatsplit.progress import ProgressTracker
+
+# événements du pool, dans un processus du pool seulement
+_annulation: Any = None
+_reprise: Any = None
+
+
+def _init_worker(annulation: Any, reprise: Any):
+    """Ctrl+C est traité par le processus principal, qui annule proprement le job"""
+    global _annulation, _reprise
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _annulation, _reprise = annulation, reprise
+
+
+def worker_checkpoint():
+    """Point de contrôle d'un processus du pool : pause, ou JobCancelled si le job est annulé"""
+    if _reprise is None:
+        return
+    _reprise.wait()
+    if _annulation.is_set():
+        raise JobCancelled()
+
+
+def worker_progress() -> Optional[ProgressTracker]:
+    """Suivi portant les points de contrôle, dans un processus du pool ; None ailleurs"""
+    if _reprise is None:
+        return None
+    return ProgressTracker(None, checkpoint=worker_checkpoint)
+
+
+def run_in_pool(
+    fonction: Callable[..., Any],
+    taches: Iterable[Tuple],
+    processes: int = 1,
+    max_in_flight: Optional[int] = None,
+    on_submit: Optional[Callable[[Tuple], None]] = None,
+    control: Optional[JobControl] = None,
+) -> Iterator[Tuple[Tuple, Any]]:
+    """Applique `fonction(*tache)` à chaque tâche et produit les couples (tâche, résultat)
+
+    `fonction` doit être importable depuis un autre processus (fonction de
+    module ou méthode statique). Avec `processes` <= 1, tout se fait dans le
+    processus courant. Les processus du pool suivent `control` ; si le
+    parcours s'interrompt (annulation, erreur), les traitements en cours sont
+    annulés à leur prochain point de contrôle.
+    """
+    if processes <= 1:
+        for tache in taches:
+            if on_submit:
+                on_submit(tache)
+            yield tache, fonction(*tache)
+        return
+
+    max_in_flight = max_in_flight or 2 * processes
+    # "spawn" : pas de fork d'un processus qui fait tourner des threads (Qt)
+    contexte = multiprocessing.get_context("spawn")
+    annulation, reprise = contexte.Event(), contexte.Event()
+    reprise.set()
+    if control is not None:
+        control.share(annulation, reprise)
+    pool = ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=contexte,
+        initializer=_init_worker,
+        initargs=(annulation, reprise),
+    )
+    en_cours: Deque[Tuple[Tuple, Future]] = deque()
+    termine = False
+    try:
+        for tache in taches:
+            if len(en_cours) >= max_in_flight:
+                premiere, future = en_cours.popleft()
+                yield premiere, future.result()
+            if on_submit:
+                on_submit(tache)
+            en_cours.append((tache, pool.submit(fonction, *tache)))
+
+        while en_cours:
+            premiere, future = en_cours.popleft()
+            yield premiere, future.result()
+        termine = True
+    finally:
+        if control is not None:
+            control.unshare()
+        if not termine:
+            annulation.set()
+            reprise.set()
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,221 @@
+"""Choix du format et du niveau de compression des archives
+
+Une compression est décrite par une chaîne ``méthode[:niveau]`` :
+``stored``, ``deflate:1`` … ``deflate:9``, ``bzip2``, ``lzma`` et, si zstd
+est disponible (Python 3.14 ou paquet ``zstandard``), ``tar.zst:1`` …
+``tar.zst:22``. Les quatre premières produisent un ZIP, la dernière une
+archive tar compressée en zstd.
+"""
+
+import os
+import zipfile
+from datetime import date
+from typing import Iterable, List, NamedTuple, Optional
+
+from chatsplit.staging import replacing_file
+from chatsplit.writer import (MarkdownWriter, TarMarkdownWriter,
+                              ZipMarkdownWriter, default_threads)
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd_stdlib
+except ImportError:
+    _zstd_stdlib = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_COMPRESSION = "deflate"
+ARCHIVE_EXTENSIONS = (".zip", ".tar.zst")
+
+ZIP_METHODS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+# niveaux acceptés par méthode (None : pas de niveau réglable)
+LEVELS = {
+    "stored": None,
+    "deflate": (1, 9),
+    "bzip2": (1, 9),
+    "lzma": None,
+    "tar.zst": (1, 22),
+}
+
+LABELS = {
+    "stored": "ZIP sans compression",
+    "deflate": "ZIP deflate",
+    "bzip2": "ZIP bzip2",
+    "lzma": "ZIP LZMA",
+    "tar.zst": "tar + zstd",
+}
+
+
+class Compression(NamedTuple):
+    """Méthode et niveau de compression d'une archive"""
+
+    method: str
+    level: Optional[int] = None
+
+    def __str__(self) -> str:
+        if self.level is None:
+            return self.method
+        return f"{self.method}:{self.level}"
+
+    @property
+    def is_zip(self) -> bool:
+        return self.method in ZIP_METHODS
+
+    @property
+    def extension(self) -> str:
+        return ".zip" if self.is_zip else ".tar.zst"
+
+    @property
+    def label(self) -> str:
+        if self.level is None:
+            return LABELS[self.method]
+        return f"{LABELS[self.method]} (niveau {self.level})"
+
+
+def zstd_available() -> bool:
+    return _zstd_stdlib is not None or zstandard is not None
+
+
+def available_methods() -> List[str]:
+    """Méthodes utilisables avec les modules installés"""
+    methods = list(ZIP_METHODS)
+    if zstd_available():
+        methods.append("tar.zst")
+    return methods
+
+
+def parse_compression(spec: Optional[str]) -> Compression:
+    """Interprète 'méthode[:niveau]' ; lève ValueError si la valeur est invalide"""
+    method, _, level = (spec or DEFAULT_COMPRESSION).strip().lower().partition(":")
+    if method not in LEVELS:
+        raise ValueError(f"Compression inconnue : {method}")
+    if method not in available_methods():
+        raise ValueError(f"Compression {method} indisponible (module zstandard absent)")
+    if not level:
+        return Compression(method)
+
+    bornes = LEVELS[method]
+    if bornes is None:
+        raise ValueError(f"La compression {method} n'a pas de niveau")
+    try:
+        niveau = int(level)
+    except ValueError:
+        raise ValueError(f"Niveau de compression invalide : {level}") from None
+    if not bornes[0] <= niveau <= bornes[1]:
+        raise ValueError(
+            f"Niveau de compression {method} entre {bornes[0]} et {bornes[1]}"
+        )
+    return Compression(method, niveau)
+
+
+def choices() -> List[Compression]:
+    """Compressions proposées dans les interfaces, de la plus rapide à la plus compacte"""
+    proposees = [
+        Compression("stored"),
+        Compression("deflate", 1),
+        Compression("deflate"),
+        Compression("deflate", 9),
+        Compression("bzip2"),
+        Compression("lzma"),
+    ]
+    if zstd_available():
+        proposees += [Compression("tar.zst", 3), Compression("tar.zst", 19)]
+    return proposees
+
+
+class ZstdTarMarkdownWriter(TarMarkdownWriter):
+    """Ecrit les échanges dans une archive tar compressée en zstd"""
+
+    def __init__(
+        self,
+        destination: str,
+        jour: Optional[date] = None,
+        level: Optional[int] = None,
+    ):
+        level = level or 3
+        self._fichier = None
+        if _zstd_stdlib is not None:
+            self._flux = _zstd_stdlib.ZstdFile(destination, "w", level=level)
+        else:
+            self._fichier = open(destination, "wb")
+            compresseur = zstandard.ZstdCompressor(level=level)
+            self._flux = compresseur.stream_writer(self._fichier, closefd=False)
+        super().__init__(destination, jour, mode="w|", fileobj=self._flux)
+
+    def close(self):
+        try:
+            super().close()
+            self._flux.close()
+        finally:
+            if self._fichier is not None:
+                self._fichier.close()
+
+
+def open_archive_writer(
+    destination: str,
+    compression: Compression,
+    jour: Optional[date] = None,
+    threads: Optional[int] = None,
+) -> MarkdownWriter:
+    """Writer qui écrit les échanges dans l'archive `destination`
+
+    Les membres d'un ZIP sont compressés par `threads` threads (défaut : un par cœur).
+    """
+    if compression.is_zip:
+        return ZipMarkdownWriter(
+            destination,
+            jour,
+            compression=ZIP_METHODS[compression.method],
+            compresslevel=compression.level,
+            threads=default_threads() if threads is None else threads,
+        )
+    return ZstdTarMarkdownWriter(destination, jour, compression.level)
+
+
+def create_archive(
+    source_dir: str,
+    destination: str,
+    compression: Compression,
+    exclure: Iterable[str] = (),
+    threads: Optional[int] = None,
+):
+    """Archive les fichiers de `source_dir`, hors archives et noms de `exclure`
+
+    L'archive est écrite sous un nom temporaire puis mise à la place de
+    `destination` : une interruption laisse l'archive précédente intacte.
+    """
+    exclure = set(exclure)
+    fichiers = []
+    for root, _, files in os.walk(source_dir):
+        for file in files:
+            if file in exclure or file.endswith(ARCHIVE_EXTENSIONS):
+                continue
+            fichiers.append(os.path.join(root, file))
+
+    threads = default_threads() if threads is None else threads
+    with replacing_file(destination) as temporaire:
+        if compression.is_zip and threads <= 1:
+            with zipfile.ZipFile(
+                temporaire,
+                "w",
+                ZIP_METHODS[compression.method],
+                compresslevel=compression.level,
+            ) as zipf:
+                for chemin_fichier in fichiers:
+                    zipf.write(
+                        chemin_fichier, os.path.relpath(chemin_fichier, source_dir)
+                    )
+            return
+
+        with open_archive_writer(temporaire, compression, threads=threads) as writer:
+            for chemin_fichier in fichiers:
+                with open(chemin_fichier, "rb") as f:
+                    writer.add(os.path.relpath(chemin_fichier, source_dir), f.read())
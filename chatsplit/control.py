@@ -0,0 +1,88 @@
+"""Annulation et pause coopératives d'un traitement
+
+Le traitement appelle `checkpoint()` entre deux fichiers et régulièrement
+entre deux échanges (via le ProgressTracker) ; c'est là, et seulement là,
+qu'une pause bloque le traitement ou qu'une annulation l'interrompt. Les
+fichiers en cours d'écriture sont donc toujours terminés ou nettoyés, jamais
+abandonnés au milieu d'une écriture.
+
+Les méthodes de JobControl peuvent être appelées depuis un autre thread
+(interface Qt) ou un gestionnaire de signal (Ctrl+C). Pendant un pool de
+processus (chatsplit.batch), l'état est aussi reporté sur des événements
+multiprocessing lus par les points de contrôle des processus du pool.
+"""
+
+import threading
+from typing import Any, Optional, Tuple
+
+
+class JobCancelled(Exception):
+    """Levée au point de contrôle suivant une demande d'annulation"""
+
+    def __init__(self, message: str = "Traitement annulé"):
+        super().__init__(message)
+
+
+class JobControl:
+    """Demandes d'annulation et de pause adressées à un traitement en cours"""
+
+    def __init__(self):
+        self._reprise = threading.Event()
+        self._reprise.set()
+        self._annule = False
+        # vrai dès qu'une demande est en attente : seul test fait à chaque point de contrôle
+        self._demande = False
+        # événements (annulation, reprise) partagés avec un pool de processus
+        self._partage: Optional[Tuple[Any, Any]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._annule
+
+    @property
+    def paused(self) -> bool:
+        return not self._reprise.is_set()
+
+    def share(self, annulation: Any, reprise: Any):
+        """Reporte désormais l'état sur deux événements multiprocessing"""
+        self._partage = (annulation, reprise)
+        self._publish()
+
+    def unshare(self):
+        self._partage = None
+
+    def _publish(self):
+        if self._partage is None:
+            return
+        annulation, reprise = self._partage
+        if self._annule:
+            annulation.set()
+        if self._reprise.is_set():
+            reprise.set()
+        else:
+            reprise.clear()
+
+    def cancel(self):
+        self._annule = True
+        self._demande = True
+        self._reprise.set()  # un traitement en pause doit pouvoir s'arrêter
+        self._publish()
+
+    def pause(self):
+        if not self._annule:
+            self._reprise.clear()
+            self._demande = True
+            self._publish()
+
+    def resume(self):
+        self._reprise.set()
+        self._demande = self._annule
+        self._publish()
+
+    def checkpoint(self):
+        """Bloque tant que le traitement est en pause ; lève JobCancelled s'il est annulé"""
+        if not self._demande:
+            return
+        self._reprise.wait()
+        if self._annule:
+            raise JobCancelled()
@@ -0,0 +1,206 @@
+"""Lecture en flux de l'export officiel de ChatGPT (conversations.json)
+
+L'export est un tableau JSON de conversations ; un fichier JSONL (une
+conversation par ligne) est accepté de la même façon. Le fichier est lu par
+blocs et chaque conversation est décodée séparément : seule la conversation
+en cours est en mémoire, jamais l'export complet.
+
+Une conversation est un arbre de messages (`mapping`) : la branche affichée
+est remontée depuis `current_node`, puis parcourue nœud par nœud. Chaque
+message de l'utilisateur ouvre un échange, les messages de l'assistant qui
+suivent forment la réponse. Chaque conversation est écrite dans son propre
+dossier, nommé d'après son titre ; les noms sont uniques dans l'export, et
+chaque export a son dossier (voir ProcessingJob.list_tasks).
+"""
+
+import json
+import os
+import re
+from datetime import date
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
+
+from chatsplit.markdown import markdown_filename, render_markdown
+from chatsplit.progress import ProgressTracker
+
+JSON_EXTENSIONS = (".json", ".jsonl")
+_READ_SIZE = 1024 * 1024
+_SEPARATEURS = " \t\r\n,[]"
+_NON_ALPHANUM = re.compile(r"[^\w-]+")
+
+
+class Conversation(NamedTuple):
+    """Conversation de l'export et ses paires (question, réponse)"""
+
+    id: str
+    title: str
+    exchanges: List[Tuple[str, str]]
+
+
+def is_json_export(filepath: str) -> bool:
+    return filepath.lower().endswith(JSON_EXTENSIONS)
+
+
+def iter_json_values(f: TextIO, read_size: int = _READ_SIZE) -> Iterator[Any]:
+    """Produit un à un les éléments d'un tableau JSON, ou les lignes d'un JSONL"""
+    decodeur = json.JSONDecoder()
+    tampon = ""
+    position = 0
+    fin_fichier = False
+
+    while True:
+        while position < len(tampon) and tampon[position] in _SEPARATEURS:
+            position += 1
+        if position == len(tampon):
+            if fin_fichier:
+                return
+            tampon, position = f.read(read_size), 0
+            fin_fichier = not tampon
+            continue
+
+        try:
+            valeur, position = decodeur.raw_decode(tampon, position)
+        except json.JSONDecodeError:
+            if fin_fichier:
+                raise
+            # élément incomplet : on lit la suite, au moins autant que le tampon
+            bloc = f.read(max(read_size, len(tampon) - position))
+            fin_fichier = not bloc
+            tampon, position = tampon[position:] + bloc, 0
+            continue
+        yield valeur
+
+
+def _active_branch(conversation: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Nœuds de la branche affichée, de la racine au dernier message"""
+    mapping = conversation.get("mapping") or {}
+    noeud_id = conversation.get("current_node")
+    if noeud_id not in mapping:
+        # pas de nœud courant : on suit le dernier enfant depuis la racine
+        racines = [
+            n for n, noeud in mapping.items() if noeud.get("parent") not in mapping
+        ]
+        noeud_id = racines[0] if racines else None
+        while noeud_id is not None and mapping[noeud_id].get("children"):
+            noeud_id = mapping[noeud_id]["children"][-1]
+
+    branche = []
+    vus: Set[str] = set()
+    while noeud_id in mapping and noeud_id not in vus:
+        vus.add(noeud_id)
+        branche.append(mapping[noeud_id])
+        noeud_id = mapping[noeud_id].get("parent")
+    return reversed(branche)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """Texte affiché d'un message ; vide pour les contenus non textuels"""
+    if (message.get("metadata") or {}).get("is_visually_hidden_from_conversation"):
+        return ""
+    contenu = message.get("content") or {}
+    if contenu.get("content_type") not in ("text", "multimodal_text"):
+        return ""
+    parties = [p for p in contenu.get("parts") or () if isinstance(p, str)]
+    return "\n".join(parties).strip()
+
+
+def conversation_exchanges(conversation: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """Produit les paires (question, réponse) de la branche affichée"""
+    question: Optional[str] = None
+    answer: List[str] = []
+
+    for noeud in _active_branch(conversation):
+        message = noeud.get("message")
+        if not message:
+            continue
+        role = (message.get("author") or {}).get("role")
+        if role == "user":
+            texte = _message_text(message)
+            if not texte:
+                continue
+            if question is not None:
+                yield question, "\n\n".join(answer)
+            question, answer = texte, []
+        elif role == "assistant" and question is not None:
+            # les appels d'outils (recipient != "all") ne sont pas affichés
+            if message.get("recipient", "all") != "all":
+                continue
+            texte = _message_text(message)
+            if texte:
+                answer.append(texte)
+
+    if question is not None:
+        yield question, "\n\n".join(answer)
+
+
+def iter_conversations(
+    filepath: str, progress: Optional[ProgressTracker] = None
+) -> Iterator[Conversation]:
+    """Parcourt les conversations d'un export JSON ou JSONL"""
+    with open(filepath, "r", encoding="utf-8") as f:
+        if progress is not None:
+            progress.follow_file(f)
+        for valeur in iter_json_values(f):
+            if not isinstance(valeur, dict):
+                continue
+            conversation = Conversation(
+                str(valeur.get("conversation_id") or valeur.get("id") or ""),
+                valeur.get("title") or "",
+                list(conversation_exchanges(valeur)),
+            )
+            if progress is not None:
+                progress.exchange(count=len(conversation.exchanges))
+            yield conversation
+
+
+def unique_name(nom: str, utilises: Set[str]) -> str:
+    """`nom`, suffixé (-2, -3...) s'il est déjà dans `utilises`, puis ajouté à `utilises`"""
+    candidat, suffixe = nom, 2
+    while candidat in utilises:
+        candidat, suffixe = f"{nom}-{suffixe}", suffixe + 1
+    utilises.add(candidat)
+    return candidat
+
+
+def folder_name(conversation: Conversation, utilises: Set[str]) -> str:
+    """Nom de dossier unique dans l'export, tiré du titre de la conversation"""
+    nom = _NON_ALPHANUM.sub("_", conversation.title.strip().lower()).strip("_")[:80]
+    return unique_name(nom or conversation.id[:8] or "conversation", utilises)
+
+
+def write_conversations(
+    filepath: str,
+    writer,
+    dossier: str = "",
+    progress: Optional[ProgressTracker] = None,
+) -> Tuple[int, int]:
+    """Écrit chaque conversation dans son dossier, via un MarkdownWriter
+
+    Retourne le nombre de conversations et le nombre d'échanges écrits.
+    """
+    utilises: Set[str] = set()
+    nb_conversations = nb_echanges = 0
+    for conversation in iter_conversations(filepath, progress):
+        if not conversation.exchanges:
+            continue
+        sous_dossier = os.path.join(dossier, folder_name(conversation, utilises))
+        for index, (q, r) in enumerate(conversation.exchanges, start=1):
+            writer.write(os.path.join(sous_dossier, writer.filename(index)), q, r)
+        nb_conversations += 1
+        nb_echanges += len(conversation.exchanges)
+    return nb_conversations, nb_echanges
+
+
+def iter_conversation_entries(
+    filepath: str, jour: Optional[date] = None
+) -> Iterator[Tuple[str, str]]:
+    """Comme iter_markdown_entries : couples (chemin, contenu Markdown) de l'export"""
+    jour = jour or date.today()
+    utilises: Set[str] = set()
+    for conversation in iter_conversations(filepath):
+        if not conversation.exchanges:
+            continue
+        dossier = folder_name(conversation, utilises)
+        for index, (q, r) in enumerate(conversation.exchanges, start=1):
+            yield f"{dossier}/{markdown_filename(index, jour)}", render_markdown(
+                q, r, jour
+            )
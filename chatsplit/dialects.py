@@ -0,0 +1,99 @@
+"""Dialectes des exports : marqueurs qui annoncent la question et la réponse
+
+Chaque dialecte (langue de l'interface, assistant) est enregistré dans
+DIALECTS. Le dialecte d'un fichier est reconnu sur ses premiers Ko, avec une
+seule expression régulière qui regroupe les marqueurs de tous les dialectes ;
+la découpe ne cherche ensuite que les deux marqueurs du dialecte reconnu,
+quel que soit le nombre de dialectes enregistrés.
+
+Ajouter un format :
+
+    register_dialect(Dialect("mon-assistant", "Moi :", "Assistant :"))
+"""
+
+import re
+from typing import Dict, NamedTuple, Optional, Pattern
+
+# taille du début de fichier examiné pour reconnaître le dialecte
+DETECT_BYTES = 4096
+
+
+class Dialect(NamedTuple):
+    """Marqueurs de ligne d'un format d'export"""
+
+    name: str
+    question: str
+    answer: str
+
+    @property
+    def question_bytes(self) -> bytes:
+        return self.question.encode("utf-8")
+
+    @property
+    def answer_bytes(self) -> bytes:
+        return self.answer.encode("utf-8")
+
+
+DIALECTS: Dict[str, Dialect] = {}
+DEFAULT_DIALECT = "chatgpt-fr"
+
+# marqueur -> dialecte, et l'expression qui les cherche tous à la fois
+_par_marqueur: Dict[str, Dialect] = {}
+_detecteur: Optional[Pattern[str]] = None
+
+
+def register_dialect(dialect: Dialect) -> Dialect:
+    """Enregistre (ou remplace) un dialecte"""
+    global _detecteur
+    for marqueur in (dialect.question, dialect.answer):
+        autre = _par_marqueur.get(marqueur)
+        if autre is not None and autre.name != dialect.name:
+            raise ValueError(
+                f"Marqueur {marqueur!r} déjà utilisé par le dialecte {autre.name}"
+            )
+    ancien = DIALECTS.pop(dialect.name, None)
+    if ancien is not None:
+        del _par_marqueur[ancien.question], _par_marqueur[ancien.answer]
+    DIALECTS[dialect.name] = dialect
+    _par_marqueur[dialect.question] = dialect
+    _par_marqueur[dialect.answer] = dialect
+    _detecteur = None
+    return dialect
+
+
+def get_dialect(name: str) -> Dialect:
+    try:
+        return DIALECTS[name]
+    except KeyError:
+        raise ValueError(
+            f"Dialecte inconnu : {name} (connus : {', '.join(DIALECTS)})"
+        ) from None
+
+
+def _detector() -> Pattern[str]:
+    """Alternative de tous les marqueurs, les plus longs d'abord"""
+    global _detecteur
+    if _detecteur is None:
+        marqueurs = sorted(_par_marqueur, key=len, reverse=True)
+        _detecteur = re.compile("|".join(re.escape(m) for m in marqueurs))
+    return _detecteur
+
+
+def detect_dialect(debut: str) -> Dialect:
+    """Dialecte du premier marqueur trouvé dans `debut`, sinon le dialecte par défaut"""
+    trouve = _detector().search(debut)
+    if trouve is None:
+        return DIALECTS[DEFAULT_DIALECT]
+    return _par_marqueur[trouve.group(0)]
+
+
+def detect_file(filepath: str, taille: int = DETECT_BYTES) -> Dialect:
+    """Reconnaît le dialecte d'un fichier sur ses `taille` premiers octets"""
+    with open(filepath, "rb") as f:
+        debut = f.read(taille)
+    # un caractère coupé en fin de lecture est ignoré
+    return detect_dialect(debut.decode("utf-8", errors="ignore"))
+
+
+register_dialect(Dialect("chatgpt-fr", "Vous avez dit :", "ChatGPT a dit :"))
+register_dialect(Dialect("chatgpt-en", "You said:", "ChatGPT said:"))
@@ -0,0 +1,155 @@
+"""Découpe incrémentale des fils qui s'allongent d'un export à l'autre
+
+Après chaque passage, l'état est mémorisé dans le dossier de sortie
+(``.filchat-state.json``) : position en octets du dernier échange, nombre
+d'échanges et empreinte du fichier jusqu'à cette position. Au passage
+suivant, si le début du fichier est inchangé, seul le dernier échange
+(dont la réponse a pu s'allonger) et les nouveaux sont relus et écrits.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date
+from typing import List, NamedTuple, Optional
+
+from chatsplit.parser import scan_chat_file
+from chatsplit.progress import ProgressTracker
+from chatsplit.writer import MarkdownWriter
+
+STATE_FILENAME = ".filchat-state.json"
+_BUFFER_SIZE = 1024 * 1024
+
+
+class IncrementalState(NamedTuple):
+    """Etat mémorisé à la fin d'un passage"""
+
+    offset: int  # position du dernier échange
+    count: int  # nombre d'échanges écrits
+    prefix_sha256: str  # empreinte des octets [0, offset)
+    last_name: str  # fichier Markdown du dernier échange
+    last_sha256: str  # empreinte du contenu du dernier échange
+
+
+class IncrementalResult(NamedTuple):
+    """Bilan d'un passage incrémental"""
+
+    written: List[str]  # fichiers Markdown créés ou réécrits
+    count: int  # nombre total d'échanges
+    resumed: bool  # False si le fichier a été relu entièrement
+    rewritten_existing: bool  # True si un fichier déjà produit a changé
+    bytes_written: int = 0
+    write_seconds: float = 0.0  # temps d'écriture des fichiers Markdown
+
+
+def prefix_sha256(filepath: str, offset: int) -> str:
+    """Empreinte SHA-256 des `offset` premiers octets du fichier"""
+    h = hashlib.sha256()
+    restant = offset
+    with open(filepath, "rb") as f:
+        while restant > 0:
+            bloc = f.read(min(_BUFFER_SIZE, restant))
+            if not bloc:
+                break
+            h.update(bloc)
+            restant -= len(bloc)
+    return h.hexdigest()
+
+
+def load_state(dossier_sortie: str) -> Optional[IncrementalState]:
+    """Etat du passage précédent, ou None"""
+    try:
+        with open(os.path.join(dossier_sortie, STATE_FILENAME), encoding="utf-8") as f:
+            return IncrementalState(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_state(dossier_sortie: str, state: IncrementalState):
+    chemin = os.path.join(dossier_sortie, STATE_FILENAME)
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state._asdict(), f)
+    os.replace(chemin + ".tmp", chemin)
+
+
+def resume_point(fichier_source: str, dossier_sortie: str) -> Optional[IncrementalState]:
+    """Etat réutilisable si le fichier prolonge celui du passage précédent"""
+    state = load_state(dossier_sortie)
+    if state is None or state.count == 0:
+        return None
+    if os.path.getsize(fichier_source) < state.offset:
+        return None
+    if prefix_sha256(fichier_source, state.offset) != state.prefix_sha256:
+        return None
+    if not os.path.exists(os.path.join(dossier_sortie, state.last_name)):
+        return None
+    return state
+
+
+def _digest(question: str, answer: str) -> str:
+    return hashlib.sha256(f"{question}\0{answer}".encode("utf-8")).hexdigest()
+
+
+def split_incremental(
+    fichier_source: str,
+    dossier_sortie: str,
+    jour: Optional[date] = None,
+    progress: Optional[ProgressTracker] = None,
+) -> IncrementalResult:
+    """Découpe le fichier en ne traitant que ce qui a changé depuis le dernier passage"""
+    os.makedirs(dossier_sortie, exist_ok=True)
+    jour = jour or date.today()
+
+    state = resume_point(fichier_source, dossier_sortie)
+    if state is None and load_state(dossier_sortie) is not None:
+        # le fichier ne prolonge pas le précédent : on repart d'un dossier propre
+        for nom in os.listdir(dossier_sortie):
+            if nom.endswith(".md"):
+                os.remove(os.path.join(dossier_sortie, nom))
+    start = state.offset if state else 0
+    premier_index = state.count if state else 1
+
+    written: List[str] = []
+    rewritten_existing = False
+    dernier = state
+
+    try:
+        with MarkdownWriter(dossier_sortie, jour) as writer:
+            for index, exchange in enumerate(
+                scan_chat_file(fichier_source, start), start=premier_index
+            ):
+                if progress is not None:
+                    progress.exchange(exchange.offset)
+                digest = _digest(exchange.question, exchange.answer)
+                if state is not None and index == state.count:
+                    # dernier échange du passage précédent : réécrit seulement s'il a changé
+                    nom = state.last_name
+                    if digest == state.last_sha256:
+                        dernier = state
+                        continue
+                    rewritten_existing = True
+                else:
+                    nom = writer.filename(index)
+
+                writer.write(nom, exchange.question, exchange.answer)
+                written.append(nom)
+                dernier = IncrementalState(exchange.offset, index, "", nom, digest)
+    finally:
+        # aussi en cas d'interruption (annulation) : le passage suivant reprend
+        # après le dernier échange écrit
+        if dernier is not None:
+            save_state(
+                dossier_sortie,
+                dernier._replace(
+                    prefix_sha256=prefix_sha256(fichier_source, dernier.offset)
+                ),
+            )
+    count = dernier.count if dernier else 0
+    return IncrementalResult(
+        written,
+        count,
+        state is not None,
+        rewritten_existing,
+        writer.bytes_written,
+        writer.write_seconds,
+    )
@@ -0,0 +1,37 @@
+"""Mise en forme Markdown des échanges, compatible avec un coffre Obsidian"""
+
+from datetime import date
+from typing import Iterable, Iterator, Optional, Tuple
+
+MARKDOWN_TEMPLATE = """---
+categorie:
+date: {date}
+---
+
+# Question
+{question}
+
+# Réponse
+{answer}
+"""
+
+
+def markdown_filename(index: int, jour: date) -> str:
+    """Nom du fichier Markdown d'un échange : 'YYYYMMDD-NNN.md'"""
+    return f"{jour.strftime('%Y%m%d')}-{index:03d}.md"
+
+
+def render_markdown(question: str, answer: str, jour: date) -> str:
+    """Contenu Markdown d'une paire question/réponse"""
+    return MARKDOWN_TEMPLATE.format(
+        date=jour.strftime("%Y-%m-%d"), question=question, answer=answer
+    )
+
+
+def iter_markdown_entries(
+    exchanges: Iterable[Tuple[str, str]], jour: Optional[date] = None
+) -> Iterator[Tuple[str, str]]:
+    """Produit les couples (nom de fichier, contenu Markdown) des échanges"""
+    jour = jour or date.today()
+    for index, (question, answer) in enumerate(exchanges, start=1):
+        yield markdown_filename(index, jour), render_markdown(question, answer, jour)
@@ -0,0 +1,118 @@
+"""Moteur de découpe par projection mémoire (mmap) du fichier
+
+Les marqueurs sont repérés directement dans les octets du fichier ; seuls
+les corps des questions et des réponses sont décodés, à partir de tranches
+(memoryview) de la projection. Le résultat est identique à celui du
+parseur ligne à ligne : une ligne qui contient un marqueur est retirée du
+texte, le marqueur de question l'emporte s'il est sur la même ligne qu'un
+marqueur de réponse.
+
+La recherche utilise bytes.find, un marqueur à la fois : avec CPython elle
+est plusieurs fois plus rapide qu'une expression régulière en alternative,
+qui examine chaque octet.
+"""
+
+import mmap
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
+
+from chatsplit.dialects import DEFAULT_DIALECT, DIALECTS, Dialect
+
+QUESTION_MARKER_BYTES = DIALECTS[DEFAULT_DIALECT].question_bytes
+ANSWER_MARKER_BYTES = DIALECTS[DEFAULT_DIALECT].answer_bytes
+
+
+def _decode(vue: memoryview, debut: int, fin: int) -> str:
+    """Texte de la tranche [début, fin) de la projection, décodé et normalisé"""
+    texte = str(vue[debut:fin], "utf-8")
+    if "\r" in texte:
+        texte = texte.replace("\r\n", "\n").replace("\r", "\n")
+    return texte.strip()
+
+
+def scan_mapped(
+    donnees,
+    start: int = 0,
+    question_marker: bytes = QUESTION_MARKER_BYTES,
+    answer_marker: bytes = ANSWER_MARKER_BYTES,
+) -> Iterator[Tuple[str, str, int]]:
+    """Produit les triplets (question, réponse, position du marqueur de question)
+
+    Pour chaque échange : la ligne de la question suivante borne l'échange,
+    puis le premier marqueur de réponse entre les deux sépare question et
+    réponse. Les autres lignes de réponse éventuelles sont retirées du texte.
+    """
+    taille = len(donnees)
+    # (début, fin) -> position du marqueur dans [début, fin), ou -1
+    chercher_question = partial(donnees.find, question_marker)
+    chercher_reponse = partial(donnees.find, answer_marker)
+    find = donnees.find
+    rfind = donnees.rfind
+    vue = memoryview(donnees)
+
+    try:
+        position = chercher_question(start, taille)
+        if position == -1:
+            return
+        offset = rfind(b"\n", start, position) + 1 or start
+        fin = find(b"\n", position)
+        debut_corps = taille if fin == -1 else fin + 1
+
+        while True:
+            # l'échange s'arrête au début de la ligne de la question suivante
+            suivante = chercher_question(debut_corps, taille)
+            if suivante == -1:
+                fin_echange = taille
+            else:
+                fin_echange = rfind(b"\n", debut_corps, suivante) + 1 or debut_corps
+
+            reponse = chercher_reponse(debut_corps, fin_echange)
+            if reponse == -1:
+                question = _decode(vue, debut_corps, fin_echange)
+                answer = ""
+            else:
+                debut = rfind(b"\n", debut_corps, reponse) + 1 or debut_corps
+                question = _decode(vue, debut_corps, debut)
+                fin = find(b"\n", reponse, fin_echange)
+                debut = fin_echange if fin == -1 else fin + 1
+                # autres lignes de marqueur de réponse : retirées du texte
+                morceaux: List[str] = []
+                autre = chercher_reponse(debut, fin_echange)
+                while autre != -1:
+                    fin = rfind(b"\n", debut, autre) + 1 or debut
+                    morceaux.append(str(vue[debut:fin], "utf-8"))
+                    fin = find(b"\n", autre, fin_echange)
+                    debut = fin_echange if fin == -1 else fin + 1
+                    autre = chercher_reponse(debut, fin_echange)
+                if morceaux:
+                    morceaux.append(str(vue[debut:fin_echange], "utf-8"))
+                    answer = (
+                        "".join(morceaux)
+                        .replace("\r\n", "\n")
+                        .replace("\r", "\n")
+                        .strip()
+                    )
+                else:
+                    answer = _decode(vue, debut, fin_echange)
+
+            yield question, answer, offset
+
+            if suivante == -1:
+                return
+            offset = fin_echange
+            fin = find(b"\n", suivante)
+            debut_corps = taille if fin == -1 else fin + 1
+    finally:
+        vue.release()
+
+
+def scan_file(
+    filepath: str, start: int = 0, dialect: Optional[Dialect] = None
+) -> Iterator[Tuple[str, str, int]]:
+    """Comme scan_mapped, sur la projection en mémoire du fichier"""
+    dialect = dialect or DIALECTS[DEFAULT_DIALECT]
+    with open(filepath, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+            yield from scan_mapped(
+                donnees, start, dialect.question_bytes, dialect.answer_bytes
+            )
@@ -0,0 +1,150 @@
+"""Parseur en flux des fils de discussion ChatGPT
+
+Deux moteurs produisent les mêmes échanges :
+
+- "lines" (défaut) : le fichier est lu ligne par ligne, seules les lignes
+  de l'échange en cours sont conservées en mémoire ;
+- "mmap" : le fichier est projeté en mémoire et les marqueurs repérés dans
+  les octets, voir chatsplit.mmapscan. Plus rapide quand les réponses sont
+  longues (quelques Ko et plus), plus lent sur des échanges très courts.
+
+Le moteur se choisit par l'argument `engine` ou la variable d'environnement
+FILCHAT_PARSER_ENGINE. Le moteur "lines" est utilisé d'office pour les
+fichiers qui ne peuvent pas être projetés (fichier vide, tube…).
+
+Les marqueurs dépendent du dialecte de l'export (voir chatsplit.dialects),
+reconnu sur le début du fichier s'il n'est pas indiqué.
+"""
+
+import os
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from chatsplit import mmapscan
+from chatsplit.dialects import DEFAULT_DIALECT, DIALECTS, Dialect, detect_file
+from chatsplit.progress import ProgressTracker
+
+QUESTION_MARKER = DIALECTS[DEFAULT_DIALECT].question
+ANSWER_MARKER = DIALECTS[DEFAULT_DIALECT].answer
+
+ENGINES = ("lines", "mmap")
+DEFAULT_ENGINE = "lines"
+
+
+def iter_exchanges(
+    lignes: Iterable[str],
+    dialect: Optional[Dialect] = None,
+    progress: Optional[ProgressTracker] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Produit les paires (question, réponse) à partir d'un flux de lignes"""
+    dialect = dialect or DIALECTS[DEFAULT_DIALECT]
+    marqueur_question = dialect.question
+    marqueur_reponse = dialect.answer
+    question: Optional[List[str]] = None
+    answer: Optional[List[str]] = None
+    courant: Optional[List[str]] = None  # liste alimentée par les lignes lues
+
+    for ligne in lignes:
+        if marqueur_question in ligne:
+            if question is not None:
+                if progress is not None:
+                    progress.exchange()
+                yield "".join(question).strip(), "".join(answer).strip()
+            question = []
+            answer = []
+            courant = question
+            continue
+
+        if marqueur_reponse in ligne:
+            courant = answer
+            continue
+
+        if courant is not None:
+            courant.append(ligne)
+
+    # Dernier bloc
+    if question is not None:
+        if progress is not None:
+            progress.exchange()
+        yield "".join(question).strip(), "".join(answer).strip()
+
+
+def _use_mmap(filepath: str, engine: Optional[str]) -> bool:
+    engine = engine or os.environ.get("FILCHAT_PARSER_ENGINE") or DEFAULT_ENGINE
+    return engine == "mmap" and _mappable(filepath)
+
+
+def _mappable(filepath: str) -> bool:
+    try:
+        return os.path.isfile(filepath) and os.path.getsize(filepath) > 0
+    except OSError:
+        return False
+
+
+def parse_chat_file(
+    filepath: str,
+    engine: Optional[str] = None,
+    dialect: Optional[Dialect] = None,
+    progress: Optional[ProgressTracker] = None,
+) -> Iterator[Tuple[str, str]]:
+    """Parse un fichier de chat et produit les paires (question, réponse)
+
+    Chaque échange est signalé à `progress`, avec la position atteinte dans
+    le fichier.
+    """
+    dialect = dialect or detect_file(filepath)
+    if _use_mmap(filepath, engine):
+        for question, answer, offset in mmapscan.scan_file(filepath, dialect=dialect):
+            if progress is not None:
+                progress.exchange(offset)
+            yield question, answer
+        return
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        if progress is not None:
+            progress.follow_file(f)
+        yield from iter_exchanges(f, dialect, progress)
+
+
+class Exchange(NamedTuple):
+    """Echange repéré dans le fichier, avec la position en octets de son marqueur de question"""
+
+    question: str
+    answer: str
+    offset: int
+
+
+def scan_chat_file(
+    filepath: str,
+    start: int = 0,
+    engine: Optional[str] = None,
+    dialect: Optional[Dialect] = None,
+) -> Iterator[Exchange]:
+    """Comme parse_chat_file, en indiquant la position de chaque échange
+
+    `start` doit être le début d'une ligne (typiquement la position d'un
+    échange déjà repéré lors d'un passage précédent).
+    """
+    dialect = dialect or detect_file(filepath)
+    marqueur_question = dialect.question
+    if _use_mmap(filepath, engine):
+        for question, answer, offset in mmapscan.scan_file(filepath, start, dialect):
+            yield Exchange(question, answer, offset)
+        return
+
+    debuts: Deque[int] = deque()
+
+    with open(filepath, "rb") as f:
+        f.seek(start)
+
+        def lignes() -> Iterator[str]:
+            position = start
+            for brute in f:
+                ligne = brute.decode("utf-8").replace("\r\n", "\n")
+                if marqueur_question in ligne:
+                    debuts.append(position)
+                position += len(brute)
+                yield ligne
+
+        for question, answer in iter_exchanges(lignes(), dialect):
+            yield Exchange(question, answer, debuts.popleft())
@@ -0,0 +1,133 @@
+"""Mesure des étapes d'un traitement : temps par étape et compteurs
+
+Un JobProfile cumule le temps passé dans chaque étape (préparation du
+dossier, découpe, écriture, archive) et des compteurs (octets lus, fichiers
+et octets écrits, octets compressés). Son rapport (`to_dict`) est en JSON,
+pour être journalisé, enregistré en base ou comparé d'un passage à l'autre.
+Avec un pool de processus, les temps des étapes de découpe sont cumulés sur
+tous les processus et peuvent dépasser la durée totale.
+
+Pour descendre au niveau des fonctions, `capture` enregistre un profil
+cProfile (``.prof``, lisible par pstats ou snakeviz) ou pyinstrument
+(``.html``, nécessite ``uv add pyinstrument``) du processus courant.
+"""
+
+import cProfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILERS = ("cprofile", "pyinstrument")
+_EXTENSIONS = {"cprofile": ".prof", "pyinstrument": ".html"}
+
+_MO = 1024 * 1024
+
+
+def available_profilers() -> List[str]:
+    return [nom for nom in PROFILERS if nom != "pyinstrument" or pyinstrument]
+
+
+def parse_profiler(nom: Optional[str]) -> Optional[str]:
+    """Vérifie le nom du profileur ; lève ValueError s'il est inconnu ou absent"""
+    if not nom:
+        return None
+    nom = nom.strip().lower()
+    if nom not in PROFILERS:
+        raise ValueError(f"Profileur inconnu : {nom} (connus : {', '.join(PROFILERS)})")
+    if nom not in available_profilers():
+        raise ValueError(f"Profileur {nom} indisponible (module {nom} absent)")
+    return nom
+
+
+class JobProfile:
+    """Temps cumulé par étape et compteurs d'un traitement"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._debut = clock()
+        self.elapsed = 0.0
+
+    @contextmanager
+    def stage(self, nom: str) -> Iterator[None]:
+        """Chronomètre le bloc, ajouté au temps de l'étape `nom`"""
+        debut = self.clock()
+        try:
+            yield
+        finally:
+            self.add_time(nom, self.clock() - debut)
+
+    def add_time(self, nom: str, secondes: float):
+        self.stages[nom] = self.stages.get(nom, 0.0) + secondes
+
+    def count(self, nom: str, valeur: int = 1):
+        self.counters[nom] = self.counters.get(nom, 0) + valeur
+
+    def merge(self, rapport: Dict[str, Any]):
+        """Ajoute les étapes et compteurs d'un rapport (traitement d'un processus du pool)"""
+        for nom, secondes in rapport.get("stages", {}).items():
+            self.add_time(nom, secondes)
+        for nom, valeur in rapport.get("counters", {}).items():
+            self.count(nom, valeur)
+
+    def finish(self):
+        """Arrête le chronomètre global"""
+        self.elapsed = self.clock() - self._debut
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": round(self.elapsed, 4),
+            "stages": {nom: round(s, 4) for nom, s in self.stages.items()},
+            "counters": dict(self.counters),
+            "message": str(self),
+        }
+
+    def __str__(self) -> str:
+        etapes = [f"{nom} {s:.2f} s" for nom, s in self.stages.items()]
+        compteurs = [
+            (
+                f"{nom} {valeur / _MO:.1f} Mo"
+                if nom.startswith("bytes")
+                else f"{nom} {valeur}"
+            )
+            for nom, valeur in self.counters.items()
+        ]
+        return " · ".join([f"total {self.elapsed:.2f} s"] + etapes + compteurs)
+
+
+@contextmanager
+def capture(profileur: Optional[str], chemin: str) -> Iterator[Optional[str]]:
+    """Profile le bloc avec `profileur` et produit le fichier écrit (None sans profileur)
+
+    `chemin` est complété par l'extension du format (.prof ou .html). Seul le
+    processus courant est profilé, pas les processus d'un pool.
+    """
+    profileur = parse_profiler(profileur)
+    if profileur is None:
+        yield None
+        return
+
+    chemin += _EXTENSIONS[profileur]
+    if profileur == "cprofile":
+        profil = cProfile.Profile()
+        profil.enable()
+        try:
+            yield chemin
+        finally:
+            profil.disable()
+            profil.dump_stats(chemin)
+    else:
+        profil = pyinstrument.Profiler()
+        profil.start()
+        try:
+            yield chemin
+        finally:
+            profil.stop()
+            with open(chemin, "w", encoding="utf-8") as f:
+                f.write(profil.output_html())
@@ -0,0 +1,178 @@
+"""Progression d'un traitement : octets lus, échanges, débit et temps restant
+
+Le découpage signale chaque échange au ProgressTracker, qui lit l'horloge
+monotone à chaque fois (quelques dizaines de nanosecondes) et n'appelle son
+callback qu'à intervalle fixe : le consommateur (signal Qt, base de
+données, terminal) reçoit au plus une mise à jour par intervalle, même
+quand un seul échange occupe plusieurs mégaoctets.
+"""
+
+import os
+import time
+from functools import partial
+from typing import IO, Any, Callable, Dict, NamedTuple, Optional
+
+DEFAULT_INTERVAL = 0.5  # secondes entre deux émissions
+CHECK_INTERVAL = 0.05  # secondes entre deux points de contrôle
+
+_MO = 1024 * 1024
+
+
+def format_duration(secondes: float) -> str:
+    """'1:05' ou '2:03:07'"""
+    minutes, secondes = divmod(int(secondes + 0.5), 60)
+    heures, minutes = divmod(minutes, 60)
+    if heures:
+        return f"{heures}:{minutes:02d}:{secondes:02d}"
+    return f"{minutes}:{secondes:02d}"
+
+
+class Progress(NamedTuple):
+    """Etat du traitement à un instant donné"""
+
+    bytes_done: int  # octets lus, tous fichiers confondus
+    bytes_total: int  # taille cumulée des fichiers du job
+    exchanges: int  # échanges découpés
+    files_done: int
+    files_total: int
+    elapsed: float  # secondes depuis le début du job
+    current_file: str = ""
+
+    @property
+    def fraction(self) -> float:
+        if not self.bytes_total:
+            return 1.0 if self.files_done >= self.files_total else 0.0
+        return min(1.0, self.bytes_done / self.bytes_total)
+
+    @property
+    def percent(self) -> int:
+        return int(100 * self.fraction)
+
+    @property
+    def throughput(self) -> float:
+        """Débit en octets par seconde"""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Temps restant estimé en secondes, ou None tant que le débit est inconnu"""
+        if not self.throughput:
+            return None
+        return max(0, self.bytes_total - self.bytes_done) / self.throughput
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Version sérialisable en JSON, avec les valeurs calculées"""
+        donnees = self._asdict()
+        donnees.update(
+            percent=self.percent,
+            throughput=round(self.throughput),
+            eta=None if self.eta is None else round(self.eta, 1),
+            message=str(self),
+        )
+        return donnees
+
+    def __str__(self) -> str:
+        parties = [
+            f"{self.bytes_done / _MO:.1f}/{self.bytes_total / _MO:.1f} Mo ({self.percent} %)",
+            f"{self.exchanges} échanges",
+            f"{self.throughput / _MO:.1f} Mo/s",
+        ]
+        if self.eta is not None and self.fraction < 1:
+            parties.append(f"reste {format_duration(self.eta)}")
+        return " · ".join(parties)
+
+
+class ProgressTracker:
+    """Compte octets et échanges, et transmet un Progress à `callback` à intervalle fixe
+
+    La position dans le fichier en cours vient soit de l'échange signalé
+    (`exchange(offset)`), soit d'une source suivie (`follow`), consultée
+    seulement au moment d'émettre. `checkpoint` (voir chatsplit.control) est
+    appelé au plus toutes les CHECK_INTERVAL secondes ; `callback` peut être
+    None si seuls les points de contrôle sont utiles.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[Progress], None]],
+        bytes_total: int = 0,
+        files_total: int = 0,
+        interval: float = DEFAULT_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ):
+        self.callback = callback
+        self.checkpoint = checkpoint
+        self.bytes_total = bytes_total
+        self.files_total = files_total
+        self.interval = interval
+        self.clock = clock
+        self.bytes_done = 0  # fichiers terminés
+        self.exchanges = 0
+        self.files_done = 0
+        self.current_file = ""
+        self._debut = clock()
+        self._prochaine = self._debut + interval
+        self._prochain_controle = self._debut
+        self._position = 0
+        self._source: Optional[Callable[[], int]] = None
+
+    def start_file(self, nom: str):
+        self.current_file = nom
+        self._position = 0
+        self._source = None
+
+    def follow(self, source: Callable[[], int]):
+        """Position dans le fichier en cours, lue au moment d'émettre"""
+        self._source = source
+
+    def follow_file(self, f: IO):
+        """Suit un fichier ouvert : position du descripteur, à la taille du tampon près"""
+        self.follow(partial(os.lseek, f.fileno(), 0, os.SEEK_CUR))
+
+    def exchange(self, offset: Optional[int] = None, count: int = 1):
+        """Signale `count` échanges découpés, jusqu'à la position `offset` du fichier"""
+        self.exchanges += count
+        if offset is not None:
+            self._position = offset
+        maintenant = self.clock()
+        if self.checkpoint is not None and maintenant >= self._prochain_controle:
+            self._prochain_controle = maintenant + CHECK_INTERVAL
+            self.checkpoint()
+        if maintenant >= self._prochaine:
+            self.emit()
+
+    def end_file(self, taille: int, exchanges: int = 0):
+        """Fichier terminé ; `exchanges` s'ajoute aux échanges déjà signalés"""
+        self.bytes_done += taille
+        self.exchanges += exchanges
+        self.files_done += 1
+        self.start_file("")
+        if self.clock() >= self._prochaine:
+            self.emit()
+
+    def snapshot(self) -> Progress:
+        position = self._position
+        if self._source is not None:
+            try:
+                position = self._source()
+            except (OSError, ValueError):  # fichier déjà fermé
+                pass
+        return Progress(
+            self.bytes_done + position,
+            self.bytes_total,
+            self.exchanges,
+            self.files_done,
+            self.files_total,
+            self.clock() - self._debut,
+            self.current_file,
+        )
+
+    def emit(self):
+        self._prochaine = self.clock() + self.interval
+        if self.callback is not None:
+            self.callback(self.snapshot())
+
+    def finish(self):
+        """Dernière émission, quel que soit l'intervalle"""
+        self.emit()
@@ -0,0 +1,211 @@
+"""Mise en place atomique d'un dossier de sortie
+
+Le job écrit dans un dossier temporaire voisin du dossier de sortie (même
+système de fichiers), puis le met à sa place : un lecteur voit l'ancien
+dossier ou le nouveau, jamais un dossier à moitié écrit ou à moitié vidé.
+Sous Linux, les deux dossiers sont échangés en un seul appel système
+(renameat2 avec RENAME_EXCHANGE) et le dossier de sortie existe à tout
+instant ; ailleurs, ou si le système de fichiers ne le permet pas, l'ancien
+dossier est renommé à côté puis le nouveau mis à sa place, et le dossier de
+sortie est absent entre ces deux renommages. L'ancien dossier est supprimé
+dans un thread, quelle que soit la taille de l'arborescence.
+
+Les fichiers (archive du jour) sont remplacés de la même façon : écrits
+sous un nom temporaire voisin, puis renommés à leur place (`replacing_file`).
+
+Les dossiers temporaires d'un passage interrompu (arrêt brutal) sont
+supprimés au passage suivant. Le nom d'un dossier temporaire porte le
+serveur et le processus qui l'écrit : celui d'un job encore en cours n'est
+jamais supprimé, seulement celui d'un processus disparu, ou d'un autre
+serveur après STALE_AFTER secondes sans modification.
+"""
+
+import ctypes
+import errno
+import logging
+import os
+import secrets
+import shutil
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger("filchat")
+
+_STAGING = "staging"
+_TRASH = "trash"
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+# âge (s) au-delà duquel un dossier temporaire dont le processus ne peut
+# être vérifié (autre serveur, Windows) est considéré comme abandonné
+STALE_AFTER = 24 * 3600
+
+
+def _sibling_prefix(output_dir: str, kind: str) -> str:
+    """Préfixe des dossiers cachés voisins : '.output.staging-', '.output.trash-'"""
+    return f".{os.path.basename(os.path.abspath(output_dir))}.{kind}-"
+
+
+def _unique_sibling(path: str, kind: str, owner: str = "") -> str:
+    """Chemin libre d'un dossier caché voisin de `path`"""
+    parent = os.path.dirname(os.path.abspath(path))
+    while True:
+        candidat = os.path.join(
+            parent, _sibling_prefix(path, kind) + secrets.token_hex(4) + owner
+        )
+        if not os.path.exists(candidat):
+            return candidat
+
+
+def _owner() -> str:
+    """Suffixe identifiant le processus propriétaire : '-<pid>-<serveur>'"""
+    return f"-{os.getpid()}-{socket.gethostname()}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_abandoned(path: str, suffixe: str) -> bool:
+    """Vrai si le job qui écrivait le dossier temporaire `path` n'existe plus"""
+    _, _, owner = suffixe.partition("-")
+    pid, _, serveur = owner.partition("-")
+    # le signal 0 n'existe pas sous Windows : on s'en tient à l'âge
+    if pid.isdigit() and serveur == socket.gethostname() and os.name != "nt":
+        return not _process_alive(int(pid))
+    try:
+        return time.time() - os.path.getmtime(path) > STALE_AFTER
+    except OSError:
+        return False
+
+
+def _remove(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+    logger.debug(f"Dossier '{path}' supprimé")
+
+
+def remove_in_background(path: str) -> threading.Thread:
+    """Supprime `path` dans un thread ; le processus attend sa fin avant de quitter"""
+    thread = threading.Thread(target=_remove, args=(path,), name="filchat-rmtree")
+    thread.start()
+    return thread
+
+
+def discard_tree(path: str) -> Optional[threading.Thread]:
+    """Écarte `path` aussitôt (renommage) et le supprime en arrière-plan
+
+    Retourne le thread de suppression, ou None si `path` n'existe pas.
+    """
+    if not os.path.exists(path):
+        return None
+    corbeille = _unique_sibling(path, _TRASH)
+    os.rename(path, corbeille)
+    return remove_in_background(corbeille)
+
+
+def remove_stale(output_dir: str):
+    """Supprime en arrière-plan les dossiers temporaires laissés par un passage interrompu
+
+    Les corbeilles sont toujours supprimées ; un dossier de travail seulement
+    si son job n'existe plus (voir `_is_abandoned`).
+    """
+    parent = os.path.dirname(os.path.abspath(output_dir))
+    staging = _sibling_prefix(output_dir, _STAGING)
+    trash = _sibling_prefix(output_dir, _TRASH)
+    for nom in os.listdir(parent):
+        chemin = os.path.join(parent, nom)
+        if nom.startswith(trash) or (
+            nom.startswith(staging) and _is_abandoned(chemin, nom[len(staging) :])
+        ):
+            logger.info(f"Suppression du dossier temporaire abandonné '{nom}'")
+            remove_in_background(chemin)
+
+
+def make_staging_dir(output_dir: str) -> str:
+    """Crée un dossier temporaire vide à côté de `output_dir`"""
+    os.makedirs(os.path.dirname(os.path.abspath(output_dir)), exist_ok=True)
+    remove_stale(output_dir)
+    staging = _unique_sibling(output_dir, _STAGING, _owner())
+    os.mkdir(staging)
+    return staging
+
+
+def _load_renameat2():
+    """Fonction renameat2 de la libc (Linux, glibc 2.28 et suivantes), ou None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        fonction = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    fonction.argtypes = [
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_int,
+        ctypes.c_char_p,
+        ctypes.c_uint,
+    ]
+    fonction.restype = ctypes.c_int
+    return fonction
+
+
+_renameat2 = _load_renameat2()
+
+
+def exchange(a: str, b: str) -> bool:
+    """Échange atomiquement les chemins `a` et `b` ; False si le système ne le permet pas"""
+    if _renameat2 is None:
+        return False
+    chemins = (os.fsencode(a), os.fsencode(b))
+    if _renameat2(_AT_FDCWD, chemins[0], _AT_FDCWD, chemins[1], _RENAME_EXCHANGE) == 0:
+        return True
+    erreur = ctypes.get_errno()
+    # noyau ou système de fichiers sans RENAME_EXCHANGE
+    if erreur in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP):
+        return False
+    raise OSError(erreur, os.strerror(erreur), b)
+
+
+def swap_into_place(staging: str, output_dir: str) -> Optional[threading.Thread]:
+    """Met `staging` à la place de `output_dir`, dont l'ancien contenu est supprimé en arrière-plan
+
+    L'échange est atomique si `exchange` est possible ; sinon `output_dir`
+    manque un court instant. Retourne le thread de suppression de l'ancien
+    dossier, ou None.
+    """
+    if os.path.exists(output_dir) and exchange(staging, output_dir):
+        # `staging` désigne maintenant l'ancien dossier
+        return discard_tree(staging)
+    suppression = discard_tree(output_dir)
+    os.rename(staging, output_dir)
+    return suppression
+
+
+@contextmanager
+def replacing_file(path: str) -> Iterator[str]:
+    """Chemin temporaire voisin de `path`, mis à sa place à la fin du bloc
+
+    Le fichier temporaire remplace `path` (os.replace, atomique) si le bloc
+    se termine normalement ; il est supprimé sinon (erreur, annulation), et
+    `path` reste intact.
+    """
+    dossier, nom = os.path.split(os.path.abspath(path))
+    temporaire = os.path.join(dossier, f".{nom}.{secrets.token_hex(4)}.tmp")
+    try:
+        yield temporaire
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    os.replace(temporaire, path)
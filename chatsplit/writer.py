@@ -0,0 +1,208 @@
+"""Ecriture groupée des fichiers Markdown d'un job
+
+La date et les morceaux fixes du gabarit sont calculés une seule fois par
+job. Les documents sont encodés puis accumulés, et écrits par lots : un
+fichier coûte alors un open, un write et un close, sans objet fichier
+Python intermédiaire. Les variantes ZIP et tar écrivent tous les échanges
+dans un conteneur unique lorsque les fichiers isolés ne sont pas utiles.
+"""
+
+import io
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Optional, Tuple
+
+from chatsplit.archive import (compress_member, parallel_supported,
+                               write_compressed)
+from chatsplit.markdown import MARKDOWN_TEMPLATE
+
+DEFAULT_BATCH_SIZE = 256
+_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+class MarkdownWriter:
+    """Ecrit les échanges en fichiers Markdown sous `destination`"""
+
+    def __init__(
+        self,
+        destination: str,
+        jour: Optional[date] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.destination = destination
+        self.jour = jour or date.today()
+        self.batch_size = batch_size
+        self.files_written = 0
+        self.bytes_written = 0
+        self.write_seconds = 0.0  # temps passé à écrire (et compresser) les lots
+        self._lot: List[Tuple[str, bytes]] = []
+        self._dossiers_crees = set()
+
+        self._prefixe_nom = self.jour.strftime("%Y%m%d")
+        modele = MARKDOWN_TEMPLATE.format(
+            date=self.jour.strftime("%Y-%m-%d"), question="\0", answer="\0"
+        )
+        self._entete, self._milieu, self._fin = modele.split("\0")
+
+    def filename(self, index: int) -> str:
+        """Nom du fichier Markdown d'un échange : 'YYYYMMDD-NNN.md'"""
+        return f"{self._prefixe_nom}-{index:03d}.md"
+
+    def render(self, question: str, answer: str) -> str:
+        return "".join((self._entete, question, self._milieu, answer, self._fin))
+
+    def write(self, chemin_relatif: str, question: str, answer: str):
+        """Ajoute un échange au lot ; le lot est écrit dès qu'il est plein"""
+        self.add(chemin_relatif, self.render(question, answer).encode("utf-8"))
+
+    def add(self, chemin_relatif: str, contenu: bytes):
+        """Ajoute un contenu déjà encodé au lot"""
+        self._lot.append((chemin_relatif, contenu))
+        if len(self._lot) >= self.batch_size:
+            self._timed_flush()
+
+    def _timed_flush(self):
+        debut = time.perf_counter()
+        self.flush()
+        self.write_seconds += time.perf_counter() - debut
+
+    def flush(self):
+        lot, self._lot = self._lot, []
+        for chemin_relatif, contenu in lot:
+            self._write_one(chemin_relatif, contenu)
+            self.files_written += 1
+            self.bytes_written += len(contenu)
+
+    def _write_one(self, chemin_relatif: str, contenu: bytes):
+        chemin = os.path.join(self.destination, chemin_relatif)
+        dossier = os.path.dirname(chemin)
+        if dossier not in self._dossiers_crees:
+            os.makedirs(dossier, exist_ok=True)
+            self._dossiers_crees.add(dossier)
+        fd = os.open(chemin, _OPEN_FLAGS, 0o644)
+        try:
+            vue = memoryview(contenu)
+            while vue:
+                vue = vue[os.write(fd, vue):]
+        finally:
+            os.close(fd)
+
+    @property
+    def created_dirs(self) -> List[str]:
+        """Dossiers créés par ce writer (chemins complets)"""
+        return sorted(self._dossiers_crees)
+
+    def close(self):
+        self._timed_flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def default_threads() -> int:
+    """Nombre de threads de compression par défaut : un par cœur"""
+    return os.cpu_count() or 1
+
+
+class ZipMarkdownWriter(MarkdownWriter):
+    """Ecrit les échanges directement dans une archive ZIP `destination`
+
+    Avec `threads` > 1, les membres d'un lot sont compressés en parallèle
+    dans un pool de threads puis écrits dans l'ordre du lot (si la version
+    de zipfile le permet, voir `parallel_supported`).
+    """
+
+    def __init__(
+        self,
+        destination: str,
+        jour: Optional[date] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        compression: int = zipfile.ZIP_DEFLATED,
+        compresslevel: Optional[int] = None,
+        threads: int = 1,
+    ):
+        super().__init__(destination, jour, batch_size)
+        self._date_time = time.localtime()[:6]
+        self._compression = compression
+        self._compresslevel = compresslevel
+        self._zipf = zipfile.ZipFile(
+            destination, "w", compression, compresslevel=compresslevel
+        )
+        self._pool = None
+        if (
+            threads > 1
+            and compression != zipfile.ZIP_STORED
+            and parallel_supported(self._zipf)
+        ):
+            self._pool = ThreadPoolExecutor(threads, thread_name_prefix="zip")
+
+    def _zipinfo(self, chemin_relatif: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(chemin_relatif.replace(os.sep, "/"), self._date_time)
+        info.compress_type = self._compression
+        info.external_attr = 0o644 << 16
+        return info
+
+    def _compress(self, membre: Tuple[str, bytes]):
+        chemin_relatif, contenu = membre
+        return compress_member(self._zipinfo(chemin_relatif), contenu, self._compresslevel)
+
+    def flush(self):
+        if self._pool is None or len(self._lot) < 2:
+            return super().flush()
+
+        lot, self._lot = self._lot, []
+        # map conserve l'ordre du lot : l'archive est la même qu'en séquentiel
+        for info, donnees in self._pool.map(self._compress, lot):
+            write_compressed(self._zipf, info, donnees)
+            self.files_written += 1
+            self.bytes_written += info.file_size
+
+    def _write_one(self, chemin_relatif: str, contenu: bytes):
+        self._zipf.writestr(
+            self._zipinfo(chemin_relatif), contenu, compresslevel=self._compresslevel
+        )
+
+    def close(self):
+        try:
+            super().close()
+            self._zipf.close()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+
+class TarMarkdownWriter(MarkdownWriter):
+    """Ecrit les échanges dans une archive tar (`mode` : 'w', 'w:gz', 'w:xz'…)"""
+
+    def __init__(
+        self,
+        destination: str,
+        jour: Optional[date] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        mode: str = "w",
+        fileobj=None,
+    ):
+        super().__init__(destination, jour, batch_size)
+        self._mtime = time.time()
+        if fileobj is not None:
+            self._tarf = tarfile.open(fileobj=fileobj, mode=mode)
+        else:
+            self._tarf = tarfile.open(destination, mode)
+
+    def _write_one(self, chemin_relatif: str, contenu: bytes):
+        info = tarfile.TarInfo(chemin_relatif.replace(os.sep, "/"))
+        info.size = len(contenu)
+        info.mtime = self._mtime
+        info.mode = 0o644
+        self._tarf.addfile(info, io.BytesIO(contenu))
+
+    def close(self):
+        super().close()
+        self._tarf.close()
@@ -0,0 +1,89 @@
+"""Configuration des bases de données
+
+DATABASE_PROFILE choisit la base "default" (voir `database_from_env`) :
+SQLite sur un seul serveur, ou PostgreSQL pour répartir le site et les
+workers FilChat sur plusieurs serveurs.
+
+SQLite en production : plusieurs workers gunicorn et le worker FilChat
+écrivent dans la même base. Le journal WAL laisse les lectures se faire
+pendant une écriture, les transactions démarrent en mode IMMEDIATE (le
+verrou d'écriture est pris au BEGIN, ce qui évite les « database is
+locked » immédiats au passage de la lecture à l'écriture) et un écrivain
+attend jusqu'à SQLITE_TIMEOUT secondes que le verrou se libère.
+
+PostgreSQL : les connexions de chaque processus sont prises dans un pool
+psycopg (``uv sync --extra postgres``), partagé par ses threads.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+
+from config import env
+
+DATABASE_PROFILES = ("sqlite", "postgres")
+
+SQLITE_TIMEOUT = 20  # secondes d'attente du verrou (busy_timeout)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    # avec WAL, NORMAL ne perd aucune donnée en cas d'arrêt du processus
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,  # en Kio : 20 Mo par connexion
+    "journal_size_limit": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_init_command(pragmas=None):
+    """PRAGMA exécutés à l'ouverture de chaque connexion"""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    return " ".join(f"PRAGMA {nom}={valeur};" for nom, valeur in pragmas.items())
+
+
+def sqlite_database(name, conn_max_age=600):
+    """Entrée de DATABASES pour une base SQLite réglée pour plusieurs processus
+
+    Les connexions sont gardées `conn_max_age` secondes d'une requête à la
+    suivante (CONN_MAX_AGE), vérifiées avant réutilisation.
+    """
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "CONN_MAX_AGE": conn_max_age,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": sqlite_init_command(),
+            "transaction_mode": "IMMEDIATE",
+            "timeout": SQLITE_TIMEOUT,
+        },
+    }
+
+
+def postgres_database(url, pool_min_size=2, pool_max_size=10, pool_timeout=10.0):
+    """Entrée de DATABASES pour PostgreSQL (URL postgres://...) avec un pool de connexions"""
+    config = env.db_url_config(url)
+    # le pool remplace les connexions persistantes (CONN_MAX_AGE doit valoir 0)
+    config["CONN_MAX_AGE"] = 0
+    config.setdefault("OPTIONS", {})["pool"] = {
+        "min_size": pool_min_size,
+        "max_size": pool_max_size,
+        "timeout": pool_timeout,
+    }
+    return config
+
+
+def database_from_env(sqlite):
+    """Base "default" selon DATABASE_PROFILE : `sqlite`, ou PostgreSQL décrit par DATABASE_URL"""
+    profil = env("DATABASE_PROFILE")
+    if profil == "sqlite":
+        return sqlite
+    if profil == "postgres":
+        return postgres_database(
+            env("DATABASE_URL"),
+            pool_min_size=env("DATABASE_POOL_MIN_SIZE"),
+            pool_max_size=env("DATABASE_POOL_MAX_SIZE"),
+            pool_timeout=env("DATABASE_POOL_TIMEOUT"),
+        )
+    raise ImproperlyConfigured(
+        f"DATABASE_PROFILE inconnu : {profil} (connus : {', '.join(DATABASE_PROFILES)})"
+    )
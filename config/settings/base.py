@@ -23,11 +23,6 @@ SECRET_KEY = env("DJANGO_SECRET_KEY")
 
 WAGTAIL_SITE_NAME = env("WAGTAIL_SITE_NAME")
 WAGTAILADMIN_BASE_URL = "/"
-WAGTAILFRONTENDCACHE = {
-    'default': {
-        'BACKEND': 'wagtail.cache.backends.database.DatabaseCache',
-    }
-}
 
 # Application definition
 
@@ -90,6 +85,7 @@ DJANGO_MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_browser_reload.middleware.BrowserReloadMiddleware",
+    "core.middleware.PageCacheMiddleware",
 ]
 
 TIERS_MIDDLEWARE = [
@@ -170,4 +166,43 @@ COMPRESS_ROOT = STATIC_ROOT
 
 # Media
 MEDIA_URL = "/media/"
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# sur plusieurs serveurs, MEDIA_ROOT et CACHE_DIR doivent être partagés (NFS...)
+MEDIA_ROOT = env("MEDIA_ROOT", default=os.path.join(BASE_DIR, 'media'))
+CACHE_DIR = env("CACHE_DIR", default=os.path.join(BASE_DIR, "cache"))
+
+# FilChat
+# Taille maximale d'un morceau lors de l'envoi par morceaux (/filchat/upload/)
+FILCHAT_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+# Délai (s) après lequel un envoi par morceaux inactif est supprimé
+FILCHAT_UPLOAD_TTL = 24 * 3600
+# Taille maximale des résultats conservés dans media/output (cache par empreinte)
+FILCHAT_OUTPUT_CACHE_MAX_SIZE = 1024 * 1024 * 1024
+
+# Core
+# Durée de conservation (s) du site, du menu et du pied de page en cache (core.cache)
+CORE_CHROME_CACHE_TIMEOUT = 300
+# Pages Wagtail complètes servies aux visiteurs anonymes (core.pagecache)
+CORE_PAGE_CACHE_ENABLED = True
+# Pages d'erreur pré-rendues, servies sans base de données (core.errorpages)
+CORE_ERROR_PAGES_DIR = os.path.join(CACHE_DIR, "errors")
+
+# Caches
+# "pages-memory" : pages en mémoire du processus ; "pages" : pages en fichiers,
+# partagées par les processus, qui portent aussi les purges (core.pagecache)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "pages-memory": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pages",
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 500},
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "pages"),
+        "TIMEOUT": 24 * 3600,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
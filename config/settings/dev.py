@@ -1,5 +1,7 @@
 # config.settings.dev.py
 
+from config.database import database_from_env
+
 from .base import *
 
 DEBUG = True
@@ -9,9 +11,13 @@ ENVIRONMENT = "dev"
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
 INTERNAL_IPS = ["127.0.0.1",]
 
+# la barre de debug et le rechargement auto modifient les pages servies
+CORE_PAGE_CACHE_ENABLED = False
+
+# DATABASE_PROFILE=postgres pour tester avec un PostgreSQL local (voir README)
 DATABASES = {
-    "default": {
+    "default": database_from_env({
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    }),
 }
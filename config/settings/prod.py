@@ -1,4 +1,6 @@
 # config.settings.prod.py
+from config.database import database_from_env, sqlite_database
+
 from .base import *
 
 DEBUG = False
@@ -7,11 +9,10 @@ ENVIRONMENT = "prod"
 
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
 
+# SQLite réglé (WAL, busy timeout, connexions persistantes) ou PostgreSQL
+# avec DATABASE_PROFILE=postgres (voir config.database)
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": "/var/lib/secretbox/db.sqlite3",
-    }
+    "default": database_from_env(sqlite_database("/var/lib/secretbox/db.sqlite3")),
 }
 
 SECURE_BROWSER_XSS_FILTER = True
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = "core"
+
+    def ready(self):
+        # invalidation du cache des éléments communs à toutes les pages
+        from core import signals  # noqa: F401
@@ -0,0 +1,107 @@
+"""Cache des éléments communs à toutes les pages : site, menu et pied de page
+
+Chaque élément est rangé dans le cache Django sous une clé qui comprend le
+site, la langue active et un numéro de génération. Publier ou dépublier le
+pied de page ou une page, déplacer une page ou modifier un Site change la
+génération (voir core.signals) : toutes les entrées sont alors ignorées
+d'un coup, sans avoir à les énumérer.
+
+Les éléments restent dans le cache par défaut, en mémoire de chaque
+processus ; la génération est gardée dans le cache fichier ``pages``,
+commun à tous les processus (et à tous les serveurs si CACHE_DIR est
+partagé) : un changement est vu aussitôt par tous, et une page mise en
+cache par core.pagecache ne peut pas reprendre un menu périmé.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http.request import split_domain_port
+from django.utils import translation
+from wagtail.models import Site
+
+from core.footer_models import FooterText
+
+PREFIX = "core:chrome"
+GENERATION_KEY = f"{PREFIX}:generation"
+GENERATION_ALIAS = "pages"  # cache commun à tous les processus
+
+
+def timeout():
+    return getattr(settings, "CORE_CHROME_CACHE_TIMEOUT", 300)
+
+
+def _shared():
+    return caches[GENERATION_ALIAS]
+
+
+def generation():
+    valeur = _shared().get(GENERATION_KEY)
+    if valeur is None:
+        valeur = time.time_ns()
+        _shared().add(GENERATION_KEY, valeur, None)
+        valeur = _shared().get(GENERATION_KEY, valeur)
+    return valeur
+
+
+def invalidate():
+    """Rend périmées toutes les entrées du cache, dans tous les processus"""
+    _shared().set(GENERATION_KEY, time.time_ns(), None)
+
+
+def cached(nom, cle, calcul):
+    """Valeur `nom` pour `cle`, calculée par `calcul()` au premier appel"""
+    cle_cache = f"{PREFIX}:{generation()}:{nom}:{cle}"
+    entree = cache.get(cle_cache)
+    if entree is None:
+        # emballée dans un tuple : None ou "" sont des valeurs à conserver
+        entree = (calcul(),)
+        cache.set(cle_cache, entree, timeout())
+    return entree[0]
+
+
+def find_site(request):
+    """Comme Site.find_for_request, sans requête SQL une fois le site en cache"""
+    if request is None:
+        return None
+    if not hasattr(request, "_wagtail_site"):
+        hote = split_domain_port(request._get_raw_host())[0]
+        request._wagtail_site = cached(
+            "site", f"{hote}:{request.get_port()}", lambda: Site.find_for_request(request)
+        )
+    return request._wagtail_site
+
+
+def _context_key(request):
+    site = find_site(request)
+    return f"{site.pk if site else 0}:{translation.get_language() or ''}"
+
+
+def site_root(request):
+    site = find_site(request)
+    return site.root_page if site else None
+
+
+def menu_items(request, parent):
+    """Pages filles publiées de `parent` à afficher dans le menu"""
+    if parent is None:
+        return []
+    return cached(
+        "menu",
+        f"{_context_key(request)}:{parent.pk}",
+        lambda: list(parent.get_children().live().in_menu()),
+    )
+
+
+def _load_footer_text():
+    publies = FooterText.objects.filter(live=True)
+    instance = (
+        publies.filter(locale__language_code=translation.get_language()).first()
+        or publies.first()
+    )
+    return instance.body if instance else ""
+
+
+def footer_text(request):
+    """Texte du pied de page publié, dans la langue active si elle existe"""
+    return cached("footer", _context_key(request), _load_footer_text)
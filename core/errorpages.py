@@ -0,0 +1,135 @@
+"""Pages d'erreur (403, 404, 500) pré-rendues en HTML statique
+
+Chaque page d'erreur est rendue une fois, pour un visiteur anonyme du site
+par défaut, et enregistrée dans CORE_ERROR_PAGES_DIR ; elle est rendue à
+nouveau quand une page d'erreur, le menu ou le pied de page est publié
+(voir core.signals) ou par ``manage.py render_error_pages``.
+
+Les vues d'erreur servent le fichier gardé en mémoire, relu seulement si un
+autre processus l'a réécrit : aucune requête SQL ni rendu de gabarit, même
+quand l'erreur vient d'une base indisponible. Si la page n'a jamais été
+rendue et que la base ne répond pas, une page minimale est servie.
+"""
+
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from wagtail.models import Site
+
+from core.models import Custom403Page, Custom404Page, Custom500Page
+
+logger = logging.getLogger("core")
+
+MODELS = {
+    403: Custom403Page,
+    404: Custom404Page,
+    500: Custom500Page,
+}
+TITLES = {
+    403: "403 - Section interdite",
+    404: "404 - Page non trouvée",
+    500: "500 - Erreur serveur",
+}
+RETRY_DELAY = 60  # secondes entre deux essais de rendu en échec
+
+_pages = {}  # code -> (date de modification du fichier, contenu)
+_echecs = {}  # code -> instant du dernier rendu en échec
+
+
+def directory():
+    return getattr(
+        settings,
+        "CORE_ERROR_PAGES_DIR",
+        os.path.join(settings.BASE_DIR, "cache", "errors"),
+    )
+
+
+def path(code):
+    return os.path.join(directory(), f"{code}.html")
+
+
+def fallback(code):
+    """Page minimale, sans gabarit ni base de données"""
+    return (
+        '<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8">'
+        f"<title>{TITLES[code]}</title></head>"
+        f'<body><h1>{TITLES[code]}</h1><p><a href="/">Retour à l\'accueil</a></p>'
+        "</body></html>"
+    ).encode("utf-8")
+
+
+def _request(site):
+    """Requête anonyme sur la racine du site, pour le rendu hors requête"""
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = "/"
+    request.META = {
+        "SERVER_NAME": site.hostname if site else "localhost",
+        "SERVER_PORT": str(site.port if site else 80),
+    }
+    request._wagtail_site = site
+    request.user = AnonymousUser()
+    return request
+
+
+def render(code):
+    site = Site.objects.filter(is_default_site=True).first()
+    page = MODELS[code].objects.live().first()
+    return render_to_string(f"{code}.html", {"page": page}, request=_request(site))
+
+
+def build(code):
+    """Rend la page d'erreur `code` et l'enregistre ; retourne son contenu"""
+    contenu = render(code).encode("utf-8")
+    os.makedirs(directory(), exist_ok=True)
+    temporaire = f"{path(code)}.{os.getpid()}.tmp"
+    with open(temporaire, "wb") as f:
+        f.write(contenu)
+    # remplacement atomique : un autre processus lit l'ancienne page ou la nouvelle
+    os.replace(temporaire, path(code))
+    _pages[code] = (os.stat(path(code)).st_mtime_ns, contenu)
+    _echecs.pop(code, None)
+    return contenu
+
+
+def build_all():
+    for code in MODELS:
+        try:
+            build(code)
+        except Exception:
+            logger.exception(f"Rendu de la page d'erreur {code} impossible")
+
+
+def content(code):
+    """HTML de la page d'erreur `code`"""
+    try:
+        date = os.stat(path(code)).st_mtime_ns
+    except FileNotFoundError:
+        date = None
+
+    if date is not None:
+        entree = _pages.get(code)
+        if entree is None or entree[0] != date:
+            with open(path(code), "rb") as f:
+                entree = (date, f.read())
+            _pages[code] = entree
+        return entree[1]
+
+    # jamais rendue : premier rendu, sauf si le précédent vient d'échouer
+    if time.monotonic() - _echecs.get(code, -RETRY_DELAY) < RETRY_DELAY:
+        return fallback(code)
+    try:
+        return build(code)
+    except Exception:
+        logger.exception(f"Rendu de la page d'erreur {code} impossible")
+        _echecs[code] = time.monotonic()
+        return fallback(code)
+
+
+def response(code):
+    return HttpResponse(content(code), status=code)
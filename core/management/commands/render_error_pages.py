@@ -0,0 +1,13 @@
+#core.management.commands.render_error_pages.py
+from django.core.management.base import BaseCommand
+
+from core import errorpages
+
+
+class Command(BaseCommand):
+    help = "Rend les pages d'erreur en HTML statique (à lancer à chaque déploiement)"
+
+    def handle(self, *args, **options):
+        for code in errorpages.MODELS:
+            errorpages.build(code)
+            self.stdout.write(f"{errorpages.path(code)} écrit")
@@ -0,0 +1,15 @@
+from core import pagecache
+
+
+class PageCacheMiddleware:
+    """Sert les pages Wagtail en cache aux visiteurs anonymes (core.pagecache)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = pagecache.fetch(request)
+        if response is None:
+            response = self.get_response(request)
+            pagecache.store(request, response)
+        return response
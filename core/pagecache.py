@@ -0,0 +1,157 @@
+"""Cache des pages Wagtail complètes, servies aux visiteurs anonymes
+
+Une page servie par Wagtail à un visiteur anonyme (requête GET, sans cookie
+de session) est conservée en deux niveaux : en mémoire dans le processus
+(cache ``pages-memory``) et dans des fichiers partagés par tous les
+processus (cache ``pages``). Les visites suivantes sont servies par
+PageCacheMiddleware avant le routage Wagtail, sans requête SQL.
+
+Les clés comprennent une génération globale et une génération par page,
+lues dans le cache fichier : publier ou dépublier une page change sa
+génération et celle de ses ancêtres (purge de la page), et un changement commun à toutes les pages
+(menu, pied de page, site) change la génération globale (voir core.signals).
+
+Le jeton CSRF des formulaires est remplacé à l'enregistrement par un
+marqueur, puis par le jeton du visiteur à chaque service de la page.
+"""
+
+import hashlib
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+MEMORY_ALIAS = "pages-memory"
+FILE_ALIAS = "pages"
+PREFIX = "core:page"
+GENERATION_KEY = f"{PREFIX}:generation"
+
+CSRF_PLACEHOLDER = b"__core_page_cache_csrf__"
+_CSRF_INPUT = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def enabled():
+    return getattr(settings, "CORE_PAGE_CACHE_ENABLED", True)
+
+
+def _memory():
+    return caches[MEMORY_ALIAS]
+
+
+def _file():
+    return caches[FILE_ALIAS]
+
+
+def _get(cle):
+    """Lecture en mémoire, puis dans le cache fichier"""
+    valeur = _memory().get(cle)
+    if valeur is None:
+        valeur = _file().get(cle)
+        if valeur is not None:
+            _memory().set(cle, valeur)
+    return valeur
+
+
+def _set(cle, valeur):
+    _memory().set(cle, valeur)
+    _file().set(cle, valeur)
+
+
+def _generation(cle):
+    """Génération lue dans le cache fichier, commun à tous les processus"""
+    valeur = _file().get(cle)
+    if valeur is None:
+        _file().add(cle, time.time_ns(), None)
+        valeur = _file().get(cle)
+    return valeur
+
+
+def purge_page(page):
+    """Périme les entrées d'une page et de ses ancêtres, pour toutes leurs URL
+
+    Une page parente peut afficher ses pages filles (titre, extrait, lien) :
+    elle est purgée avec elles.
+    """
+    generation = time.time_ns()
+    pages = [page.pk, *page.get_ancestors().values_list("pk", flat=True)]
+    _file().set_many({f"{GENERATION_KEY}:{pk}": generation for pk in pages}, None)
+
+
+def purge_all():
+    """Périme toutes les pages en cache"""
+    _file().set(GENERATION_KEY, time.time_ns(), None)
+
+
+def is_anonymous(request):
+    # sans cookie de session ni message en attente : aucune lecture en base
+    return not (
+        settings.SESSION_COOKIE_NAME in request.COOKIES or "messages" in request.COOKIES
+    )
+
+
+def _url_key(request):
+    url = f"{request.get_host()}{request.get_full_path()}"
+    return f"{PREFIX}:url:{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+
+
+def _content_key(url_key, page_id):
+    page_generation = _generation(f"{GENERATION_KEY}:{page_id}")
+    return f"{url_key}:{_generation(GENERATION_KEY)}:{page_id}:{page_generation}"
+
+
+def accepts(request):
+    return enabled() and request.method in ("GET", "HEAD") and is_anonymous(request)
+
+
+def mark(request, page):
+    """Signale que la réponse en cours est la page Wagtail `page` (hook before_serve_page)"""
+    if accepts(request) and not page.get_view_restrictions().exists():
+        request._page_cache_page = page
+
+
+def fetch(request):
+    """Réponse en cache pour cette requête, ou None"""
+    if not accepts(request):
+        return None
+    url_key = _url_key(request)
+    page_id = _get(url_key)
+    if page_id is None:
+        return None
+    entree = _get(_content_key(url_key, page_id))
+    if entree is None:
+        return None
+
+    content_type, contenu = entree
+    if CSRF_PLACEHOLDER in contenu:
+        contenu = contenu.replace(CSRF_PLACEHOLDER, get_token(request).encode("ascii"))
+    response = HttpResponse(contenu, content_type=content_type)
+    response["X-Page-Cache"] = "hit"
+    return response
+
+
+def store(request, response):
+    """Conserve la réponse si c'est une page Wagtail publique et réutilisable"""
+    page = getattr(request, "_page_cache_page", None)
+    if page is None or request.method != "GET":
+        return
+    if response.status_code != 200 or response.streaming:
+        return
+    # un cookie autre que le jeton CSRF rend la réponse propre au visiteur
+    if set(response.cookies) - {settings.CSRF_COOKIE_NAME}:
+        return
+    if "private" in response.get("Cache-Control", "") or "no-store" in response.get(
+        "Cache-Control", ""
+    ):
+        return
+
+    contenu = _CSRF_INPUT.sub(rb"\1" + CSRF_PLACEHOLDER + rb"\2", response.content)
+    url_key = _url_key(request)
+    _set(url_key, page.pk)
+    _set(
+        _content_key(url_key, page.pk),
+        (response["Content-Type"], contenu),
+    )
+    response["X-Page-Cache"] = "miss"
@@ -0,0 +1,70 @@
+"""Invalidation du cache des éléments communs (core.cache) et des pages (core.pagecache)
+
+Les pages d'erreur pré-rendues (core.errorpages), qui affichent le menu et le
+pied de page, sont rendues à nouveau une fois la modification enregistrée.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.models import Page, Site
+from wagtail.signals import (page_published, page_unpublished, post_page_move,
+                             published, unpublished)
+
+from core import cache, errorpages, pagecache
+from core.footer_models import FooterText
+from core.models import CustomErrorPage
+
+
+def _rebuild_error_pages():
+    """Rend à nouveau les pages d'erreur une fois la transaction validée
+
+    Un seul rendu par transaction, même si plusieurs pages changent (suppression
+    d'une arborescence, par exemple).
+    """
+    en_attente = transaction.get_connection().run_on_commit
+    if not any(fonction is errorpages.build_all for _, fonction, _ in en_attente):
+        transaction.on_commit(errorpages.build_all)
+
+
+def _chrome_changed():
+    cache.invalidate()
+    pagecache.purge_all()
+    _rebuild_error_pages()
+
+
+@receiver(published, sender=FooterText)
+@receiver(unpublished, sender=FooterText)
+@receiver(post_delete, sender=FooterText)
+def footer_text_changed(sender, **kwargs):
+    _chrome_changed()
+
+
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+def site_changed(sender, **kwargs):
+    _chrome_changed()
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def page_changed(sender, instance, **kwargs):
+    if instance.show_in_menus or instance.is_site_root():
+        # titre ou visibilité d'une page affichée dans le menu de toutes les pages
+        _chrome_changed()
+    else:
+        # menu et pied de page inchangés : seules la page et ses ancêtres sont purgés
+        pagecache.purge_page(instance)
+        if isinstance(instance, CustomErrorPage):
+            _rebuild_error_pages()
+
+
+@receiver(post_page_move)
+def page_moved(sender, **kwargs):
+    # place dans le menu et URL de la page et de ses descendantes
+    _chrome_changed()
+
+
+@receiver(post_delete, sender=Page)
+def page_deleted(sender, **kwargs):
+    # envoyé pour la ligne Page de chaque page supprimée, quel que soit son type
+    _chrome_changed()
@@ -1,16 +1,24 @@
 from django import template
-# import site:
-from wagtail.models import Site
 
-from core.footer_models import FooterText
+from core import cache
 
 register = template.Library()
 
 
-# ... keep the definition of get_footer_text and add the get_site_root template tag:
+# site, menu et pied de page sont mis en cache par site et par langue (voir core.cache)
+@register.simple_tag(takes_context=True)
+def get_current_site(context):
+    return cache.find_site(context.get("request"))
+
+
 @register.simple_tag(takes_context=True)
 def get_site_root(context):
-    return Site.find_for_request(context["request"]).root_page
+    return cache.site_root(context.get("request"))
+
+
+@register.simple_tag(takes_context=True)
+def get_menu_items(context, parent):
+    return cache.menu_items(context.get("request"), parent)
 
 
 @register.inclusion_tag("base/footer_text.html", takes_context=True)
@@ -18,9 +26,8 @@ def get_footer_text(context):
     footer_text = context.get("footer_text", "")
 
     if not footer_text:
-        instance = FooterText.objects.filter(live=True).first()
-        footer_text = instance.body if instance else ""
+        footer_text = cache.footer_text(context.get("request"))
 
     return {
         "footer_text": footer_text,
-    }
\ No newline at end of file
+    }
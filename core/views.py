@@ -1,38 +1,29 @@
-from django.shortcuts import render
+from core import errorpages
 
-from .models import Custom404Page, Custom500Page
 
-
-def custom_error_view(request, exception, error_code=404, page=None):
+def custom_error_view(request, exception, error_code=404):
     """
-    Returns a different error view depending on the site.
+    Returns the pre-rendered error page (see core.errorpages).
     """
-    return render(
-        request,
-        f"{error_code}.html",
-        {'page': page},
-        status=error_code,
-    )
+    return errorpages.response(error_code)
 
 
 def custom_403_view(request, exception=None):
     """
-    Returns a different 403 view depending on the site.
+    Returns the pre-rendered 403 page.
     """
     return custom_error_view(request, exception, error_code=403)
 
 
 def custom_404_view(request, exception=None):
     """
-    Returns a different 404 view depending on the site.
-    """    
-    custom_404_page = Custom404Page.objects.first()
-    return custom_error_view(request, exception, error_code=404, page = custom_404_page)
+    Returns the pre-rendered 404 page, without any database query.
+    """
+    return custom_error_view(request, exception, error_code=404)
 
 
 def custom_500_view(request, exception=None):
     """
-    Returns a different 500 view depending on the site.
+    Returns the pre-rendered 500 page, also available when the database is down.
     """
-    custom_500_page = Custom500Page.objects.first()
-    return custom_error_view(request, exception, error_code=500, page = custom_500_page)
\ No newline at end of file
+    return custom_error_view(request, exception, error_code=500)
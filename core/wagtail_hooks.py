@@ -0,0 +1,9 @@
+from wagtail import hooks
+
+from core import pagecache
+
+
+@hooks.register("before_serve_page")
+def mark_page_cacheable(page, request, serve_args, serve_kwargs):
+    # la réponse sera conservée par PageCacheMiddleware si elle s'y prête
+    pagecache.mark(request, page)
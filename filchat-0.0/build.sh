@@ -44,6 +44,7 @@ pyinstaller --onefile \
     --name "$APP_NAME" \
     --add-data "README.md:." \
     --hidden-import "PySide6" \
+    --paths ".." \
     --clean \
     filchat.py
 
@@ -1,6 +1,5 @@
 import logging
 import os
-import shutil
 import sys
 import traceback
 import zipfile
@@ -12,6 +11,13 @@ from PySide6.QtWidgets import (QApplication, QCheckBox, QFileDialog,
                                QMessageBox, QPushButton, QTextEdit,
                                QVBoxLayout, QWidget)
 
+# Moteur de découpe partagé avec le site web (dossier chatsplit à la racine du dépôt)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chatsplit.parser import parse_chat_file
+from chatsplit.staging import (discard_tree, make_staging_dir, replacing_file,
+                               swap_into_place)
+from chatsplit.writer import MarkdownWriter
+
 # Force l'utilisation de X11
 os.environ["QT_QPA_PLATFORM"] = "xcb"
 
@@ -396,8 +402,9 @@ class MainWindow(QMainWindow):
 
 def verifier_ou_vider_output(dossier_output, force=False):
     """
-    Vérifie si le dossier output est vide ou le vide si force=True.
+    Vérifie si le dossier output est vide ou peut être remplacé (force=True).
     Lève une RuntimeError si le dossier n'est pas vide et force=False.
+    Le remplacement a lieu en fin de traitement (voir chatsplit.staging).
     """
     if not os.path.exists(dossier_output):
         logger.debug(f"Dossier '{dossier_output}' n'existe pas encore (OK)")
@@ -406,9 +413,7 @@ def verifier_ou_vider_output(dossier_output, force=False):
     contenu = os.listdir(dossier_output)
     if contenu:
         if force:
-            logger.info(f"Suppression du dossier '{dossier_output}' (force activé)")
-            shutil.rmtree(dossier_output)
-            logger.info(f"Dossier '{dossier_output}' vidé avec succès")
+            logger.info(f"Le dossier '{dossier_output}' sera remplacé (force activé)")
         else:
             logger.warning(f"Dossier '{dossier_output}' non vide et force=False")
             raise RuntimeError(
@@ -425,75 +430,27 @@ def creer_archive_output(dossier_output):
     nom_archive = f"{date_du_jour}.zip"
     chemin_archive = os.path.join(os.getcwd(), nom_archive)
 
-    with zipfile.ZipFile(chemin_archive, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(dossier_output):
-            for file in files:
-                chemin_fichier = os.path.join(root, file)
-                arcname = os.path.relpath(chemin_fichier, dossier_output)
-                zipf.write(chemin_fichier, arcname)
+    # écrite sous un nom temporaire : une interruption laisse l'archive précédente
+    with replacing_file(chemin_archive) as temporaire:
+        with zipfile.ZipFile(temporaire, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for root, _, files in os.walk(dossier_output):
+                for file in files:
+                    chemin_fichier = os.path.join(root, file)
+                    arcname = os.path.relpath(chemin_fichier, dossier_output)
+                    zipf.write(chemin_fichier, arcname)
 
     logger.info(f"Archive générée : {nom_archive}")
 
 
 def decoupe_chat(fichier_source, dossier_sortie):
     """Découpe un fichier de chat en plusieurs fichiers Markdown"""
-    # Créer le dossier de sortie
-    os.makedirs(dossier_sortie, exist_ok=True)
-
-    with open(fichier_source, "r", encoding="utf-8") as f:
-        lignes = f.readlines()
-
-    questions = []
-    current_question = None
-    current_answer = None
-    mode = None  # "question" ou "answer"
-
-    for ligne in lignes:
-        if "Vous avez dit :" in ligne:
-            # Si une question précédente existe déjà → l'enregistrer
-            if current_question is not None and current_answer is not None:
-                questions.append((current_question.strip(), current_answer.strip()))
-            # Nouvelle question
-            current_question = ""
-            current_answer = ""
-            mode = "question"
-            continue
-
-        if "ChatGPT a dit :" in ligne:
-            mode = "answer"
-            continue
-
-        # On accumule selon le mode
-        if mode == "question":
-            current_question += ligne
-        elif mode == "answer":
-            current_answer += ligne
-
-    # Dernier bloc
-    if current_question is not None and current_answer is not None:
-        questions.append((current_question.strip(), current_answer.strip()))
-
-    # Génération des fichiers
-    for index, (q, r) in enumerate(questions, start=1):
-        nom_fichier = f"{datetime.now().strftime('%Y%m%d')}-{index:03d}.md"
-        chemin = os.path.join(dossier_sortie, nom_fichier)
+    # Génération des fichiers au fil de la lecture, écrits par lots
+    with MarkdownWriter(dossier_sortie) as writer:
+        for index, (q, r) in enumerate(parse_chat_file(fichier_source), start=1):
+            writer.write(writer.filename(index), q, r)
+    nb_questions = writer.files_written
 
-        contenu = f"""---
-categorie:
-date: {datetime.now().strftime('%Y-%m-%d')}
----
-
-# Question
-{q}
-
-# Réponse
-{r}
-"""
-
-        with open(chemin, "w", encoding="utf-8") as out:
-            out.write(contenu)
-
-    logger.info(f"{len(questions)} fichiers Markdown générés dans : {dossier_sortie}")
+    logger.info(f"{nb_questions} fichiers Markdown générés dans : {dossier_sortie}")
 
 
 def normalize_name(filename):
@@ -509,24 +466,32 @@ def traiter_dossier(dossier_input, generer_archive=False, force=False, log_signa
 
     dossier_output = "output"
 
-    # Vérifier/vider le dossier output
+    # Vérifier le dossier output, puis écrire dans un dossier temporaire voisin
     verifier_ou_vider_output(dossier_output, force=force)
-    os.makedirs(dossier_output, exist_ok=True)
+    dossier_travail = make_staging_dir(dossier_output)
 
     fichiers_traites = 0
-    for fichier in os.listdir(dossier_input):
-        if not fichier.lower().endswith(".txt"):
-            continue
-
-        chemin_fichier = os.path.join(dossier_input, fichier)
-        nom_dossier = normalize_name(fichier)
-        chemin_sortie = os.path.join(dossier_output, nom_dossier)
-
-        logger.info(f"Traitement de {fichier}...")
-        if log_signal:
-            log_signal.emit(f"Traitement de {fichier}...")
-        decoupe_chat(chemin_fichier, chemin_sortie)
-        fichiers_traites += 1
+    try:
+        for fichier in os.listdir(dossier_input):
+            if not fichier.lower().endswith(".txt"):
+                continue
+
+            chemin_fichier = os.path.join(dossier_input, fichier)
+            nom_dossier = normalize_name(fichier)
+            chemin_sortie = os.path.join(dossier_travail, nom_dossier)
+
+            logger.info(f"Traitement de {fichier}...")
+            if log_signal:
+                log_signal.emit(f"Traitement de {fichier}...")
+            decoupe_chat(chemin_fichier, chemin_sortie)
+            fichiers_traites += 1
+    except BaseException:
+        # erreur ou annulation : aucune sortie partielle ne reste à côté d'output
+        discard_tree(dossier_travail)
+        raise
+
+    # mise en place d'un coup ; l'ancien output est supprimé en arrière-plan
+    swap_into_place(dossier_travail, dossier_output)
 
     logger.info(f"{fichiers_traites} fichier(s) traité(s)")
     if log_signal:
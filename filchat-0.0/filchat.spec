@@ -3,7 +3,7 @@
 
 a = Analysis(
     ['filchat.py'],
-    pathex=[],
+    pathex=['..'],
     binaries=[],
     datas=[('README.md', '.')],
     hiddenimports=['PySide6'],
@@ -0,0 +1,285 @@
+"""Ligne de commande : traitement par lots sans interface graphique
+
+N'importe pas PySide6 : utilisable depuis cron ou sur un serveur sans X11.
+
+    python filchat_cli.py input --archive --force --jobs 4 --stats
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import time
+from typing import List, Optional, TextIO
+
+from chatsplit.compression import DEFAULT_COMPRESSION, available_methods
+from chatsplit.control import JobCancelled, JobControl
+from chatsplit.parser import DEFAULT_ENGINE, ENGINES
+from chatsplit.profiling import available_profilers
+from chatsplit.progress import DEFAULT_INTERVAL, Progress
+from filchat.models.processingjob import JobStats, ProcessingJob
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("filchat")
+
+# Réponses acceptées pour l'ancien argument positionnel : `filchat.py input O`
+OUI = ("o", "oui", "y", "yes")
+
+# hors terminal (cron, fichier de log), une ligne de progression toutes les 5 s
+LOG_PROGRESS_INTERVAL = 5.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="filchat",
+        description="Découpe les fils ChatGPT (.txt, conversations.json) d'un dossier en fichiers Markdown",
+    )
+    parser.add_argument(
+        "input", help="dossier contenant les fichiers .txt, .json ou .jsonl"
+    )
+    parser.add_argument(
+        "archive_legacy",
+        nargs="?",
+        metavar="O",
+        help="'O' pour générer l'archive ZIP (équivalent à --archive)",
+    )
+    parser.add_argument(
+        "-o", "--output", default="output", help="dossier de sortie (défaut : output)"
+    )
+    parser.add_argument(
+        "-a", "--archive", action="store_true", help="génère une archive ZIP"
+    )
+    parser.add_argument(
+        "--archive-only",
+        action="store_true",
+        help="écrit les échanges directement dans l'archive, sans fichiers Markdown",
+    )
+    parser.add_argument(
+        "-c",
+        "--compression",
+        default=DEFAULT_COMPRESSION,
+        metavar="METHODE[:NIVEAU]",
+        help=(
+            "compression de l'archive : "
+            + ", ".join(available_methods())
+            + f" (défaut : {DEFAULT_COMPRESSION}, ex. deflate:9)"
+        ),
+    )
+    parser.add_argument(
+        "--zip-threads",
+        type=int,
+        metavar="N",
+        help="threads de compression de l'archive (défaut : un par cœur)",
+    )
+    parser.add_argument(
+        "-f", "--force", action="store_true", help="vide le dossier de sortie"
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="ne traite que les échanges ajoutés depuis le dernier passage",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="processus en parallèle (défaut : 1)"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help=f"moteur de découpe (défaut : {DEFAULT_ENGINE}, mmap pour les longues réponses)",
+    )
+    parser.add_argument(
+        "--stats", action="store_true", help="affiche débit et mémoire en fin de job"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=available_profilers(),
+        help="enregistre un profil du job dans le répertoire courant (.prof ou .html)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FICHIER",
+        help="écrit le rapport du job (temps par étape, compteurs) en JSON",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="n'affiche pas la progression"
+    )
+    return parser
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus et de ses processus fils, en Mo"""
+    if resource is None:
+        return None
+    pic = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+    return pic / (1024 * 1024) if sys.platform == "darwin" else pic / 1024
+
+
+class ProgressPrinter:
+    """Affiche messages et progression : ligne réécrite dans un terminal, une ligne par mise à jour sinon"""
+
+    def __init__(self, flux: TextIO = sys.stdout):
+        self.flux = flux
+        self.terminal = flux.isatty()
+        self._largeur = 0  # ligne de progression affichée
+
+    @property
+    def interval(self) -> float:
+        return DEFAULT_INTERVAL if self.terminal else LOG_PROGRESS_INTERVAL
+
+    def _effacer(self):
+        if self._largeur:
+            self.flux.write("\r" + " " * self._largeur + "\r")
+            self._largeur = 0
+
+    def message(self, texte: str):
+        self._effacer()
+        self.flux.write(texte + "\n")
+        self.flux.flush()
+
+    def progress(self, progress: Progress):
+        ligne = (
+            f"📊 {progress.files_done}/{progress.files_total} fichier(s) · {progress}"
+        )
+        if self.terminal:
+            self._effacer()
+            self.flux.write(ligne)
+            self._largeur = len(ligne)
+        else:
+            self.flux.write(ligne + "\n")
+        self.flux.flush()
+
+    def close(self):
+        self._effacer()
+        self.flux.flush()
+
+
+def install_cancel_handlers(control: JobControl) -> dict:
+    """Ctrl+C (ou SIGTERM) annule proprement le job ; un second Ctrl+C l'interrompt
+
+    Retourne les gestionnaires précédents, à rétablir avec restore_handlers.
+    """
+
+    def annuler(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        control.cancel()
+        print(
+            "\nAnnulation demandée (Ctrl+C à nouveau pour forcer)…",
+            file=sys.stderr,
+        )
+
+    precedents = {}
+    for nom in ("SIGINT", "SIGTERM"):
+        signum = getattr(signal, nom, None)
+        if signum is not None:
+            precedents[signum] = signal.signal(signum, annuler)
+    return precedents
+
+
+def restore_handlers(precedents: dict):
+    for signum, gestionnaire in precedents.items():
+        signal.signal(signum, gestionnaire)
+
+
+def format_report(rapport: dict) -> List[str]:
+    """Lignes du rapport de fin de job : temps par étape puis compteurs"""
+    lignes = [
+        f"  {nom:<16}: {secondes:.2f} s" for nom, secondes in rapport["stages"].items()
+    ]
+    for nom, valeur in rapport["counters"].items():
+        if nom.startswith("bytes"):
+            lignes.append(f"  {nom:<16}: {valeur / (1024 * 1024):.1f} Mo")
+        else:
+            lignes.append(f"  {nom:<16}: {valeur}")
+    return lignes
+
+
+def format_stats(stats: JobStats, duree: float) -> str:
+    duree = max(duree, 1e-9)
+    mo = stats.input_bytes / (1024 * 1024)
+    lignes = [
+        f"Durée        : {duree:.2f} s",
+        f"Fichiers     : {stats.files} ({stats.files / duree:.1f} fichiers/s)",
+        f"Volume lu    : {mo:.1f} Mo ({mo / duree:.1f} Mo/s)",
+        f"Echanges     : {stats.exchanges} ({stats.exchanges / duree:.0f} échanges/s)",
+    ]
+    pic = peak_rss_mb()
+    if pic is not None:
+        lignes.append(f"Mémoire max  : {pic:.1f} Mo")
+    if stats.report:
+        lignes.append("Etapes       :")
+        lignes.extend(format_report(stats.report))
+    return "\n".join(lignes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    if args.engine:
+        # transmis aussi aux processus du pool (--jobs)
+        os.environ["FILCHAT_PARSER_ENGINE"] = args.engine
+
+    archive = (
+        args.archive or args.archive_only or (args.archive_legacy or "").lower() in OUI
+    )
+    affichage = None if args.quiet else ProgressPrinter()
+    control = JobControl()
+    job = ProcessingJob(
+        args.input,
+        output_dir=args.output,
+        generate_archive=archive,
+        force_clean=args.force,
+        incremental=args.incremental,
+        jobs=max(1, args.jobs),
+        archive_only=args.archive_only,
+        compression=args.compression,
+        zip_threads=args.zip_threads,
+        progress_interval=affichage.interval if affichage else DEFAULT_INTERVAL,
+        control=control,
+        profiler=args.profile,
+        report_path=args.report,
+    )
+
+    valid, error_msg = job.validate()
+    if not valid:
+        print(f"Erreur : {error_msg}", file=sys.stderr)
+        return 2
+
+    debut = time.perf_counter()
+    precedents = install_cancel_handlers(control)
+    try:
+        if affichage:
+            stats = job.execute(
+                progress_callback=affichage.message, on_progress=affichage.progress
+            )
+        else:
+            stats = job.execute()
+    except JobCancelled as e:
+        print(f"{e}, sortie partielle nettoyée", file=sys.stderr)
+        return 130
+    except RuntimeError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        restore_handlers(precedents)
+        if affichage:
+            affichage.close()
+    duree = time.perf_counter() - debut
+
+    if args.stats:
+        print(format_stats(stats, duree))
+    return 0
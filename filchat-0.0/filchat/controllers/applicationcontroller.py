@@ -4,6 +4,17 @@ controller = ApplicationController(mock_view)
 controller.start_processing(...)
 """
 
+import logging
+
+from PySide6.QtCore import QThread
+
+from chatsplit.compression import DEFAULT_COMPRESSION
+from chatsplit.control import JobControl
+from filchat.controllers.processingworker import ProcessingWorker
+from filchat.models.processingjob import ProcessingJob
+
+logger = logging.getLogger("filchat")
+
 
 class ApplicationController:
     """Controller principal de l'application"""
@@ -12,14 +23,30 @@ class ApplicationController:
         self.view = view
         self.worker = None
         self.worker_thread = None
+        self.control = None  # JobControl du traitement en cours
 
     def start_processing(
-        self, input_dir: str, generate_archive: bool, force_clean: bool
+        self,
+        input_dir: str,
+        generate_archive: bool,
+        force_clean: bool,
+        incremental: bool = False,
+        jobs: int = 1,
+        archive_only: bool = False,
+        compression: str = DEFAULT_COMPRESSION,
     ):
         """Démarre un traitement"""
         # Créer le job
+        control = JobControl()
         job = ProcessingJob(
-            input_dir, generate_archive=generate_archive, force_clean=force_clean
+            input_dir,
+            generate_archive=generate_archive,
+            force_clean=force_clean,
+            incremental=incremental,
+            jobs=jobs,
+            archive_only=archive_only,
+            compression=compression,
+            control=control,
         )
 
         # Valider
@@ -38,12 +65,14 @@ class ApplicationController:
             self.worker_thread.wait()
 
         # Créer et configurer le worker
+        self.control = control
         self.worker_thread = QThread()
         self.worker = ProcessingWorker(job)
         self.worker.moveToThread(self.worker_thread)
 
         # Connecter les signaux
         self.worker.progress.connect(self.view.add_log)
+        self.worker.progress_changed.connect(self.view.show_progress)
         self.worker.error.connect(self.on_error)
         self.worker.finished.connect(self.on_finished)
         self.worker.finished.connect(self.worker_thread.quit)
@@ -55,6 +84,35 @@ class ApplicationController:
 
         logger.info("Thread de traitement démarré")
 
+    def is_running(self) -> bool:
+        return bool(self.worker_thread and self.worker_thread.isRunning())
+
+    def cancel_processing(self):
+        """Demande l'arrêt du traitement au prochain point de contrôle"""
+        if self.control and self.is_running():
+            self.control.cancel()
+            self.view.add_log("⏹ Annulation demandée…")
+
+    def toggle_pause(self) -> bool:
+        """Met en pause ou relance le traitement ; retourne vrai s'il est en pause"""
+        if not self.control or not self.is_running():
+            return False
+        if self.control.paused:
+            self.control.resume()
+            self.view.add_log("▶ Traitement repris")
+        else:
+            self.control.pause()
+            self.view.add_log("⏸ Traitement en pause")
+        return self.control.paused
+
+    def stop_processing(self):
+        """Annule le traitement et attend qu'il ait nettoyé sa sortie (fermeture)"""
+        if self.control:
+            self.control.cancel()
+        if self.is_running():
+            self.worker_thread.quit()
+            self.worker_thread.wait()
+
     def on_error(self, message: str):
         """Gère les erreurs"""
         self.view.add_log(f"❌ Erreur : {message}")
@@ -63,7 +121,10 @@ class ApplicationController:
 
     def on_finished(self):
         """Gère la fin du traitement"""
-        self.view.add_log("✅ Traitement terminé")
+        if self.control and self.control.cancelled:
+            self.view.add_log("⏹ Traitement annulé")
+        else:
+            self.view.add_log("✅ Traitement terminé")
         self.view.set_controls_enabled(True)
 
     def cleanup_worker(self):
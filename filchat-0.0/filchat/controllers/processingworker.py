@@ -2,18 +2,23 @@
 Fait le lien entre l'interface et la logique métier
 """
 
+import logging
 import traceback
 
 from PySide6.QtCore import QObject, Signal
 
+from chatsplit.control import JobCancelled
 from filchat.models.processingjob import ProcessingJob
 
+logger = logging.getLogger("filchat")
+
 
 class ProcessingWorker(QObject):
     """Controller : Exécute le traitement dans un thread séparé"""
 
     finished = Signal()
     progress = Signal(str)
+    progress_changed = Signal(object)  # chatsplit.progress.Progress
     error = Signal(str)
 
     def __init__(self, job: ProcessingJob):
@@ -26,12 +31,18 @@ class ProcessingWorker(QObject):
             logger.info(f"Traitement démarré - input={self.job.input_dir}")
             self.progress.emit("Traitement démarré…")
 
-            # Exécuter le job avec callback de progression
-            self.job.execute(progress_callback=self.progress.emit)
+            # Exécuter le job avec callbacks de progression
+            self.job.execute(
+                progress_callback=self.progress.emit,
+                on_progress=self.progress_changed.emit,
+            )
 
             self.progress.emit("Traitement terminé avec succès.")
             logger.info("Traitement terminé avec succès")
 
+        except JobCancelled:
+            logger.info("Traitement annulé")
+            self.progress.emit("⏹ Traitement annulé, sortie partielle nettoyée.")
         except RuntimeError as e:
             logger.warning(f"Erreur métier: {str(e)}")
             self.error.emit(str(e))
@@ -3,12 +3,16 @@ FilChat - Application de découpe de conversations
 """
 
 import logging
+import multiprocessing
 import os
 import sys
 import traceback
 
 from PySide6.QtWidgets import QApplication
 
+from filchat.controllers.applicationcontroller import ApplicationController
+from filchat.views.mainwindow import MainWindow
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -30,6 +34,8 @@ logger.addHandler(file_handler)
 
 
 def main():
+    # nécessaire aux processus du pool dans l'exécutable PyInstaller
+    multiprocessing.freeze_support()
     try:
         logger.info("=" * 70)
         logger.info("=== Démarrage de FilChat (MVC) ===")
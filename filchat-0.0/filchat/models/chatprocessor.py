@@ -1,8 +1,19 @@
 """ChatProcessor : Traitement pur des fichiers (parse, save, archive)"""
 
 import os
-import zipfile
-from datetime import datetime
+from datetime import date
+from typing import Iterable, Iterator, Optional, Tuple
+
+from chatsplit.archive import append_to_archive
+from chatsplit.compression import (ZIP_METHODS, Compression, create_archive,
+                                   open_archive_writer, parse_compression)
+from chatsplit.conversations import write_conversations
+from chatsplit.incremental import (STATE_FILENAME, IncrementalResult,
+                                   split_incremental)
+from chatsplit.markdown import render_markdown
+from chatsplit.parser import parse_chat_file
+from chatsplit.progress import ProgressTracker
+from chatsplit.writer import MarkdownWriter
 
 
 class ChatProcessor:
@@ -15,63 +26,86 @@ class ChatProcessor:
         return name.strip().lower().replace(" ", "_")
 
     @staticmethod
-    def parse_chat_file(filepath: str) -> List[Tuple[str, str]]:
-        """Parse un fichier de chat et retourne une liste de (question, réponse)"""
-        with open(filepath, "r", encoding="utf-8") as f:
-            lignes = f.readlines()
-
-        questions = []
-        current_question = None
-        current_answer = None
-        mode = None
+    def parse_chat_file(
+        filepath: str, progress: Optional[ProgressTracker] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """Parse un fichier de chat et produit les paires (question, réponse) au fil de la lecture"""
+        return parse_chat_file(filepath, progress=progress)
 
-        for ligne in lignes:
-            if "Vous avez dit :" in ligne:
-                if current_question is not None and current_answer is not None:
-                    questions.append((current_question.strip(), current_answer.strip()))
-                current_question = ""
-                current_answer = ""
-                mode = "question"
-                continue
-
-            if "ChatGPT a dit :" in ligne:
-                mode = "answer"
-                continue
+    @staticmethod
+    def write_conversations(
+        filepath: str,
+        writer: MarkdownWriter,
+        dossier: str = "",
+        progress: Optional[ProgressTracker] = None,
+    ) -> Tuple[int, int]:
+        """Écrit les conversations d'un export JSON, une par dossier sous `dossier`
 
-            if mode == "question":
-                current_question += ligne
-            elif mode == "answer":
-                current_answer += ligne
+        Retourne le nombre de conversations et le nombre d'échanges.
+        """
+        return write_conversations(filepath, writer, dossier, progress)
 
-        # Dernier bloc
-        if current_question is not None and current_answer is not None:
-            questions.append((current_question.strip(), current_answer.strip()))
+    @staticmethod
+    def save_as_markdown(
+        question: str, answer: str, output_path: str, jour: Optional[date] = None
+    ):
+        """Sauvegarde une paire question/réponse en Markdown"""
+        contenu = render_markdown(question, answer, jour or date.today())
+        with open(output_path, "w", encoding="utf-8") as out:
+            out.write(contenu)
 
-        return questions
+    @staticmethod
+    def open_writer(output_path: str, jour: Optional[date] = None) -> MarkdownWriter:
+        """Writer qui écrit les échanges par lots sous `output_path`"""
+        return MarkdownWriter(output_path, jour)
 
     @staticmethod
-    def save_as_markdown(question: str, answer: str, output_path: str):
-        """Sauvegarde une paire question/réponse en Markdown"""
-        contenu = f"""---
-categorie:
-date: {datetime.now().strftime('%Y-%m-%d')}
----
+    def open_archive_writer(
+        archive_name: str,
+        jour: Optional[date] = None,
+        compression: Optional[Compression] = None,
+        threads: Optional[int] = None,
+    ) -> MarkdownWriter:
+        """Writer qui écrit les échanges directement dans l'archive `archive_name`"""
+        return open_archive_writer(
+            archive_name, compression or parse_compression(None), jour, threads
+        )
 
-# Question
-{question}
+    @staticmethod
+    def create_archive(
+        source_dir: str,
+        archive_name: str,
+        compression: Optional[Compression] = None,
+        threads: Optional[int] = None,
+    ):
+        """Crée une archive d'un dossier, en compressant sur `threads` threads"""
+        create_archive(
+            source_dir,
+            archive_name,
+            compression or parse_compression(None),
+            exclure=[STATE_FILENAME],
+            threads=threads,
+        )
 
-# Réponse
-{answer}
-"""
-        with open(output_path, "w", encoding="utf-8") as out:
-            out.write(contenu)
+    @staticmethod
+    def split_incremental(
+        filepath: str,
+        output_path: str,
+        jour: Optional[date] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> IncrementalResult:
+        """Découpe en ne traitant que les échanges ajoutés depuis le dernier passage"""
+        return split_incremental(filepath, output_path, jour, progress)
 
     @staticmethod
-    def create_archive(source_dir: str, archive_name: str):
-        """Crée une archive ZIP d'un dossier"""
-        with zipfile.ZipFile(archive_name, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(source_dir):
-                for file in files:
-                    chemin_fichier = os.path.join(root, file)
-                    arcname = os.path.relpath(chemin_fichier, source_dir)
-                    zipf.write(chemin_fichier, arcname)
+    def append_to_archive(
+        source_dir: str,
+        archive_name: str,
+        files: Iterable[str],
+        compression: Optional[Compression] = None,
+    ):
+        """Ajoute des fichiers de `source_dir` à une archive ZIP existante"""
+        compression = compression or parse_compression(None)
+        append_to_archive(
+            archive_name, source_dir, files, ZIP_METHODS[compression.method]
+        )
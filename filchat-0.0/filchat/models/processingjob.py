@@ -5,9 +5,49 @@ job = ProcessingJob("/path/input")
 job.execute()
 """
 
+import json
+import logging
 import os
 import shutil
-from datetime import datetime
+import threading
+import time
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from chatsplit.batch import run_in_pool, worker_progress
+from chatsplit.compression import DEFAULT_COMPRESSION, Compression, parse_compression
+from chatsplit.control import JobCancelled, JobControl
+from chatsplit.conversations import is_json_export, unique_name
+from chatsplit.profiling import JobProfile, capture, parse_profiler
+from chatsplit.progress import DEFAULT_INTERVAL, Progress, ProgressTracker
+from chatsplit.staging import (
+    discard_tree,
+    make_staging_dir,
+    replacing_file,
+    swap_into_place,
+)
+from filchat.models.chatprocessor import ChatProcessor
+
+logger = logging.getLogger("filchat")
+
+
+class FileResult(NamedTuple):
+    """Résultat du traitement d'un fichier"""
+
+    written: List[str]  # fichiers Markdown écrits (mode incrémental)
+    count: int  # nombre d'échanges
+    rebuild_archive: bool  # l'archive doit être reconstruite
+    report: Optional[Dict[str, Any]] = None  # JobProfile.to_dict du fichier
+
+
+class JobStats(NamedTuple):
+    """Bilan chiffré d'un job"""
+
+    files: int  # fichiers traités
+    exchanges: int  # échanges découpés
+    input_bytes: int  # taille cumulée des fichiers lus
+    report: Optional[Dict[str, Any]] = None  # temps par étape et compteurs (JSON)
 
 
 class ProcessingJob:
@@ -19,11 +59,36 @@ class ProcessingJob:
         output_dir: str = "output",
         generate_archive: bool = False,
         force_clean: bool = False,
+        incremental: bool = False,
+        jobs: int = 1,
+        max_in_flight: Optional[int] = None,
+        archive_only: bool = False,
+        compression: str = DEFAULT_COMPRESSION,
+        zip_threads: Optional[int] = None,
+        progress_interval: float = DEFAULT_INTERVAL,
+        control: Optional[JobControl] = None,
+        profiler: Optional[str] = None,
+        report_path: Optional[str] = None,
     ):
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.generate_archive = generate_archive
         self.force_clean = force_clean
+        self.incremental = incremental
+        self.jobs = jobs  # nombre de processus en parallèle
+        self.max_in_flight = max_in_flight  # fichiers soumis au pool (défaut 2 × jobs)
+        self.archive_only = archive_only  # archive ZIP seule, sans fichiers Markdown
+        self.compression = compression  # 'méthode[:niveau]', voir chatsplit.compression
+        self.zip_threads = zip_threads  # threads de compression (défaut : un par cœur)
+        self.progress_interval = progress_interval  # secondes entre deux Progress
+        self.control = control  # annulation et pause demandées de l'extérieur
+        self.profiler = (
+            profiler  # 'cprofile' ou 'pyinstrument', voir chatsplit.profiling
+        )
+        self.report_path = report_path  # fichier JSON du rapport de fin de job
+        self.profile: Optional[JobProfile] = None  # mesures du dernier job
+        # suppression en arrière-plan de l'ancien output (voir wait_cleanup)
+        self.cleanup: Optional[threading.Thread] = None
         self.processor = ChatProcessor()
 
     def validate(self) -> Tuple[bool, Optional[str]]:
@@ -34,69 +99,439 @@ class ProcessingJob:
         if not os.path.isdir(self.input_dir):
             return False, f"Le dossier '{self.input_dir}' n'existe pas"
 
+        if self.archive_only and self.incremental:
+            return False, "Le mode incrémental nécessite les fichiers Markdown"
+
+        try:
+            parse_compression(self.compression)
+            parse_profiler(self.profiler)
+        except ValueError as e:
+            return False, str(e)
+
         return True, None
 
-    def prepare_output_directory(self):
-        """Prépare le dossier de sortie"""
-        if not os.path.exists(self.output_dir):
-            return
+    def prepare_output_directory(self) -> str:
+        """Prépare le dossier de sortie et retourne le dossier où écrire
 
-        if os.listdir(self.output_dir):
-            if self.force_clean:
-                logger.info(
-                    f"Suppression du dossier '{self.output_dir}' (force activé)"
-                )
-                shutil.rmtree(self.output_dir)
-            else:
+        Hors mode incrémental, le job écrit dans un dossier temporaire voisin,
+        mis à la place de output une fois tous les fichiers découpés ; l'ancien
+        contenu est alors supprimé en arrière-plan (voir chatsplit.staging).
+        """
+        if self.incremental and not self.force_clean:
+            # le mode incrémental repart du contenu existant
+            os.makedirs(self.output_dir, exist_ok=True)
+            return self.output_dir
+
+        if os.path.isdir(self.output_dir) and os.listdir(self.output_dir):
+            if not self.force_clean:
                 raise RuntimeError(
                     f"Le dossier '{self.output_dir}' n'est pas vide.\n"
                     f"Cochez l'option 'Vider le dossier output' ou videz-le manuellement."
                 )
+            logger.info(f"Le dossier '{self.output_dir}' sera remplacé (force activé)")
+        return make_staging_dir(self.output_dir)
+
+    def wait_cleanup(self):
+        """Attend la fin de la suppression de l'ancien dossier output"""
+        if self.cleanup is not None:
+            self.cleanup.join()
+            self.cleanup = None
+
+    def checkpoint(self):
+        """Point de contrôle entre deux étapes ; lève JobCancelled si le job est annulé"""
+        if self.control is not None:
+            self.control.checkpoint()
 
-    def execute(self, progress_callback: Optional[Callable[[str], None]] = None):
-        """Exécute le traitement"""
-        self.prepare_output_directory()
-        os.makedirs(self.output_dir, exist_ok=True)
+    @staticmethod
+    def file_report(
+        chemin_fichier: str,
+        duree: float,
+        write_seconds: float,
+        files_written: int,
+        bytes_written: int,
+    ) -> Dict[str, Any]:
+        """Rapport d'un fichier : lecture et découpe d'un côté, écriture de l'autre"""
+        profil = JobProfile()
+        profil.add_time("parse", duree - write_seconds)
+        profil.add_time("write", write_seconds)
+        profil.count("bytes_read", os.path.getsize(chemin_fichier))
+        profil.count("files_written", files_written)
+        profil.count("bytes_written", bytes_written)
+        return profil.to_dict()
+
+    @staticmethod
+    def process_file(
+        chemin_fichier: str,
+        chemin_sortie: str,
+        incremental: bool = False,
+        jour: Optional[date] = None,
+        progress: Optional[ProgressTracker] = None,
+    ) -> FileResult:
+        """Découpe un fichier ; exécutable dans un processus du pool
+
+        `progress` n'est utilisable qu'en série, dans le processus du job ;
+        dans un processus du pool, le suivi porte les points de contrôle du
+        pool (voir chatsplit.batch). Si le job est annulé en cours de
+        fichier, la sortie partielle est supprimée ; en mode incrémental, elle
+        est conservée et le passage suivant reprend après le dernier échange
+        écrit.
+        """
+        progress = progress or worker_progress()
+        processor = ChatProcessor()
+        os.makedirs(chemin_sortie, exist_ok=True)
+        debut = time.perf_counter()
+
+        if is_json_export(chemin_fichier):
+            # export officiel : un dossier par conversation
+            writer = processor.open_writer(chemin_sortie, jour)
+            try:
+                with writer:
+                    _, nb_echanges = processor.write_conversations(
+                        chemin_fichier, writer, progress=progress
+                    )
+            except JobCancelled:
+                for dossier in writer.created_dirs:
+                    shutil.rmtree(dossier, ignore_errors=True)
+                raise
+            rapport = ProcessingJob.file_report(
+                chemin_fichier,
+                time.perf_counter() - debut,
+                writer.write_seconds,
+                writer.files_written,
+                writer.bytes_written,
+            )
+            return FileResult([], nb_echanges, True, rapport)
+
+        if incremental:
+            bilan = processor.split_incremental(
+                chemin_fichier, chemin_sortie, jour, progress
+            )
+            return FileResult(
+                [os.path.join(chemin_sortie, nom) for nom in bilan.written],
+                bilan.count,
+                not bilan.resumed or bilan.rewritten_existing,
+                ProcessingJob.file_report(
+                    chemin_fichier,
+                    time.perf_counter() - debut,
+                    bilan.write_seconds,
+                    len(bilan.written),
+                    bilan.bytes_written,
+                ),
+            )
+
+        # Parser et sauvegarder au fil de la lecture, par lots
+        nb_questions = 0
+        try:
+            with processor.open_writer(chemin_sortie, jour) as writer:
+                for index, (q, r) in enumerate(
+                    processor.parse_chat_file(chemin_fichier, progress), start=1
+                ):
+                    writer.write(writer.filename(index), q, r)
+                    nb_questions = index
+        except JobCancelled:
+            shutil.rmtree(chemin_sortie, ignore_errors=True)
+            raise
+
+        rapport = ProcessingJob.file_report(
+            chemin_fichier,
+            time.perf_counter() - debut,
+            writer.write_seconds,
+            writer.files_written,
+            writer.bytes_written,
+        )
+        return FileResult([], nb_questions, True, rapport)
+
+    @property
+    def archive_compression(self) -> Compression:
+        return parse_compression(self.compression)
+
+    def archive_path(self) -> str:
+        """Chemin de l'archive du jour, dans le répertoire courant"""
+        extension = self.archive_compression.extension
+        nom_archive = f"{datetime.now().strftime('%Y%m%d')}{extension}"
+        return os.path.join(os.getcwd(), nom_archive)
+
+    def profile_path(self) -> str:
+        """Chemin du profil capturé, sans extension, dans le répertoire courant"""
+        return os.path.join(
+            os.getcwd(), f"filchat-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        )
+
+    def progress_tracker(
+        self,
+        taches: List[Tuple[str, str, bool, date]],
+        on_progress: Optional[Callable[[Progress], None]],
+    ) -> Optional[ProgressTracker]:
+        """Suivi de la progression du job, ou None si personne ne l'écoute
+
+        Avec un JobControl, le suivi porte aussi les points de contrôle
+        placés entre les échanges.
+        """
+        if on_progress is None and self.control is None:
+            return None
+        taille = sum(os.path.getsize(tache[0]) for tache in taches)
+        return ProgressTracker(
+            on_progress,
+            taille,
+            len(taches),
+            self.progress_interval,
+            checkpoint=self.control.checkpoint if self.control else None,
+        )
+
+    def execute_archive_only(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[Progress], None]] = None,
+    ) -> JobStats:
+        """Écrit chaque échange directement dans l'archive, sans arborescence Markdown
 
+        L'archive est écrite sous un nom temporaire puis mise à la place de
+        celle du jour une fois complète : une annulation ou une erreur laisse
+        l'archive précédente intacte.
+        """
         fichiers_traites = 0
+        nb_echanges = 0
+        octets_lus = 0
+        chemin_archive = self.archive_path()
+        taches = self.list_tasks()
+        jour = taches[0][3] if taches else None
+        suivi = self.progress_tracker(taches, on_progress)
+        profil = self.profile = JobProfile()
+        debut = profil.clock()
 
-        for fichier in os.listdir(self.input_dir):
-            if not fichier.lower().endswith(".txt"):
-                continue
+        # archive écrite à part, mise à la place de celle du jour une fois complète
+        ecriture = replacing_file(chemin_archive)
+        with ecriture as temporaire, self.processor.open_archive_writer(
+            temporaire, jour, self.archive_compression, self.zip_threads
+        ) as writer:
+            for chemin_fichier, chemin_sortie, _, _ in taches:
+                self.checkpoint()
+                fichier = os.path.basename(chemin_fichier)
+                if progress_callback:
+                    progress_callback(f"📄 Traitement de {fichier}...")
+                if suivi:
+                    suivi.start_file(fichier)
 
-            if progress_callback:
-                progress_callback(f"📄 Traitement de {fichier}...")
+                # même arborescence que l'archive construite depuis le dossier output
+                dossier = os.path.relpath(chemin_sortie, self.output_dir)
+                nb_questions = 0
+                if is_json_export(chemin_fichier):
+                    _, nb_questions = self.processor.write_conversations(
+                        chemin_fichier, writer, dossier, suivi
+                    )
+                else:
+                    for index, (q, r) in enumerate(
+                        self.processor.parse_chat_file(chemin_fichier, suivi),
+                        start=1,
+                    ):
+                        writer.write(
+                            os.path.join(dossier, writer.filename(index)), q, r
+                        )
+                        nb_questions = index
+
+                logger.info(f"{nb_questions} échanges archivés pour {fichier}")
+                fichiers_traites += 1
+                nb_echanges += nb_questions
+                octets_lus += os.path.getsize(chemin_fichier)
+                if suivi:
+                    suivi.end_file(os.path.getsize(chemin_fichier))
+
+        # l'écriture dans l'archive est surtout de la compression
+        profil.add_time("parse", profil.clock() - debut - writer.write_seconds)
+        profil.add_time("archive", writer.write_seconds)
+        profil.count("bytes_read", octets_lus)
+        profil.count("exchanges", nb_echanges)
+        profil.count("files_written", writer.files_written)
+        profil.count("bytes_written", writer.bytes_written)
+        profil.count("bytes_compressed", os.path.getsize(chemin_archive))
+        profil.finish()
+
+        if suivi:
+            suivi.finish()
+        logger.info(f"Archive générée : {os.path.basename(chemin_archive)}")
+        if progress_callback:
+            progress_callback(f"✅ {fichiers_traites} fichier(s) traité(s)")
+            progress_callback("✅ Archive créée avec succès")
+
+        return JobStats(fichiers_traites, nb_echanges, octets_lus, profil.to_dict())
 
+    def list_tasks(
+        self, dossier: Optional[str] = None
+    ) -> List[Tuple[str, str, bool, date]]:
+        """Tâches (fichier source, dossier de sortie, incrémental, date) du job
+
+        Les dossiers de sortie sont placés sous `dossier` (par défaut output),
+        un par fichier, suffixé si deux noms normalisés sont égaux. Un export
+        JSON y range ses conversations, une par sous-dossier.
+        """
+        dossier = dossier or self.output_dir
+        jour = date.today()  # une seule date pour tout le job
+        taches = []
+        utilises: Set[str] = set()
+        for fichier in sorted(os.listdir(self.input_dir)):
+            export = is_json_export(fichier)
+            if not export and not fichier.lower().endswith(".txt"):
+                continue
             chemin_fichier = os.path.join(self.input_dir, fichier)
-            nom_dossier = self.processor.normalize_name(fichier)
-            chemin_sortie = os.path.join(self.output_dir, nom_dossier)
+            # un dossier par fichier : deux exports, ou un export et un fil
+            # .txt, n'écrivent jamais dans le même dossier
+            nom_dossier = unique_name(self.processor.normalize_name(fichier), utilises)
+            chemin_sortie = os.path.join(dossier, nom_dossier)
+            incremental = self.incremental and not export
+            taches.append((chemin_fichier, chemin_sortie, incremental, jour))
+        return taches
+
+    def execute(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[Progress], None]] = None,
+    ) -> JobStats:
+        """Exécute le traitement
+
+        `progress_callback` reçoit les messages d'étape, `on_progress` un
+        Progress (octets, échanges, débit, temps restant) à intervalle fixe.
+        Lève JobCancelled si `control` annule le job. Le rapport de fin de job
+        (temps par étape, compteurs) est journalisé, transmis à
+        `progress_callback` et rendu dans JobStats.report.
+        """
+        with capture(self.profiler, self.profile_path()) as chemin_profil:
+            if self.archive_only:
+                stats = self.execute_archive_only(progress_callback, on_progress)
+            else:
+                stats = self.execute_markdown(progress_callback, on_progress)
+
+        rapport = stats.report
+        if chemin_profil:
+            rapport = dict(rapport, capture=chemin_profil)
+        self.emit_report(rapport, progress_callback)
+        return stats._replace(report=rapport)
+
+    def emit_report(
+        self,
+        rapport: Dict[str, Any],
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ):
+        """Journalise le rapport en JSON et l'écrit dans `report_path` si demandé"""
+        logger.info(f"Rapport du job : {json.dumps(rapport)}")
+        if self.report_path:
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(rapport, f, indent=2)
+        if progress_callback:
+            progress_callback(f"⏱ {self.profile}")
+            if "capture" in rapport:
+                progress_callback(f"⏱ Profil enregistré : {rapport['capture']}")
+
+    def execute_markdown(
+        self,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        on_progress: Optional[Callable[[Progress], None]] = None,
+    ) -> JobStats:
+        """Découpe chaque fichier en Markdown dans output, puis crée l'archive"""
+        profil = self.profile = JobProfile()
+        with profil.stage("prepare"):
+            dossier = self.prepare_output_directory()
 
-            os.makedirs(chemin_sortie, exist_ok=True)
+        fichiers_traites = 0
+        nb_echanges = 0
+        octets_lus = 0
+        nouveaux_fichiers: List[str] = []
+        reconstruire_archive = not self.incremental
 
-            # Parser et sauvegarder
-            questions = self.processor.parse_chat_file(chemin_fichier)
+        taches = self.list_tasks(dossier)
+        suivi = self.progress_tracker(taches, on_progress)
+        # le suivi fin (octets, échanges) n'existe qu'en série ; avec un pool,
+        # la progression avance fichier par fichier
+        en_serie = self.jobs <= 1
+        fonction = (
+            partial(self.process_file, progress=suivi)
+            if en_serie
+            else self.process_file
+        )
 
-            for index, (q, r) in enumerate(questions, start=1):
-                nom_fichier = f"{datetime.now().strftime('%Y%m%d')}-{index:03d}.md"
-                chemin = os.path.join(chemin_sortie, nom_fichier)
-                self.processor.save_as_markdown(q, r, chemin)
+        def on_submit(tache):
+            self.checkpoint()
+            fichier = os.path.basename(tache[0])
+            if progress_callback:
+                progress_callback(f"📄 Traitement de {fichier}...")
+            if suivi and en_serie:
+                suivi.start_file(fichier)
 
-            logger.info(f"{len(questions)} fichiers générés pour {fichier}")
-            fichiers_traites += 1
+        try:
+            resultats = run_in_pool(
+                fonction,
+                taches,
+                processes=self.jobs,
+                max_in_flight=self.max_in_flight,
+                on_submit=on_submit,
+                control=self.control,
+            )
+            for (chemin_fichier, *_), resultat in resultats:
+                fichier = os.path.basename(chemin_fichier)
+                nouveaux_fichiers.extend(resultat.written)
+                if resultat.rebuild_archive:
+                    reconstruire_archive = True
+                if self.incremental:
+                    logger.info(
+                        f"{len(resultat.written)} fichier(s) écrit(s) pour {fichier} "
+                        f"({resultat.count} échanges au total)"
+                    )
+                else:
+                    logger.info(f"{resultat.count} fichiers générés pour {fichier}")
+                fichiers_traites += 1
+                nb_echanges += resultat.count
+                octets_lus += os.path.getsize(chemin_fichier)
+                if resultat.report:
+                    profil.merge(resultat.report)
+                if suivi:
+                    suivi.end_file(
+                        os.path.getsize(chemin_fichier),
+                        0 if en_serie else resultat.count,
+                    )
+        except BaseException:
+            # sortie abandonnée (annulation, erreur) : l'ancien output reste intact
+            if dossier != self.output_dir:
+                self.cleanup = discard_tree(dossier)
+            raise
 
+        if dossier != self.output_dir:
+            with profil.stage("swap"):
+                self.cleanup = swap_into_place(dossier, self.output_dir)
+
+        if suivi:
+            suivi.finish()
         if progress_callback:
             progress_callback(f"✅ {fichiers_traites} fichier(s) traité(s)")
 
+        profil.count("exchanges", nb_echanges)
+
         if self.generate_archive:
+            self.checkpoint()
             if progress_callback:
-                progress_callback("📦 Génération de l'archive ZIP...")
+                progress_callback("📦 Génération de l'archive...")
 
-            date_du_jour = datetime.now().strftime("%Y%m%d")
-            nom_archive = f"{date_du_jour}.zip"
-            chemin_archive = os.path.join(os.getcwd(), nom_archive)
+            compression = self.archive_compression
+            chemin_archive = self.archive_path()
+            nom_archive = os.path.basename(chemin_archive)
 
-            self.processor.create_archive(self.output_dir, chemin_archive)
+            with profil.stage("archive"):
+                # seul le ZIP permet d'ajouter des membres sans tout réécrire
+                if (
+                    reconstruire_archive
+                    or not compression.is_zip
+                    or not os.path.exists(chemin_archive)
+                ):
+                    self.processor.create_archive(
+                        self.output_dir, chemin_archive, compression, self.zip_threads
+                    )
+                else:
+                    self.processor.append_to_archive(
+                        self.output_dir, chemin_archive, nouveaux_fichiers, compression
+                    )
+            profil.count("bytes_compressed", os.path.getsize(chemin_archive))
             logger.info(f"Archive générée : {nom_archive}")
 
             if progress_callback:
                 progress_callback("✅ Archive créée avec succès")
+
+        profil.finish()
+        return JobStats(fichiers_traites, nb_echanges, octets_lus, profil.to_dict())
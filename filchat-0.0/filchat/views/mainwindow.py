@@ -1,5 +1,21 @@
 """MainWindow : Interface Qt pure"""
 
+import logging
+import os
+import traceback
+
+from PySide6.QtWidgets import (QCheckBox, QComboBox, QFileDialog,
+                               QHBoxLayout, QLabel, QLineEdit, QMainWindow,
+                               QMessageBox, QProgressBar, QPushButton, QSpinBox,
+                               QTextEdit, QVBoxLayout, QWidget)
+
+from chatsplit.compression import DEFAULT_COMPRESSION, choices
+from chatsplit.progress import Progress
+from filchat.controllers.applicationcontroller import ApplicationController
+
+logger = logging.getLogger("filchat")
+log_file = os.path.join(os.path.expanduser("."), "filchat_debug.log")
+
 
 class MainWindow(QMainWindow):
     """Vue principale de l'application"""
@@ -48,15 +64,66 @@ class MainWindow(QMainWindow):
 
         # === Options ===
         self.check_archive = QCheckBox("Générer une archive ZIP")
+        self.check_archive_only = QCheckBox(
+            "Archive seule (sans fichiers Markdown dans output)"
+        )
+        self.check_archive_only.setEnabled(False)
+        self.check_archive.toggled.connect(self.check_archive_only.setEnabled)
+        self.combo_compression = QComboBox()
+        for compression in choices():
+            self.combo_compression.addItem(compression.label, str(compression))
+        self.combo_compression.setCurrentIndex(
+            self.combo_compression.findData(DEFAULT_COMPRESSION)
+        )
+        self.combo_compression.setEnabled(False)
+        self.check_archive.toggled.connect(self.combo_compression.setEnabled)
         self.check_force = QCheckBox("Vider le dossier output (--force)")
-        layout.addWidget(self.check_archive)
+        self.check_incremental = QCheckBox(
+            "Mode incrémental (ne traiter que les nouveaux échanges)"
+        )
+        archive_layout = QHBoxLayout()
+        archive_layout.addWidget(self.check_archive)
+        archive_layout.addWidget(self.combo_compression)
+        archive_layout.addStretch()
+        layout.addLayout(archive_layout)
+        layout.addWidget(self.check_archive_only)
         layout.addWidget(self.check_force)
+        layout.addWidget(self.check_incremental)
+
+        jobs_layout = QHBoxLayout()
+        self.label_jobs = QLabel("Processus en parallèle :")
+        self.spin_jobs = QSpinBox()
+        self.spin_jobs.setRange(1, os.cpu_count() or 1)
+        self.spin_jobs.setValue(1)
+        jobs_layout.addWidget(self.label_jobs)
+        jobs_layout.addWidget(self.spin_jobs)
+        jobs_layout.addStretch()
+        layout.addLayout(jobs_layout)
 
         # === Bouton traitement ===
         self.button_run = QPushButton("Lancer le traitement")
         self.button_run.clicked.connect(self.on_run_clicked)
         layout.addWidget(self.button_run)
 
+        # === Pause / annulation du traitement en cours ===
+        control_layout = QHBoxLayout()
+        self.button_pause = QPushButton("Pause")
+        self.button_pause.clicked.connect(self.on_pause_clicked)
+        self.button_pause.setEnabled(False)
+        self.button_cancel = QPushButton("Annuler")
+        self.button_cancel.clicked.connect(self.on_cancel_clicked)
+        self.button_cancel.setEnabled(False)
+        control_layout.addWidget(self.button_pause)
+        control_layout.addWidget(self.button_cancel)
+        layout.addLayout(control_layout)
+
+        # === Progression ===
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.label_progress = QLabel("")
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.label_progress)
+
         # === Console ===
         self.console = QTextEdit()
         self.console.setReadOnly(True)
@@ -125,8 +192,33 @@ class MainWindow(QMainWindow):
         input_dir = self.line_edit_path.text().strip()
         generate_archive = self.check_archive.isChecked()
         force_clean = self.check_force.isChecked()
+        incremental = self.check_incremental.isChecked()
+        jobs = self.spin_jobs.value()
+        archive_only = generate_archive and self.check_archive_only.isChecked()
+        compression = self.combo_compression.currentData()
+
+        self.controller.start_processing(
+            input_dir,
+            generate_archive,
+            force_clean,
+            incremental,
+            jobs,
+            archive_only,
+            compression,
+        )
 
-        self.controller.start_processing(input_dir, generate_archive, force_clean)
+    def on_pause_clicked(self):
+        """Met en pause ou relance le traitement"""
+        if self.controller:
+            en_pause = self.controller.toggle_pause()
+            self.button_pause.setText("Reprendre" if en_pause else "Pause")
+
+    def on_cancel_clicked(self):
+        """Annule le traitement en cours"""
+        if self.controller:
+            self.controller.cancel_processing()
+            self.button_pause.setEnabled(False)
+            self.button_cancel.setEnabled(False)
 
     # === Méthodes publiques pour le controller ===
 
@@ -134,6 +226,14 @@ class MainWindow(QMainWindow):
         """Ajoute un message dans la console"""
         self.console.append(message)
 
+    def show_progress(self, progress: Progress):
+        """Met à jour la barre de progression (octets, échanges, débit, temps restant)"""
+        self.progress_bar.setValue(progress.percent)
+        fichier = f"{progress.current_file} · " if progress.current_file else ""
+        self.label_progress.setText(
+            f"{fichier}{progress.files_done}/{progress.files_total} fichier(s) · {progress}"
+        )
+
     def show_error(self, message: str):
         """Affiche une erreur"""
         self.add_log(f"❌ {message}")
@@ -142,11 +242,22 @@ class MainWindow(QMainWindow):
     def set_controls_enabled(self, enabled: bool):
         """Active/désactive les contrôles"""
         self.button_run.setEnabled(enabled)
+        # pause et annulation ne servent que pendant un traitement
+        self.button_pause.setEnabled(not enabled)
+        self.button_pause.setText("Pause")
+        self.button_cancel.setEnabled(not enabled)
+        if not enabled:
+            self.progress_bar.setValue(0)
+            self.label_progress.setText("")
         self.button_browse.setEnabled(enabled)
         self.button_use_current.setEnabled(enabled)
         self.line_edit_path.setEnabled(enabled)
         self.check_archive.setEnabled(enabled)
+        self.check_archive_only.setEnabled(enabled and self.check_archive.isChecked())
+        self.combo_compression.setEnabled(enabled and self.check_archive.isChecked())
         self.check_force.setEnabled(enabled)
+        self.check_incremental.setEnabled(enabled)
+        self.spin_jobs.setEnabled(enabled)
 
     def closeEvent(self, event):
         """Gère la fermeture"""
@@ -159,8 +270,8 @@ class MainWindow(QMainWindow):
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                 )
                 if reply == QMessageBox.StandardButton.Yes:
-                    self.controller.worker_thread.quit()
-                    self.controller.worker_thread.wait(2000)
+                    # annulation propre : la sortie partielle est nettoyée
+                    self.controller.stop_processing()
                     event.accept()
                 else:
                     event.ignore()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Moteur de découpe partagé avec le site web (dossier chatsplit à la racine du dépôt)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filchat.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#filchat.cache.py
+"""Cache des résultats indexé par l'empreinte SHA-256 du fichier envoyé
+
+Un même export envoyé plusieurs fois n'est découpé qu'une fois : les
+résultats sont rangés dans ``media/output/<sha256>/<compression>/`` et
+réutilisés tant qu'ils sont présents. La taille totale est plafonnée par
+FILCHAT_OUTPUT_CACHE_MAX_SIZE ; au-delà, les entrées les moins récemment
+utilisées sont supprimées.
+"""
+import logging
+import os
+import shutil
+
+from django.conf import settings
+from django.utils import timezone
+
+from chatsplit.compression import DEFAULT_COMPRESSION
+
+from .models import OutputCache
+
+logger = logging.getLogger("filchat")
+
+
+def max_size():
+    return getattr(settings, 'FILCHAT_OUTPUT_CACHE_MAX_SIZE', 1024 ** 3)
+
+
+def output_dir_for_hash(sha256, compression=DEFAULT_COMPRESSION):
+    return os.path.join(settings.MEDIA_ROOT, 'output', sha256, str(compression).replace(':', '-'))
+
+
+def remove_files(entry):
+    """Supprime l'archive et le dossier de sortie d'une entrée de cache"""
+    dossier_hash = os.path.join(settings.MEDIA_ROOT, 'output', entry.sha256)
+    shutil.rmtree(output_dir_for_hash(entry.sha256, entry.compression), ignore_errors=True)
+    try:
+        # le dossier de l'empreinte n'est retiré que s'il ne sert plus
+        os.rmdir(dossier_hash)
+    except OSError:
+        pass
+
+
+def directory_size(chemin):
+    total = 0
+    for root, _, files in os.walk(chemin):
+        for file in files:
+            try:
+                total += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return total
+
+
+def lookup(sha256, compression=DEFAULT_COMPRESSION):
+    """Entrée de cache encore valide pour cette empreinte et cette compression, ou None"""
+    if not sha256:
+        return None
+    entry = OutputCache.objects.filter(sha256=sha256, compression=str(compression)).first()
+    if entry is None:
+        return None
+    if not os.path.exists(os.path.join(settings.MEDIA_ROOT, entry.archive)):
+        entry.delete()
+        return None
+    touch(entry)
+    return entry
+
+
+def touch(entry):
+    """Marque l'entrée comme récemment utilisée (politique LRU)"""
+    entry.last_used_at = timezone.now()
+    OutputCache.objects.filter(pk=entry.pk).update(last_used_at=entry.last_used_at)
+
+
+def store(sha256, archive, compression=DEFAULT_COMPRESSION):
+    """Enregistre le résultat d'un traitement puis applique le plafond de taille"""
+    entry, _ = OutputCache.objects.update_or_create(
+        sha256=sha256,
+        compression=str(compression),
+        defaults={
+            'archive': archive,
+            'size': directory_size(output_dir_for_hash(sha256, compression)),
+            'last_used_at': timezone.now(),
+        },
+    )
+    evict(garder=entry)
+    return entry
+
+
+def evict(limite=None, garder=None):
+    """Supprime les entrées les moins récemment utilisées au-delà du plafond
+
+    L'entrée `garder` (celle qui vient d'être produite) n'est jamais supprimée.
+    """
+    limite = max_size() if limite is None else limite
+    entries = OutputCache.objects.order_by('last_used_at')
+    if garder is not None:
+        entries = entries.exclude(pk=garder.pk)
+        limite -= garder.size
+    entries = list(entries)
+    total = sum(entry.size for entry in entries)
+    supprimees = 0
+    for entry in entries:
+        if total <= limite:
+            break
+        remove_files(entry)
+        entry.delete()
+        total -= entry.size
+        supprimees += 1
+        logger.info(f"Cache FilChat : {entry} supprimé ({entry.size} octets)")
+    return supprimees
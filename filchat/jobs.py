@@ -0,0 +1,187 @@
+#filchat.jobs.py
+"""File de traitement des fichiers de chat, stockée en base de données
+
+Les vues se contentent de créer une ligne FilChat (statut « queued ») ;
+le worker lancé par ``manage.py filchat_worker`` réserve les traitements
+un par un et met à jour leur statut et leur progression. Avec PostgreSQL,
+des workers sur plusieurs serveurs se partagent la file sans se bloquer.
+"""
+import errno
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from chatsplit.compression import parse_compression
+from chatsplit.profiling import JobProfile
+from chatsplit.progress import ProgressTracker
+from chatsplit.staging import discard_tree, make_staging_dir, swap_into_place
+
+from . import cache
+from .models import FilChat
+from .uploads import file_checksum
+from .utils import archive_chat
+
+logger = logging.getLogger("filchat")
+
+# secondes entre deux enregistrements de la progression en base
+PROGRESS_INTERVAL = 1.0
+
+
+def enqueue(chat_file):
+    """Place un fichier de chat dans la file de traitement"""
+    chat_file.status = FilChat.Status.QUEUED
+    chat_file.progress = 0
+    chat_file.progress_info = {}
+    chat_file.report = {}
+    chat_file.error = ''
+    chat_file.save(
+        update_fields=['status', 'progress', 'progress_info', 'report', 'error', 'updated_at']
+    )
+    return chat_file
+
+
+def mark_done(chat_file, archive):
+    """Termine un traitement avec l'archive donnée (relative à MEDIA_ROOT)"""
+    chat_file.archive = archive
+    chat_file.status = FilChat.Status.DONE
+    chat_file.processed = True
+    chat_file.progress = 100
+    chat_file.save(update_fields=['archive', 'status', 'processed', 'progress', 'updated_at'])
+    return chat_file
+
+
+def submit(chat_file):
+    """Réutilise un résultat en cache ou met le fichier en file
+
+    Seule l'empreinte déjà connue (envoi par morceaux) est consultée : celle
+    d'un fichier envoyé d'un bloc est calculée par le worker (`run_job`).
+    """
+    entry = cache.lookup(chat_file.sha256, chat_file.compression)
+    if entry is not None:
+        logger.info(f"Traitement {chat_file.id} servi depuis le cache ({chat_file.sha256})")
+        return mark_done(chat_file, entry.archive)
+    return enqueue(chat_file)
+
+
+def claim_next():
+    """Réserve le plus ancien traitement en attente, ou None si la file est vide"""
+    with transaction.atomic():
+        candidats = FilChat.objects.filter(status=FilChat.Status.QUEUED).order_by('created_at')
+        if connection.features.has_select_for_update_skip_locked:
+            # PostgreSQL : les lignes déjà verrouillées par un autre worker sont sautées
+            candidats = candidats.select_for_update(skip_locked=True)
+        for chat_file in candidats[:10]:
+            # mise à jour conditionnelle : un autre worker a pu le réserver entre-temps
+            reserve = FilChat.objects.filter(
+                pk=chat_file.pk, status=FilChat.Status.QUEUED
+            ).update(status=FilChat.Status.RUNNING, progress=0)
+            if reserve:
+                chat_file.refresh_from_db()
+                return chat_file
+    return None
+
+
+def requeue_running():
+    """Remet en attente les traitements interrompus (arrêt brutal du worker)"""
+    return FilChat.objects.filter(status=FilChat.Status.RUNNING).update(
+        status=FilChat.Status.QUEUED, progress=0
+    )
+
+
+def set_progress(chat_file, progress):
+    """Enregistre la progression (chatsplit.progress.Progress) d'un traitement"""
+    chat_file.progress = progress.percent
+    chat_file.progress_info = progress.to_dict()
+    FilChat.objects.filter(pk=chat_file.pk).update(
+        progress=chat_file.progress, progress_info=chat_file.progress_info
+    )
+
+
+def output_dir_for(chat_file):
+    """Dossier de sortie d'un fichier de chat, partagé par les contenus identiques"""
+    if chat_file.sha256:
+        return cache.output_dir_for_hash(chat_file.sha256, chat_file.compression)
+    return os.path.join(settings.MEDIA_ROOT, 'output', str(chat_file.id))
+
+
+def publish(staging, output_dir):
+    """Renomme `staging` en `output_dir` ; False si `output_dir` existe et n'est pas vide"""
+    try:
+        os.rename(staging, output_dir)
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            raise
+        return False
+    return True
+
+
+def run_job(chat_file):
+    """Découpe le fichier et crée l'archive, en tenant le statut à jour
+
+    Le résultat est construit dans un dossier propre au traitement puis
+    renommé à l'emplacement partagé par les contenus identiques : deux
+    traitements du même fichier, sur un ou plusieurs serveurs, n'écrivent
+    jamais dans le même dossier.
+    """
+    try:
+        profil = JobProfile()
+        if not chat_file.sha256:
+            with profil.stage('checksum'):
+                chat_file.sha256 = file_checksum(chat_file.file.path, 'sha256')
+            chat_file.save(update_fields=['sha256', 'updated_at'])
+
+        # un envoi identique a pu être traité pendant l'attente
+        entry = cache.lookup(chat_file.sha256, chat_file.compression)
+        if entry is not None:
+            return mark_done(chat_file, entry.archive)
+
+        output_dir = output_dir_for(chat_file)
+        with profil.stage('prepare'):
+            staging = make_staging_dir(output_dir)
+
+        # decoupe le fichier de chat directement dans l'archive
+        compression = parse_compression(chat_file.compression)
+        suivi = ProgressTracker(
+            lambda progress: set_progress(chat_file, progress),
+            os.path.getsize(chat_file.file.path),
+            1,
+            PROGRESS_INTERVAL,
+        )
+        suivi.start_file(os.path.basename(chat_file.file.name))
+        try:
+            archive_path = archive_chat(
+                chat_file.file.path, staging, compression, suivi, profil
+            )
+        except BaseException:
+            discard_tree(staging)
+            raise
+        suivi.end_file(os.path.getsize(chat_file.file.path))
+        suivi.finish()
+        if not publish(staging, output_dir):
+            entry = cache.lookup(chat_file.sha256, chat_file.compression)
+            if entry is not None:
+                # le même contenu a été traité ailleurs pendant ce traitement
+                discard_tree(staging)
+                return mark_done(chat_file, entry.archive)
+            # restes d'une entrée de cache supprimée : remplacés d'un coup
+            swap_into_place(staging, output_dir)
+        archive_path = os.path.join(output_dir, os.path.basename(archive_path))
+        archive = os.path.relpath(archive_path, settings.MEDIA_ROOT)
+
+        profil.count('exchanges', suivi.exchanges)
+        profil.finish()
+        chat_file.report = profil.to_dict()
+        logger.info(f"Rapport du traitement {chat_file.id} : {json.dumps(chat_file.report)}")
+        chat_file.save(update_fields=['report', 'updated_at'])
+        mark_done(chat_file, archive)
+        cache.store(chat_file.sha256, archive, chat_file.compression)
+        logger.info(f"Traitement {chat_file.id} terminé : {chat_file.archive}")
+    except Exception as e:
+        logger.exception(f"Erreur lors du traitement {chat_file.id}")
+        chat_file.status = FilChat.Status.FAILED
+        chat_file.error = str(e)
+        chat_file.save(update_fields=['status', 'error', 'updated_at'])
+    return chat_file
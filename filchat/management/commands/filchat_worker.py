@@ -0,0 +1,53 @@
+#filchat.management.commands.filchat_worker.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from filchat import jobs, uploads
+
+# secondes entre deux purges des envois abandonnés
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Traite en tâche de fond les fichiers de chat en attente"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Vide la file d'attente puis s'arrête",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help="Délai en secondes entre deux consultations de la file vide",
+        )
+        parser.add_argument(
+            '--requeue', action='store_true',
+            help="Remet en attente les traitements restés « en cours » (worker unique)",
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue']:
+            nombre = jobs.requeue_running()
+            self.stdout.write(f"{nombre} traitement(s) remis en attente")
+
+        self.stdout.write("Worker FilChat démarré")
+        prochaine_purge = 0
+        try:
+            while True:
+                if time.monotonic() >= prochaine_purge:
+                    uploads.purge_abandoned()
+                    prochaine_purge = time.monotonic() + PURGE_INTERVAL
+
+                chat_file = jobs.claim_next()
+                if chat_file is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                self.stdout.write(f"Traitement de {chat_file} ({chat_file.id})...")
+                chat_file = jobs.run_job(chat_file)
+                self.stdout.write(f"  -> {chat_file.get_status_display()}")
+        except KeyboardInterrupt:
+            self.stdout.write("Worker FilChat arrêté")
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.9 on 2026-10-17 22:06
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def marquer_traites(apps, schema_editor):
+    """Les fichiers déjà traités passent au statut « done »"""
+    FilChat = apps.get_model("filchat", "FilChat")
+    for chat_file in FilChat.objects.filter(processed=True):
+        chat_file.status = "done"
+        chat_file.progress = 100
+        dossier = os.path.join("output", str(chat_file.id))
+        if os.path.isdir(os.path.join(settings.MEDIA_ROOT, dossier)):
+            archives = sorted(
+                f
+                for f in os.listdir(os.path.join(settings.MEDIA_ROOT, dossier))
+                if f.endswith(".zip")
+            )
+            if archives:
+                chat_file.archive = os.path.join(dossier, archives[-1])
+        chat_file.save(update_fields=["status", "progress", "archive"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filchat", "0002_rename_intro_filchatpage_body"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filchat",
+            name="archive",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="filchat",
+            name="error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="filchat",
+            name="progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="filchat",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("queued", "En attente"),
+                    ("running", "En cours"),
+                    ("done", "Terminé"),
+                    ("failed", "Échec"),
+                ],
+                db_index=True,
+                default="queued",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="filchat",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(marquer_traites, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.9 on 2026-10-17 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filchat", "0005_outputcache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filchat",
+            name="compression",
+            field=models.CharField(default="deflate", max_length=16),
+        ),
+        migrations.AddField(
+            model_name="outputcache",
+            name="compression",
+            field=models.CharField(default="deflate", max_length=16),
+        ),
+        migrations.AlterField(
+            model_name="outputcache",
+            name="sha256",
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="outputcache",
+            constraint=models.UniqueConstraint(
+                fields=("sha256", "compression"), name="filchat_outputcache_unique"
+            ),
+        ),
+    ]
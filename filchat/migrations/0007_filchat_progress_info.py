@@ -0,0 +1,18 @@
+# Generated by Django 6.0.9 on 2026-10-17 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filchat", "0006_archive_compression"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filchat",
+            name="progress_info",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.9 on 2026-10-17 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filchat", "0007_filchat_progress_info"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="filchat",
+            name="report",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
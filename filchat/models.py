@@ -1,18 +1,67 @@
 #filchat.models.py
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from wagtail.admin.panels import FieldPanel
 from wagtail.fields import RichTextField
 from wagtail.models import Page
 
+from chatsplit.compression import DEFAULT_COMPRESSION, choices
+
 
 class FilChat(models.Model):
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'En attente'
+        RUNNING = 'running', 'En cours'
+        DONE = 'done', 'Terminé'
+        FAILED = 'failed', 'Échec'
+
     file = models.FileField(upload_to='uploads/')
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     processed = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED, db_index=True
+    )
+    progress = models.PositiveSmallIntegerField(default=0)  # en pourcentage
+    # détail de la progression : octets, échanges, débit, temps restant (Progress.to_dict)
+    progress_info = models.JSONField(default=dict, blank=True)
+    # rapport de fin de traitement : temps par étape et compteurs (JobProfile.to_dict)
+    report = models.JSONField(default=dict, blank=True)
+    archive = models.CharField(max_length=255, blank=True)  # relatif à MEDIA_ROOT
+    compression = models.CharField(max_length=16, default=DEFAULT_COMPRESSION)
+    error = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.file.name
 
+    @property
+    def is_finished(self):
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+
+class OutputCache(models.Model):
+    """Résultat de traitement partagé par tous les envois d'un même contenu"""
+    sha256 = models.CharField(max_length=64)
+    compression = models.CharField(max_length=16, default=DEFAULT_COMPRESSION)
+    archive = models.CharField(max_length=255)  # relatif à MEDIA_ROOT
+    size = models.BigIntegerField(default=0)  # octets occupés dans media/output
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sha256', 'compression'], name='filchat_outputcache_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256} ({self.compression})"
+
 
 class FilchatPage(Page):
     template = "filchat/filchat_page.html"
@@ -20,3 +69,30 @@ class FilchatPage(Page):
     content_panels = Page.content_panels + [
         FieldPanel('body'),
     ]
+
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request, *args, **kwargs)
+        context['compressions'] = choices()
+        context['default_compression'] = DEFAULT_COMPRESSION
+        return context
+
+
+class ChunkedUpload(models.Model):
+    """Envoi d'un fichier de chat par morceaux, reprenable après coupure"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    path = models.CharField(max_length=255)  # relatif à MEDIA_ROOT, dans uploads/
+    size = models.BigIntegerField()  # taille annoncée par le client
+    offset = models.BigIntegerField(default=0)  # octets reçus et acquittés
+    filchat = models.OneToOneField(
+        FilChat, null=True, blank=True, on_delete=models.SET_NULL, related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def is_complete(self):
+        return self.filchat_id is not None
@@ -0,0 +1,243 @@
+#filchat.uploads.py
+"""Envoi par morceaux des exports de chat volumineux
+
+Chaque morceau est écrit directement à sa position dans le fichier final
+(``uploads/``) : renvoyer un morceau déjà reçu est sans effet, et la taille
+du fichier sur disque donne la position à partir de laquelle reprendre.
+
+Le SHA-256 et le CRC32 sont calculés au fil des morceaux reçus ; un
+processus qui reçoit un morceau sans avoir vu les précédents (autre worker,
+redémarrage) relit seulement la partie du fichier qui lui manque. La somme
+de contrôle est vérifiée à la fin, avant la création du FilChat, dont le
+SHA-256 est toujours renseigné.
+
+Les envois abandonnés sont supprimés après FILCHAT_UPLOAD_TTL secondes
+(`purge_abandoned`, appelée par le worker).
+"""
+import hashlib
+import logging
+import os
+import time
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from chatsplit.compression import DEFAULT_COMPRESSION
+
+from .models import ChunkedUpload, FilChat
+
+UPLOAD_DIR = 'uploads'
+COPY_BUFFER_SIZE = 64 * 1024
+CHECKSUM_ALGORITHMS = ('sha256', 'crc32')
+
+logger = logging.getLogger("filchat")
+
+
+class UploadError(Exception):
+    """Erreur d'envoi, accompagnée du code HTTP à renvoyer"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def max_chunk_size():
+    return getattr(settings, 'FILCHAT_UPLOAD_MAX_CHUNK_SIZE', 8 * 1024 * 1024)
+
+
+def upload_ttl():
+    return getattr(settings, 'FILCHAT_UPLOAD_TTL', 24 * 3600)
+
+
+class RunningChecksum:
+    """SHA-256 et CRC32 des `covered` premiers octets d'un envoi"""
+
+    def __init__(self):
+        self.covered = 0
+        self.sha256 = hashlib.sha256()
+        self.crc32 = 0
+        self.used_at = time.monotonic()
+
+    def update(self, bloc):
+        self.sha256.update(bloc)
+        self.crc32 = zlib.crc32(bloc, self.crc32)
+        self.covered += len(bloc)
+
+    def catch_up(self, chemin, position):
+        """Complète le calcul jusqu'à `position` en relisant le fichier"""
+        if self.covered >= position:
+            return
+        with open(chemin, 'rb') as f:
+            f.seek(self.covered)
+            while self.covered < position:
+                bloc = f.read(min(COPY_BUFFER_SIZE, position - self.covered))
+                if not bloc:
+                    break
+                self.update(bloc)
+
+    def hexdigest(self, algorithme):
+        if algorithme == 'sha256':
+            return self.sha256.hexdigest()
+        return f"{self.crc32:08x}"
+
+
+# sommes en cours de calcul dans ce processus, par identifiant d'envoi
+_running = {}
+
+
+def _take_checksum(upload):
+    """Retire l'état du calcul en cours (un nouveau s'il est absent)"""
+    return _running.pop(upload.id, None) or RunningChecksum()
+
+
+def _keep_checksum(upload, somme):
+    somme.used_at = time.monotonic()
+    _running[upload.id] = somme
+    # états des envois abandonnés, jamais terminés dans ce processus
+    limite = time.monotonic() - upload_ttl()
+    for cle in [cle for cle, s in _running.items() if s.used_at < limite]:
+        _running.pop(cle, None)
+
+
+def absolute_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, upload.path)
+
+
+def received_size(upload):
+    """Nombre d'octets effectivement présents sur disque"""
+    try:
+        return os.path.getsize(absolute_path(upload))
+    except FileNotFoundError:
+        return 0
+
+
+def start_upload(filename, size):
+    """Réserve l'emplacement définitif du fichier et crée la session d'envoi"""
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        raise UploadError("Nom de fichier manquant")
+    if size < 0:
+        raise UploadError("Taille invalide")
+
+    path = default_storage.get_available_name(os.path.join(UPLOAD_DIR, filename))
+    chemin = os.path.join(settings.MEDIA_ROOT, path)
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    open(chemin, 'xb').close()
+    return ChunkedUpload.objects.create(filename=filename, path=path, size=size)
+
+
+def write_chunk(upload, offset, stream, length):
+    """Écrit un morceau à la position donnée et retourne la nouvelle position acquittée"""
+    if upload.is_complete:
+        raise UploadError("Envoi déjà terminé", status=409)
+    if length <= 0:
+        raise UploadError("Morceau vide")
+    if length > max_chunk_size():
+        raise UploadError("Morceau trop volumineux", status=413)
+
+    recu = received_size(upload)
+    if offset > recu:
+        # un morceau précédent manque : le client doit reprendre à `recu`
+        raise UploadError(f"Position attendue : {recu}", status=409)
+    if offset + length > upload.size:
+        raise UploadError("Le morceau dépasse la taille annoncée")
+
+    somme = _take_checksum(upload)
+    somme.catch_up(absolute_path(upload), offset)
+    ecrit = 0
+    with open(absolute_path(upload), 'r+b') as f:
+        while ecrit < length:
+            bloc = stream.read(min(COPY_BUFFER_SIZE, length - ecrit))
+            if not bloc:
+                break
+            position = offset + ecrit
+            # octets déjà comptés (morceau renvoyé) : ils doivent être identiques
+            deja_vus = max(0, min(somme.covered - position, len(bloc))) if somme is not None else 0
+            if deja_vus:
+                f.seek(position)
+                if f.read(deja_vus) != bloc[:deja_vus]:
+                    somme = None  # recalculé depuis le début au prochain morceau
+            f.seek(position)
+            f.write(bloc)
+            if somme is not None:
+                somme.update(bloc[deja_vus:])
+            ecrit += len(bloc)
+        f.flush()
+        os.fsync(f.fileno())
+
+    if somme is not None:
+        _keep_checksum(upload, somme)
+    if ecrit != length:
+        raise UploadError("Morceau incomplet")
+
+    upload.offset = received_size(upload)
+    upload.save(update_fields=['offset', 'updated_at'])
+    return upload.offset
+
+
+def file_checksum(chemin, algorithme):
+    """Somme de contrôle du fichier reçu, calculée en flux"""
+    if algorithme == 'sha256':
+        h = hashlib.sha256()
+        with open(chemin, 'rb') as f:
+            for bloc in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+                h.update(bloc)
+        return h.hexdigest()
+
+    crc = 0
+    with open(chemin, 'rb') as f:
+        for bloc in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            crc = zlib.crc32(bloc, crc)
+    return f"{crc:08x}"
+
+
+def complete_upload(upload, checksum, compression=DEFAULT_COMPRESSION):
+    """Vérifie la taille et la somme de contrôle puis crée le FilChat"""
+    if upload.is_complete:
+        return upload.filchat
+
+    algorithme, _, attendu = (checksum or '').partition(':')
+    if algorithme not in CHECKSUM_ALGORITHMS or not attendu:
+        raise UploadError("Somme de contrôle attendue au format 'sha256:<hex>' ou 'crc32:<hex>'")
+
+    recu = received_size(upload)
+    if recu != upload.size:
+        raise UploadError(f"Fichier incomplet : {recu}/{upload.size} octets", status=409)
+
+    somme = _take_checksum(upload)
+    somme.catch_up(absolute_path(upload), upload.size)
+    if somme.hexdigest(algorithme) != attendu.lower():
+        # données corrompues : on repart de zéro
+        with open(absolute_path(upload), 'wb'):
+            pass
+        upload.offset = 0
+        upload.save(update_fields=['offset', 'updated_at'])
+        raise UploadError("Somme de contrôle invalide, l'envoi doit être recommencé", status=422)
+
+    chat_file = FilChat(compression=compression)
+    chat_file.file.name = upload.path
+    chat_file.sha256 = somme.hexdigest('sha256')
+    chat_file.save()
+    upload.filchat = chat_file
+    upload.save(update_fields=['filchat', 'updated_at'])
+    return chat_file
+
+
+def purge_abandoned(ttl=None):
+    """Supprime les envois non terminés inactifs depuis `ttl` secondes, et leur fichier"""
+    limite = timezone.now() - timedelta(seconds=upload_ttl() if ttl is None else ttl)
+    supprimes = 0
+    for upload in ChunkedUpload.objects.filter(filchat__isnull=True, updated_at__lt=limite):
+        try:
+            os.remove(absolute_path(upload))
+        except FileNotFoundError:
+            pass
+        _running.pop(upload.id, None)
+        upload.delete()
+        supprimes += 1
+    if supprimes:
+        logger.info(f"{supprimes} envoi(s) abandonné(s) supprimé(s)")
+    return supprimes
@@ -7,6 +7,12 @@ app_name = 'filchat'
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('upload/', views.upload_start, name='upload_start'),
+    path('upload/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('upload/<uuid:upload_id>/complete/', views.upload_complete, name='upload_complete'),
     path('process/<int:file_id>/', views.process_file, name='process_file'),
+    path('process/<int:file_id>/retry/', views.reprocess_file, name='reprocess_file'),
+    path('status/<int:file_id>/', views.job_status, name='job_status'),
     path('download/<int:file_id>/', views.download_file, name='download_file'),
+    path('download/<int:file_id>/stream/', views.stream_file, name='stream_file'),
 ]
\ No newline at end of file
@@ -1,73 +1,67 @@
 #filchat.utils.py
 import os
-import zipfile
+import time
 from datetime import datetime
 
+from chatsplit.compression import (create_archive, open_archive_writer,
+                                   parse_compression)
+from chatsplit.conversations import is_json_export, write_conversations
+from chatsplit.parser import parse_chat_file
+from chatsplit.writer import MarkdownWriter
+
 
 def decoupe_chat(fichier_source, dossier_sortie):
-    """Découpe un fichier de chat en plusieurs fichiers Markdown"""
-    # Créer le dossier de sortie
-    os.makedirs(dossier_sortie, exist_ok=True)
+    """Découpe un fichier de chat en plusieurs fichiers Markdown
+
+    Un export JSON (conversations.json) donne un dossier par conversation.
+    Retourne le nombre de fichiers écrits.
+    """
+    # Génération des fichiers au fil de la lecture, écrits par lots
+    with MarkdownWriter(dossier_sortie) as writer:
+        if is_json_export(fichier_source):
+            write_conversations(fichier_source, writer)
+        else:
+            for index, (q, r) in enumerate(parse_chat_file(fichier_source), start=1):
+                writer.write(writer.filename(index), q, r)
+    return writer.files_written
+
 
-    with open(fichier_source, "r", encoding="utf-8") as f:
-        lignes = f.readlines()
-    
-    questions = []
-    current_question = None
-    current_answer = None
-    mode = None  # "question" ou "answer"
+def nom_archive_du_jour(compression=None):
+    extension = compression.extension if compression else ".zip"
+    return f"{datetime.now().strftime('%Y%m%d')}{extension}"
 
-    for ligne in lignes:
-        if "Vous avez dit :" in ligne:
-            if current_question is not None and current_answer is not None:
-                questions.append((current_question.strip(), current_answer.strip()))
-            current_question = ""
-            current_answer = ""
-            mode = "question"
-            continue
-        if "ChatGpt a dit :" in ligne:
-            mode = "answer"
-            continue
-        
-        if mode == "question":
-            current_question += ligne
-        elif mode == "answer":
-            current_answer += ligne
-        
-    if current_question is not None and current_answer is not None:
-        questions.append((current_question.strip(), current_answer.strip()))
-    
-    # Génération des fichiers
-    for index, (q, r) in enumerate(questions, start=1):
-        nom_fichier = f"{datetime.now().strftime('%Y%m%d')}-{index:03d}.md"
-        chemin = os.path.join(dossier_sortie, nom_fichier)
-        contenu = f"""---
-categorie:
-date: {datetime.now().strftime('%Y-%m-%d')}
----
 
-# Question
-{q}
+def archive_chat(fichier_source, dossier_output, compression=None, progress=None, profile=None):
+    """Découpe un fichier de chat directement dans l'archive du dossier output
+
+    Aucun fichier Markdown n'est écrit sur disque : chaque échange est
+    compressé dans l'archive au fil de la lecture. `progress` est un
+    ProgressTracker informé de chaque échange, `profile` un JobProfile qui
+    reçoit les temps de découpe et de compression et les volumes.
+    """
+    compression = compression or parse_compression(None)
+    chemin_archive = os.path.join(dossier_output, nom_archive_du_jour(compression))
+    debut = time.perf_counter()
+    with open_archive_writer(chemin_archive, compression) as writer:
+        if is_json_export(fichier_source):
+            write_conversations(fichier_source, writer, progress=progress)
+        else:
+            echanges = parse_chat_file(fichier_source, progress=progress)
+            for index, (q, r) in enumerate(echanges, start=1):
+                writer.write(writer.filename(index), q, r)
+    if profile is not None:
+        profile.add_time('parse', time.perf_counter() - debut - writer.write_seconds)
+        profile.add_time('archive', writer.write_seconds)
+        profile.count('bytes_read', os.path.getsize(fichier_source))
+        profile.count('files_written', writer.files_written)
+        profile.count('bytes_written', writer.bytes_written)
+        profile.count('bytes_compressed', os.path.getsize(chemin_archive))
+    return chemin_archive
 
-# Réponse
-{r}
-"""
-        with open(chemin, "w", encoding="utf-8") as out:
-            out.write(contenu)
-        
-def creer_archive_output(dossier_output):
-    """Crée une archive ZIP du dossier output"""
-    date_du_jour = datetime.now().strftime("%Y%m%d")
-    nom_archive = f"{date_du_jour}.zip"
-    chemin_archive = os.path.join(dossier_output, nom_archive)
 
-    with zipfile.ZipFile(chemin_archive, "w", zipfile.ZIP_DEFLATED) as zipf:
-        for root, _, files in os.walk(dossier_output):
-            for file in files:
-                if not file.endswith(".zip"):
-                    chemin_fichier = os.path.join(root, file)
-                    arcname = os.path.relpath(chemin_fichier, dossier_output)
-                    zipf.write(chemin_fichier, arcname)
+def creer_archive_output(dossier_output, compression=None):
+    """Crée une archive du dossier output"""
+    compression = compression or parse_compression(None)
+    chemin_archive = os.path.join(dossier_output, nom_archive_du_jour(compression))
+    create_archive(dossier_output, chemin_archive, compression)
     return chemin_archive
-        
-        
@@ -1,52 +1,189 @@
 #filchat.views.py
 
 import os
-import zipfile
-from datetime import datetime
+from datetime import date, datetime
 
 from django.conf import settings
-from django.http import FileResponse, HttpResponse
-from django.shortcuts import redirect, render
+from django.http import (FileResponse, Http404, JsonResponse,
+                         StreamingHttpResponse)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods, require_POST
 
-from .models import FilChat
-from .utils import creer_archive_output, decoupe_chat
+from chatsplit.archive import iter_zip
+from chatsplit.compression import (DEFAULT_COMPRESSION, ZIP_METHODS, choices,
+                                   parse_compression)
+from chatsplit.conversations import is_json_export, iter_conversation_entries
+from chatsplit.markdown import iter_markdown_entries
+from chatsplit.parser import parse_chat_file
 
+from . import cache, jobs, uploads
+from .models import ChunkedUpload, FilChat, OutputCache
+
+
+def _page_context(**context):
+    return {
+        'compressions': choices(),
+        'default_compression': DEFAULT_COMPRESSION,
+        'current_year': datetime.now().year,
+        **context,
+    }
+
+def _compression_from(request):
+    """Compression choisie dans le formulaire ; lève ValueError si invalide"""
+    return str(parse_compression(request.POST.get('compression')))
 
 def home(request):
     if request.method == 'POST' and request.FILES.get('file'):
-        chat_file = FilChat(file=request.FILES['file'])
+        try:
+            compression = _compression_from(request)
+        except ValueError as e:
+            return render(request, 'filchat/filchat_page.html', _page_context(error=str(e)), status=400)
+        chat_file = FilChat(file=request.FILES['file'], compression=compression)
         chat_file.save()
+        jobs.submit(chat_file)
         return redirect('filchat:process_file', file_id=chat_file.id)
-    return render(request, 'filchat/filchat_page.html', {'current_year': datetime.now().year})
+    return render(request, 'filchat/filchat_page.html', _page_context())
 
-def process_file(request, file_id):
-    chat_file = FilChat.objects.get(id=file_id)
-    if not chat_file.processed:
+def _upload_state(upload):
+    return {
+        'upload_id': str(upload.id),
+        'offset': uploads.received_size(upload),
+        'size': upload.size,
+        'chunk_size': uploads.max_chunk_size(),
+        'complete': upload.is_complete,
+    }
+
+@require_POST
+def upload_start(request):
+    """Démarre un envoi par morceaux : POST filename, size"""
+    try:
+        size = int(request.POST.get('size', ''))
+        upload = uploads.start_upload(request.POST.get('filename'), size)
+    except ValueError:
+        return JsonResponse({'error': "Taille invalide"}, status=400)
+    except uploads.UploadError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+    return JsonResponse(_upload_state(upload), status=201)
+
+@require_http_methods(['GET', 'PUT'])
+def upload_chunk(request, upload_id):
+    """GET : position de reprise ; PUT ?offset=N : ajoute un morceau (corps brut)"""
+    upload = get_object_or_404(ChunkedUpload, id=upload_id)
+    if request.method == 'PUT':
+        try:
+            offset = int(request.GET.get('offset', ''))
+        except ValueError:
+            return JsonResponse({'error': "Position invalide"}, status=400)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH', ''))
+        except ValueError:
+            return JsonResponse({'error': "En-tête Content-Length requis"}, status=411)
         try:
-            file_path = chat_file.file.path
-            output_dir = os.path.join(settings.MEDIA_ROOT, 'output', str(chat_file.id))
-            os.makedirs(output_dir, exist_ok=True)
-
-            # decoupe le fichier de chat
-            decoupe_chat(file_path, output_dir)
-            # cree une archive
-            archive_path = creer_archive_output(output_dir)
-            chat_file.processed = True
-            chat_file.save()
-            return render(
-                request, 
-                'filchat/filchat_page.html', 
-                {'file_id': file_id, 'archive_path': archive_path}
-            )
-        except Exception as e:
-            return HttpResponse(f"Erreur lors du traitement: {str(e)}", status=500)
-    return render(request, 'filchat.filchat_page.html',
-        {'file_id': file_id, 'current_year': datetime.now().year}
-    )
+            uploads.write_chunk(upload, offset, request, length)
+        except uploads.UploadError as e:
+            return JsonResponse({'error': str(e), **_upload_state(upload)}, status=e.status)
+    return JsonResponse(_upload_state(upload))
+
+@require_POST
+def upload_complete(request, upload_id):
+    """Termine l'envoi : POST checksum=sha256:<hex> ou crc32:<hex>, compression"""
+    upload = get_object_or_404(ChunkedUpload, id=upload_id)
+    deja_termine = upload.is_complete
+    try:
+        compression = _compression_from(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        chat_file = uploads.complete_upload(upload, request.POST.get('checksum'), compression)
+    except uploads.UploadError as e:
+        return JsonResponse({'error': str(e), **_upload_state(upload)}, status=e.status)
+    if not deja_termine:
+        jobs.submit(chat_file)
+    return JsonResponse({
+        'file_id': chat_file.id,
+        'process_url': reverse('filchat:process_file', kwargs={'file_id': chat_file.id}),
+    })
+
+def _archive_path(chat_file):
+    """Chemin de l'archive d'un traitement terminé, ou None"""
+    if chat_file.status != FilChat.Status.DONE or not chat_file.archive:
+        return None
+    return os.path.join(settings.MEDIA_ROOT, chat_file.archive)
+
+def _archive_missing(chat_file):
+    archive_path = _archive_path(chat_file)
+    return archive_path is not None and not os.path.exists(archive_path)
+
+def process_file(request, file_id):
+    """Page de suivi : le traitement lui-même est réalisé par le worker"""
+    chat_file = get_object_or_404(FilChat, id=file_id)
+    return render(request, 'filchat/filchat_page.html', _page_context(
+        file_id=file_id,
+        chat_file=chat_file,
+        archive_missing=_archive_missing(chat_file),
+    ))
+
+@require_POST
+def reprocess_file(request, file_id):
+    """Relance le traitement d'un fichier dont l'archive a été supprimée du cache
+
+    L'empreinte est gardée : seule l'entrée de cache périmée est retirée
+    (voir cache.lookup), et un envoi identique traité entre-temps est
+    réutilisé.
+    """
+    chat_file = get_object_or_404(FilChat, id=file_id)
+    if _archive_missing(chat_file):
+        jobs.submit(chat_file)
+    return redirect('filchat:process_file', file_id=file_id)
+
+def job_status(request, file_id):
+    """Etat du traitement, interrogé périodiquement par la page de suivi"""
+    chat_file = get_object_or_404(FilChat, id=file_id)
+    data = {
+        'status': chat_file.status,
+        'status_display': chat_file.get_status_display(),
+        'progress': chat_file.progress,
+        'progress_info': chat_file.progress_info,
+        'report': chat_file.report,
+        'error': chat_file.error,
+        'download_url': None,
+        'stream_url': reverse('filchat:stream_file', kwargs={'file_id': file_id}),
+    }
+    if chat_file.status == FilChat.Status.DONE:
+        data['download_url'] = reverse('filchat:download_file', kwargs={'file_id': file_id})
+    return JsonResponse(data)
 
 def download_file(request, file_id):
-    chat_file = FilChat.objects.get(id=file_id)
-    date_du_jour = datetime.now().strftime("%Y%m%d")
-    nom_archive = f"{date_du_jour}.zip"
-    archive_path = os.path.join(settings.MEDIA_ROOT, 'output', str(chat_file.id), nom_archive)
-    return FileResponse(open(archive_path, 'rb'), as_attachment=True) 
\ No newline at end of file
+    chat_file = get_object_or_404(FilChat, id=file_id)
+    archive_path = _archive_path(chat_file)
+    if archive_path is None:
+        raise Http404("Archive non disponible")
+    if not os.path.exists(archive_path):
+        # archive supprimée du cache : la page de suivi propose de relancer
+        return redirect('filchat:process_file', file_id=file_id)
+    entry = OutputCache.objects.filter(
+        sha256=chat_file.sha256, compression=chat_file.compression
+    ).first()
+    if entry is not None:
+        cache.touch(entry)
+    return FileResponse(open(archive_path, 'rb'), as_attachment=True)
+
+def stream_file(request, file_id):
+    """Archive ZIP générée à la volée depuis le fichier source, sans passer par le disque"""
+    chat_file = get_object_or_404(FilChat, id=file_id)
+    if not chat_file.file or not os.path.exists(chat_file.file.path):
+        raise Http404("Fichier source introuvable")
+    jour = date.today()
+    compression = parse_compression(chat_file.compression)
+    if not compression.is_zip:
+        # le flux est toujours un ZIP : compression par défaut pour les autres formats
+        compression = parse_compression(DEFAULT_COMPRESSION)
+    if is_json_export(chat_file.file.path):
+        entries = iter_conversation_entries(chat_file.file.path, jour)
+    else:
+        entries = iter_markdown_entries(parse_chat_file(chat_file.file.path), jour)
+    zip_stream = iter_zip(entries, ZIP_METHODS[compression.method], compression.level)
+    response = StreamingHttpResponse(zip_stream, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{jour.strftime("%Y%m%d")}.zip"'
+    return response
@@ -147,9 +147,27 @@ Environment=DJANGO_SETTINGS_MODULE=config.settings.prod
 WantedBy=multi-user.target
 EOF
 
+cat > /etc/systemd/system/secretbox-worker.service <<EOF
+[Unit]
+Description=SecretBox - worker de traitement FilChat
+After=network.target
+
+[Service]
+User=$APP_USER
+WorkingDirectory=$APP_DIR
+ExecStart=$VENV_DIR/bin/python manage.py filchat_worker --requeue
+Restart=always
+EnvironmentFile=$DATA_DIR/.env
+Environment=ENV_FILE=$DATA_DIR/.env
+Environment=DJANGO_SETTINGS_MODULE=config.settings.prod
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 systemctl daemon-reload
-systemctl enable secretbox
-systemctl restart secretbox
+systemctl enable secretbox secretbox-worker
+systemctl restart secretbox secretbox-worker
 systemctl status secretbox
 
 # -------------------------
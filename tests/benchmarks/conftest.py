@@ -0,0 +1,68 @@
+"""Configuration des benchmarks du découpage et de l'archivage
+
+    pytest --benchmark-only                               # exports de 1 Mo
+    pytest --benchmark-only --bench-sizes=1,50,500        # toutes les tailles
+    pytest --benchmark-only --benchmark-save=baseline     # enregistre une référence
+    pytest --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:20%
+
+Les exports générés sont conservés dans tests/output/bench-data pour ne pas
+être recréés à chaque lancement.
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BENCH_DATA = os.path.join(RACINE, "tests", "output", "bench-data")
+
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from tests.benchmarks.synthetic import PROFILES, generate_export  # noqa: E402
+
+
+def pytest_generate_tests(metafunc):
+    if "export" in metafunc.fixturenames:
+        tailles = [int(t) for t in metafunc.config.getoption("--bench-sizes").split(",")]
+        params = [(taille, profil) for taille in tailles for profil in PROFILES]
+        metafunc.parametrize(
+            "export",
+            params,
+            ids=[f"{taille}Mo-{profil}" for taille, profil in params],
+            indirect=True,
+        )
+
+
+@pytest.fixture(scope="session")
+def bench_rounds(pytestconfig):
+    return pytestconfig.getoption("--bench-rounds")
+
+
+@pytest.fixture
+def export(request):
+    """Chemin d'un export synthétique (taille en Mo, profil d'échanges)"""
+    taille, profil = request.param
+    os.makedirs(BENCH_DATA, exist_ok=True)
+    chemin = os.path.join(BENCH_DATA, f"export-{taille}mo-{profil}.txt")
+    if not os.path.exists(chemin):
+        generate_export(chemin + ".tmp", taille, PROFILES[profil])
+        os.replace(chemin + ".tmp", chemin)
+    return chemin
+
+
+def _load_web_utils():
+    """filchat/utils.py du site, qui ne dépend que de chatsplit"""
+    spec = importlib.util.spec_from_file_location(
+        "filchat_web_utils", os.path.join(RACINE, "filchat", "utils.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def web_utils():
+    return _load_web_utils()
@@ -0,0 +1,142 @@
+"""Charge concurrente sur une base SQLite, comme plusieurs workers gunicorn
+
+Chaque client est un processus qui enchaîne des requêtes : lectures (pages,
+suivi d'un traitement) et, une fois sur WRITE_EVERY, une transaction qui lit
+puis écrit (avancement d'un FilChat et nouvelle révision). Deux réglages
+sont comparés : celui de Django par défaut (journal DELETE, BEGIN DEFERRED,
+une connexion par requête) et celui de la production (config.database).
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from config.database import SQLITE_TIMEOUT, sqlite_init_command
+
+WRITE_EVERY = 4
+ROWS = 200
+
+
+class Setup(NamedTuple):
+    """Réglage d'une connexion SQLite"""
+
+    name: str
+    timeout: float
+    init_commands: List[str]
+    begin: str
+    reuse_connection: bool
+
+
+SETUPS = {
+    # timeout de 5 s du module sqlite3, repris par Django
+    "defaut": Setup("defaut", 5.0, ["PRAGMA journal_mode=DELETE"], "BEGIN", False),
+    "production": Setup(
+        "production",
+        SQLITE_TIMEOUT,
+        [c for c in sqlite_init_command().split(";") if c.strip()],
+        "BEGIN IMMEDIATE",
+        True,
+    ),
+}
+
+
+def _connect(chemin: str, setup: Setup) -> sqlite3.Connection:
+    conn = sqlite3.connect(chemin, timeout=setup.timeout, isolation_level=None)
+    for commande in setup.init_commands:
+        conn.execute(commande)
+    return conn
+
+
+def prepare_database(chemin: str, setup: Setup):
+    """Crée une base neuve avec des FilChat et des révisions de page"""
+    for suffixe in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(chemin + suffixe):
+            os.remove(chemin + suffixe)
+    conn = _connect(chemin, setup)
+    conn.executescript("""
+        CREATE TABLE filchat (id INTEGER PRIMARY KEY, status TEXT, progress INTEGER);
+        CREATE TABLE revision (id INTEGER PRIMARY KEY, page_id INTEGER, content TEXT);
+        CREATE INDEX revision_page ON revision (page_id);
+        """)
+    conn.executemany(
+        "INSERT INTO filchat (id, status, progress) VALUES (?, 'pending', 0)",
+        [(n,) for n in range(ROWS)],
+    )
+    conn.executemany(
+        "INSERT INTO revision (page_id, content) VALUES (?, ?)",
+        [(n % 20, "x" * 500) for n in range(ROWS)],
+    )
+    conn.close()
+
+
+def _request(conn: sqlite3.Connection, setup: Setup, numero: int):
+    identifiant = numero % ROWS
+    conn.execute(
+        "SELECT content FROM revision WHERE page_id = ? ORDER BY id DESC LIMIT 1",
+        (identifiant % 20,),
+    ).fetchall()
+    conn.execute(
+        "SELECT status, progress FROM filchat WHERE id = ?", (identifiant,)
+    ).fetchone()
+    if numero % WRITE_EVERY:
+        return
+    conn.execute(setup.begin)
+    try:
+        progress = conn.execute(
+            "SELECT progress FROM filchat WHERE id = ?", (identifiant,)
+        ).fetchone()[0]
+        conn.execute(
+            "UPDATE filchat SET progress = ?, status = 'running' WHERE id = ?",
+            (progress + 1, identifiant),
+        )
+        conn.execute(
+            "INSERT INTO revision (page_id, content) VALUES (?, ?)",
+            (identifiant % 20, "y" * 500),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def run_client(chemin: str, setup: Setup, requetes: int) -> Dict[str, int]:
+    """Enchaîne `requetes` requêtes ; compte celles en échec « database is locked »"""
+    conn: Optional[sqlite3.Connection] = None
+    erreurs = 0
+    for numero in range(requetes):
+        if conn is None:
+            conn = _connect(chemin, setup)
+        try:
+            _request(conn, setup, numero)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            erreurs += 1
+        if not setup.reuse_connection:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    return {"requests": requetes, "locked": erreurs}
+
+
+def run_load(
+    chemin: str, setup: Setup, clients: int, requetes: int
+) -> Dict[str, float]:
+    """Lance `clients` processus en parallèle ; retourne requêtes, échecs et débit"""
+    debut = time.perf_counter()
+    with ProcessPoolExecutor(clients) as pool:
+        resultats = list(
+            pool.map(
+                run_client, [chemin] * clients, [setup] * clients, [requetes] * clients
+            )
+        )
+    duree = time.perf_counter() - debut
+    total = sum(r["requests"] for r in resultats)
+    return {
+        "requests": total,
+        "locked": sum(r["locked"] for r in resultats),
+        "requests_per_second": round(total / duree, 1),
+    }
@@ -0,0 +1,52 @@
+"""Exports ChatGPT synthétiques pour les benchmarks
+
+Le contenu est pseudo-aléatoire mais reproductible (graine fixe) : deux
+générations avec les mêmes paramètres donnent le même fichier.
+"""
+
+import random
+from typing import NamedTuple
+
+from chatsplit.parser import ANSWER_MARKER, QUESTION_MARKER
+
+MOTS = (
+    "le la les un une des et à de du pour avec sans dans sur fichier archive "
+    "question réponse python django markdown compression export conversation "
+    "données serveur obsidian coffre découpe ligne texte exemple été où ça"
+).split()
+
+
+class Profile(NamedTuple):
+    """Forme des échanges : longueur des questions et des réponses, en mots"""
+
+    name: str
+    question_words: int
+    answer_paragraphs: int
+    paragraph_words: int
+
+
+# beaucoup d'échanges courts / peu d'échanges longs, à taille de fichier égale
+PROFILES = {
+    "court": Profile("court", 12, 1, 40),
+    "long": Profile("long", 60, 12, 150),
+}
+
+
+def generate_export(chemin: str, taille_mo: int, profil: Profile, graine: int = 0) -> int:
+    """Ecrit un export d'environ `taille_mo` Mo et retourne le nombre d'échanges"""
+    alea = random.Random(graine)
+    cible = taille_mo * 1024 * 1024
+    ecrit = 0
+    echanges = 0
+    with open(chemin, "wb") as f:
+        while ecrit < cible:
+            question = " ".join(alea.choices(MOTS, k=alea.randint(1, 2 * profil.question_words)))
+            reponse = "\n\n".join(
+                " ".join(alea.choices(MOTS, k=alea.randint(1, 2 * profil.paragraph_words)))
+                for _ in range(alea.randint(1, 2 * profil.answer_paragraphs))
+            )
+            bloc = f"{QUESTION_MARKER}\n{question}\n{ANSWER_MARKER}\n{reponse}\n".encode()
+            f.write(bloc)
+            ecrit += len(bloc)
+            echanges += 1
+    return echanges
@@ -0,0 +1,80 @@
+"""Benchmarks du découpage et de l'archivage, de la lecture au job complet"""
+
+import os
+import shutil
+from datetime import date
+from itertools import islice
+
+import pytest
+
+# nombre d'échanges écrits par le benchmark de save_as_markdown
+SAVE_SAMPLE = 1000
+
+
+@pytest.mark.parametrize("engine", ["lines", "mmap"])
+def test_parse_chat_file(benchmark, bench_rounds, desktop, export, engine, monkeypatch):
+    ChatProcessor, _ = desktop
+    monkeypatch.setenv("FILCHAT_PARSER_ENGINE", engine)
+
+    def parse():
+        return sum(1 for _ in ChatProcessor.parse_chat_file(export))
+
+    assert benchmark.pedantic(parse, rounds=bench_rounds) > 0
+
+
+def test_decoupe_chat(benchmark, bench_rounds, web_utils, export, tmp_path):
+    sortie = tmp_path / "output"
+
+    def setup():
+        shutil.rmtree(sortie, ignore_errors=True)
+
+    benchmark.pedantic(
+        web_utils.decoupe_chat, args=(export, str(sortie)), setup=setup, rounds=bench_rounds
+    )
+    assert any(sortie.iterdir())
+
+
+def test_save_as_markdown(benchmark, bench_rounds, desktop, export, tmp_path):
+    ChatProcessor, _ = desktop
+    echanges = list(islice(ChatProcessor.parse_chat_file(export), SAVE_SAMPLE))
+    jour = date.today()
+
+    def save():
+        for index, (q, r) in enumerate(echanges, start=1):
+            ChatProcessor.save_as_markdown(q, r, str(tmp_path / f"{index:04d}.md"), jour)
+
+    benchmark.pedantic(save, rounds=bench_rounds)
+    assert len(os.listdir(tmp_path)) == len(echanges)
+
+
+def test_creer_archive_output(benchmark, bench_rounds, web_utils, export, tmp_path):
+    sortie = str(tmp_path / "output")
+    web_utils.decoupe_chat(export, sortie)
+
+    chemin_archive = benchmark.pedantic(
+        web_utils.creer_archive_output, args=(sortie,), rounds=bench_rounds
+    )
+    assert os.path.getsize(chemin_archive) > 0
+
+
+def test_processing_job_execute(
+    benchmark, bench_rounds, desktop, export, tmp_path, monkeypatch
+):
+    _, ProcessingJob = desktop
+    entree = tmp_path / "input"
+    entree.mkdir()
+    shutil.copy(export, entree)
+    # l'archive du job est écrite dans le répertoire courant
+    monkeypatch.chdir(tmp_path)
+
+    def execute():
+        job = ProcessingJob(
+            str(entree),
+            output_dir=str(tmp_path / "output"),
+            generate_archive=True,
+            force_clean=True,
+        )
+        return job.execute()
+
+    stats = benchmark.pedantic(execute, rounds=bench_rounds)
+    assert stats.files == 1 and stats.exchanges > 0
@@ -0,0 +1,28 @@
+"""Benchmark de SQLite sous écritures concurrentes : réglage par défaut et de production"""
+
+import pytest
+
+from tests.benchmarks.sqlite_load import SETUPS, prepare_database, run_load
+
+CLIENTS = 8
+REQUESTS = 400  # par client
+
+
+@pytest.mark.parametrize("setup", list(SETUPS))
+def test_sqlite_concurrent_requests(benchmark, bench_rounds, tmp_path, setup):
+    chemin = str(tmp_path / "db.sqlite3")
+    reglage = SETUPS[setup]
+    resultats = []
+
+    def run():
+        resultats.append(run_load(chemin, reglage, CLIENTS, REQUESTS))
+
+    benchmark.pedantic(
+        run,
+        setup=lambda: prepare_database(chemin, reglage),
+        rounds=bench_rounds,
+    )
+    benchmark.extra_info["locked"] = sum(r["locked"] for r in resultats)
+    benchmark.extra_info["requests_per_second"] = resultats[-1]["requests_per_second"]
+    if setup == "production":
+        assert benchmark.extra_info["locked"] == 0
@@ -0,0 +1,38 @@
+"""Exports de chat minimaux pour les tests"""
+
+from chatsplit.parser import ANSWER_MARKER, QUESTION_MARKER
+
+
+def chat_text(echanges=3, debut=0):
+    """Export de chat de `echanges` échanges numérotés à partir de `debut`"""
+    return "".join(
+        f"{QUESTION_MARKER}\nQuestion {n} ?\n{ANSWER_MARKER}\nRéponse {n}.\n"
+        for n in range(debut, debut + echanges)
+    ).encode("utf-8")
+
+
+def message(role, texte, **champs):
+    """Message de l'export officiel ChatGPT (conversations.json)"""
+    return {
+        "author": {"role": role},
+        "content": {"content_type": "text", "parts": [texte]},
+        **champs,
+    }
+
+
+def conversation(titre, echanges=2, id="conv"):
+    """Conversation de l'export officiel : une seule branche de `echanges` échanges"""
+    mapping = {"racine": {"id": "racine", "message": None, "parent": None, "children": []}}
+    parent = "racine"
+    for n in range(echanges):
+        for role, texte in (("user", f"Question {n} ?"), ("assistant", f"Réponse {n}.")):
+            noeud = f"{id}-{role}-{n}"
+            mapping[parent]["children"].append(noeud)
+            mapping[noeud] = {
+                "id": noeud,
+                "message": message(role, texte),
+                "parent": parent,
+                "children": [],
+            }
+            parent = noeud
+    return {"id": id, "title": titre, "current_node": parent, "mapping": mapping}
@@ -0,0 +1,99 @@
+"""Compression parallèle des membres ZIP (chatsplit.archive, chatsplit.writer)"""
+
+import io
+import zipfile
+
+import pytest
+
+from chatsplit import writer as writer_module
+from chatsplit.archive import (
+    compress_member,
+    iter_zip,
+    parallel_supported,
+    write_compressed,
+)
+from chatsplit.writer import ZipMarkdownWriter
+
+MEMBRES = [
+    (f"fil/{n:03d}.md", (f"# Échange {n}\n" + "réponse " * (n * 37 % 500)).encode("utf-8"))
+    for n in range(300)
+]
+METHODES = [zipfile.ZIP_DEFLATED, zipfile.ZIP_BZIP2, zipfile.ZIP_LZMA]
+
+
+def _info(nom, methode):
+    info = zipfile.ZipInfo(nom, (2026, 1, 1, 0, 0, 0))
+    info.compress_type = methode
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _lire(chemin):
+    with open(chemin, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("methode", METHODES)
+def test_membres_compresses_a_part_identiques_a_writestr(tmp_path, methode):
+    attendu = str(tmp_path / "writestr.zip")
+    obtenu = str(tmp_path / "parallele.zip")
+    with zipfile.ZipFile(attendu, "w", methode) as zipf:
+        for nom, contenu in MEMBRES:
+            zipf.writestr(_info(nom, methode), contenu)
+    with zipfile.ZipFile(obtenu, "w", methode) as zipf:
+        for nom, contenu in MEMBRES:
+            write_compressed(zipf, *compress_member(_info(nom, methode), contenu))
+
+    assert _lire(obtenu) == _lire(attendu)
+
+
+def _ecrire(chemin, threads, methode=zipfile.ZIP_DEFLATED):
+    writer = ZipMarkdownWriter(chemin, compression=methode, threads=threads)
+    writer._date_time = (2026, 1, 1, 0, 0, 0)
+    with writer:
+        for nom, contenu in MEMBRES:
+            writer.add(nom, contenu)
+    return writer
+
+
+@pytest.mark.parametrize("methode", METHODES)
+def test_writer_parallele_identique_au_sequentiel(tmp_path, methode):
+    sequentiel = _ecrire(str(tmp_path / "1.zip"), 1, methode)
+    parallele = _ecrire(str(tmp_path / "4.zip"), 4, methode)
+
+    assert sequentiel._pool is None and parallele._pool is not None
+    assert _lire(str(tmp_path / "4.zip")) == _lire(str(tmp_path / "1.zip"))
+
+
+def test_sans_elements_internes_de_zipfile(tmp_path, monkeypatch):
+    assert not parallel_supported(object())
+    monkeypatch.setattr(writer_module, "parallel_supported", lambda zipf: False)
+    writer = _ecrire(str(tmp_path / "archive.zip"), 4)
+
+    # repli sur l'écriture membre par membre
+    assert writer._pool is None
+    with zipfile.ZipFile(str(tmp_path / "archive.zip")) as zipf:
+        assert zipf.testzip() is None
+        assert [zipf.read(nom) for nom, _ in MEMBRES] == [contenu for _, contenu in MEMBRES]
+
+
+@pytest.mark.parametrize("methode", METHODES)
+def test_archive_en_flux_depuis_un_generateur(methode):
+    lus = []
+
+    def membres():
+        for nom, contenu in MEMBRES:
+            lus.append(nom)
+            yield nom, contenu.decode("utf-8")
+
+    flux = iter_zip(membres(), methode)
+    premier = next(flux)
+    # le premier morceau part avant que tous les membres soient produits
+    assert premier and len(lus) < len(MEMBRES)
+    donnees = premier + b"".join(flux)
+
+    with zipfile.ZipFile(io.BytesIO(donnees)) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.namelist() == [nom for nom, _ in MEMBRES]
+        assert all(zipf.read(nom) == contenu for nom, contenu in MEMBRES)
+        assert {info.compress_type for info in zipf.infolist()} == {methode}
@@ -0,0 +1,110 @@
+"""Pool de processus, annulation et pause (chatsplit.batch, chatsplit.control)"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from chatsplit.batch import run_in_pool, worker_checkpoint
+from chatsplit.control import JobCancelled, JobControl
+from tests.chats import chat_text, conversation
+from tests.conftest import DESKTOP
+
+
+def _attente(secondes):
+    """Tâche du pool : un point de contrôle toutes les 10 ms pendant `secondes`"""
+    fin = time.monotonic() + secondes
+    while time.monotonic() < fin:
+        worker_checkpoint()
+        time.sleep(0.01)
+    return secondes
+
+
+def test_controle_en_serie():
+    control = JobControl()
+    control.pause()
+    threading.Timer(0.2, control.cancel).start()
+    with pytest.raises(JobCancelled):
+        control.checkpoint()
+
+
+def test_annulation_pendant_un_fichier():
+    control = JobControl()
+    threading.Timer(1.0, control.cancel).start()
+    debut = time.monotonic()
+
+    with pytest.raises(JobCancelled):
+        list(run_in_pool(_attente, [(60,), (60,)], processes=2, control=control))
+    # les fichiers en cours s'arrêtent sans aller au bout
+    assert time.monotonic() - debut < 30
+
+
+def test_pause_puis_reprise():
+    control = JobControl()
+    control.pause()
+    threading.Timer(1.0, control.resume).start()
+    debut = time.monotonic()
+
+    resultats = list(run_in_pool(_attente, [(0.1,), (0.1,)], processes=2, control=control))
+    assert [resultat for _, resultat in resultats] == [0.1, 0.1]
+    assert time.monotonic() - debut >= 1.0
+
+
+def test_parcours_interrompu():
+    debut = time.monotonic()
+    for _ in run_in_pool(_attente, [(0.1,), (60,), (60,)], processes=2):
+        break
+    # les traitements restants sont annulés à la fermeture du générateur
+    assert time.monotonic() - debut < 30
+
+
+def _arbre(dossier):
+    """Chemins relatifs et contenus des fichiers Markdown sous `dossier`"""
+    fichiers = {}
+    for racine, _, noms in os.walk(dossier):
+        for nom in noms:
+            chemin = os.path.join(racine, nom)
+            with open(chemin, encoding="utf-8") as f:
+                fichiers[os.path.relpath(chemin, dossier)] = f.read()
+    return fichiers
+
+
+def test_pool_meme_sortie_qu_en_serie(tmp_path):
+    entree = tmp_path / "input"
+    entree.mkdir()
+    for i, nom in enumerate(("delta.txt", "alpha.txt", "charlie.txt", "bravo.txt")):
+        (entree / nom).write_bytes(chat_text(10 + 7 * i))
+    export = [conversation("Même titre", 3, "a"), conversation("Même titre", 2, "b")]
+    (entree / "conversations.json").write_text(json.dumps(export), encoding="utf-8")
+
+    sorties = {}
+    for jobs in (1, 2):
+        dossier = tmp_path / f"jobs{jobs}"
+        dossier.mkdir()
+        # script de l'application de bureau : son paquet `filchat` doit être
+        # importable par les processus "spawn" du pool, sans celui du site
+        commande = [sys.executable, os.path.join(DESKTOP, "filchat_cli.py"), str(entree)]
+        commande += ["--archive", "--jobs", str(jobs), "--report", "rapport.json", "-q"]
+        subprocess.run(commande, cwd=dossier, check=True, timeout=120)
+
+        with open(dossier / "rapport.json", encoding="utf-8") as f:
+            echanges = json.load(f)["counters"]["exchanges"]
+        archive = dossier / f"{datetime.now().strftime('%Y%m%d')}.zip"
+        with zipfile.ZipFile(archive) as zipf:
+            assert zipf.testzip() is None
+            membres = zipf.namelist()
+        sorties[jobs] = (echanges, _arbre(dossier / "output"), membres)
+
+    serie, pool = sorties[1], sorties[2]
+    assert serie[0] == pool[0] == 10 + 17 + 24 + 31 + 3 + 2
+    assert serie[1] == pool[1]
+    assert sorted(serie[2]) == sorted(pool[2])
+    assert sorted(serie[2]) == sorted(chemin.replace(os.sep, "/") for chemin in serie[1])
+    # aucun fichier de travail (staging, .tmp) ne reste dans la sortie
+    assert all(chemin.endswith(".md") for chemin in pool[1])
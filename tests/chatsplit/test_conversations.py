@@ -0,0 +1,123 @@
+"""Lecture en flux de l'export officiel de ChatGPT (chatsplit.conversations)"""
+
+import io
+import json
+import os
+from datetime import date
+
+import pytest
+
+from chatsplit.conversations import (
+    Conversation,
+    conversation_exchanges,
+    folder_name,
+    iter_json_values,
+    write_conversations,
+)
+from chatsplit.writer import MarkdownWriter
+from tests.chats import conversation, message
+
+VALEURS = [
+    {"title": "crochets [ et ] , virgules", "n": 1},
+    {"title": "échappements \" \\ \n et accents été", "parts": ["a", "b"]},
+    {"mapping": {"n": [1, 2, {"imbriqué": [3, 4]}]}, "nombre": 12345.5},
+    {},
+]
+
+
+def arbre(*noeuds, current_node=None):
+    """Conversation dont le `mapping` est donné par des (id, parent, message)"""
+    mapping = {}
+    for noeud_id, parent, contenu in noeuds:
+        mapping[noeud_id] = {"id": noeud_id, "message": contenu, "parent": parent, "children": []}
+        if parent is not None:
+            mapping[parent]["children"].append(noeud_id)
+    return {"title": "arbre", "current_node": current_node, "mapping": mapping}
+
+
+@pytest.mark.parametrize("read_size", range(1, 8))
+def test_tableau_json_lu_par_petits_blocs(read_size):
+    texte = json.dumps(VALEURS, ensure_ascii=False, indent=2)
+    assert list(iter_json_values(io.StringIO(texte), read_size)) == VALEURS
+
+
+@pytest.mark.parametrize("read_size", range(1, 8))
+def test_jsonl_lu_par_petits_blocs(read_size):
+    texte = "".join(json.dumps(v, ensure_ascii=False) + "\n" for v in VALEURS)
+    assert list(iter_json_values(io.StringIO(texte), read_size)) == VALEURS
+
+
+def test_json_tronque():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_values(io.StringIO('[{"title": "coupé"'), 4))
+
+
+def test_branche_du_noeud_courant():
+    conv = arbre(
+        ("racine", None, None),
+        ("q0", "racine", message("user", "Question 0 ?")),
+        ("r0", "q0", message("assistant", "Réponse 0.")),
+        # question modifiée : deux branches, la première n'est plus affichée
+        ("q1", "r0", message("user", "Ancienne question ?")),
+        ("r1", "q1", message("assistant", "Ancienne réponse.")),
+        ("q1b", "r0", message("user", "Nouvelle question ?")),
+        ("r1b", "q1b", message("assistant", "Nouvelle réponse.")),
+        current_node="r1",
+    )
+    assert list(conversation_exchanges(conv)) == [
+        ("Question 0 ?", "Réponse 0."),
+        ("Ancienne question ?", "Ancienne réponse."),
+    ]
+
+    # sans nœud courant : le dernier enfant, depuis la racine
+    conv["current_node"] = None
+    assert list(conversation_exchanges(conv))[-1] == ("Nouvelle question ?", "Nouvelle réponse.")
+
+
+def test_messages_caches_systeme_et_outils_ignores():
+    cache = {"is_visually_hidden_from_conversation": True}
+    conv = arbre(
+        ("racine", None, None),
+        ("systeme", "racine", message("system", "Consignes")),
+        ("contexte", "systeme", message("user", "Contexte caché", metadata=cache)),
+        ("q0", "contexte", message("user", "Question ?")),
+        ("appel", "q0", message("assistant", "search('x')", recipient="browser")),
+        ("outil", "appel", message("tool", "Résultats")),
+        ("code", "outil", dict(message("assistant", ""), content={"content_type": "code"})),
+        ("r0", "code", message("assistant", "Réponse.")),
+        ("r0b", "r0", message("assistant", "Suite.")),
+        current_node="r0b",
+    )
+    assert list(conversation_exchanges(conv)) == [("Question ?", "Réponse.\n\nSuite.")]
+
+
+def test_noms_de_dossier_uniques():
+    utilises = set()
+    noms = [
+        folder_name(Conversation("abcdef123456", titre, []), utilises)
+        for titre in ("Mon Titre !", "mon titre", "Mon titre", "", "  ")
+    ]
+    assert noms == ["mon_titre", "mon_titre-2", "mon_titre-3", "abcdef12", "abcdef12-2"]
+
+
+def test_une_conversation_par_dossier(tmp_path):
+    export = tmp_path / "conversations.json"
+    vide = conversation("Vide", echanges=0, id="vide")
+    export.write_text(
+        json.dumps([conversation("Même titre", 2, "a"), vide, conversation("Même titre", 1, "b")]),
+        encoding="utf-8",
+    )
+    sortie = tmp_path / "output"
+
+    with MarkdownWriter(str(sortie), date(2024, 1, 2)) as writer:
+        bilan = write_conversations(str(export), writer, "export")
+
+    assert bilan == (2, 3)
+    assert sorted(os.listdir(sortie / "export")) == ["même_titre", "même_titre-2"]
+    assert sorted(os.listdir(sortie / "export" / "même_titre")) == [
+        "20240102-001.md",
+        "20240102-002.md",
+    ]
+    assert "Question 0 ?" in (sortie / "export" / "même_titre-2" / "20240102-001.md").read_text(
+        encoding="utf-8"
+    )
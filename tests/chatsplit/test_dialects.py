@@ -0,0 +1,70 @@
+"""Reconnaissance des dialectes d'export (chatsplit.dialects)"""
+
+import pytest
+
+from chatsplit import dialects
+from chatsplit.dialects import DETECT_BYTES, Dialect, detect_file, register_dialect
+from chatsplit.parser import parse_chat_file
+
+EXPORT_ANGLAIS = (
+    "You said:\nWhat is a ZIP file?\nChatGPT said:\nAn archive.\n"
+    "You said:\nAnd a tar file?\nChatGPT said:\nAnother archive.\n"
+)
+
+
+@pytest.fixture
+def registre(monkeypatch):
+    """Registre des dialectes rétabli après le test"""
+    monkeypatch.setattr(dialects, "DIALECTS", dict(dialects.DIALECTS))
+    monkeypatch.setattr(dialects, "_par_marqueur", dict(dialects._par_marqueur))
+    monkeypatch.setattr(dialects, "_detecteur", None)
+
+
+@pytest.mark.parametrize("engine", ["lines", "mmap"])
+def test_export_anglais_reconnu_et_decoupe(tmp_path, engine):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(EXPORT_ANGLAIS, encoding="utf-8")
+
+    assert detect_file(str(chat)).name == "chatgpt-en"
+    assert list(parse_chat_file(str(chat), engine)) == [
+        ("What is a ZIP file?", "An archive."),
+        ("And a tar file?", "Another archive."),
+    ]
+
+
+def test_nouveau_dialecte(tmp_path, registre):
+    register_dialect(Dialect("maison", "Moi >", "Assistant >"))
+    chat = tmp_path / "chat.txt"
+    chat.write_text("Moi >\nBonjour ?\nAssistant >\nBonjour.\n", encoding="utf-8")
+
+    assert detect_file(str(chat)).name == "maison"
+    assert list(parse_chat_file(str(chat))) == [("Bonjour ?", "Bonjour.")]
+
+
+def test_conflits_de_nom_ou_de_marqueur(registre):
+    with pytest.raises(ValueError):
+        register_dialect(Dialect("autre", "You said:", "Bot said:"))
+    with pytest.raises(ValueError):
+        register_dialect(Dialect("chatgpt-en", "Vous avez dit :", "Bot said:"))
+    assert dialects.DIALECTS["chatgpt-en"].question == "You said:"
+
+    # un dialecte peut être remplacé sous son propre nom
+    register_dialect(Dialect("chatgpt-en", "You wrote:", "ChatGPT said:"))
+    assert dialects.detect_dialect("You wrote:\n").name == "chatgpt-en"
+    assert dialects.detect_dialect("You said:\n").name == dialects.DEFAULT_DIALECT
+
+
+def test_dialecte_par_defaut_sans_marqueur_au_debut(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text("x" * DETECT_BYTES + EXPORT_ANGLAIS, encoding="utf-8")
+    assert detect_file(str(chat)).name == dialects.DEFAULT_DIALECT
+
+
+def test_caractere_coupe_a_la_limite(tmp_path):
+    chat = tmp_path / "chat.txt"
+    # « é » (2 octets) à cheval sur la fin des DETECT_BYTES premiers octets
+    chat.write_bytes(b"x" * (DETECT_BYTES - 1) + "é".encode("utf-8") + EXPORT_ANGLAIS.encode())
+    assert detect_file(str(chat)).name == dialects.DEFAULT_DIALECT
+
+    chat.write_bytes(EXPORT_ANGLAIS.encode()[:20] + b"x" * (DETECT_BYTES - 21) + "é".encode())
+    assert detect_file(str(chat)).name == "chatgpt-en"
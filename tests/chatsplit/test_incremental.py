@@ -0,0 +1,86 @@
+"""Découpe incrémentale et ajout à l'archive (chatsplit.incremental)"""
+
+import os
+import zipfile
+from datetime import date
+
+from chatsplit.archive import append_to_archive
+from chatsplit.incremental import STATE_FILENAME, split_incremental
+from tests.chats import chat_text
+
+JOUR = date(2026, 1, 1)
+
+
+def _ecrire(chemin, contenu):
+    with open(chemin, "wb") as f:
+        f.write(contenu)
+
+
+def _markdown(dossier):
+    return sorted(nom for nom in os.listdir(dossier) if nom.endswith(".md"))
+
+
+def test_seuls_les_nouveaux_echanges_sont_ecrits(tmp_path):
+    source = str(tmp_path / "chat.txt")
+    sortie = str(tmp_path / "output")
+    _ecrire(source, chat_text(3))
+    premier = split_incremental(source, sortie, JOUR)
+    assert (len(premier.written), premier.count, premier.resumed) == (3, 3, False)
+
+    _ecrire(source, chat_text(3) + chat_text(2, debut=3))
+    second = split_incremental(source, sortie, JOUR)
+
+    assert second.resumed and not second.rewritten_existing
+    assert second.count == 5
+    assert len(second.written) == 2
+    assert not set(second.written) & set(premier.written)
+    assert len(_markdown(sortie)) == 5
+
+
+def test_derniere_reponse_allongee(tmp_path):
+    source = str(tmp_path / "chat.txt")
+    sortie = str(tmp_path / "output")
+    _ecrire(source, chat_text(3))
+    premier = split_incremental(source, sortie, JOUR)
+
+    _ecrire(source, chat_text(3) + "Suite de la réponse.\n".encode("utf-8"))
+    second = split_incremental(source, sortie, JOUR)
+
+    assert second.resumed and second.rewritten_existing
+    assert second.written == [premier.written[-1]]
+    with open(os.path.join(sortie, premier.written[-1]), encoding="utf-8") as f:
+        assert "Suite de la réponse." in f.read()
+
+
+def test_debut_modifie_tout_est_reecrit(tmp_path):
+    source = str(tmp_path / "chat.txt")
+    sortie = str(tmp_path / "output")
+    _ecrire(source, chat_text(3))
+    split_incremental(source, sortie, JOUR)
+
+    _ecrire(source, chat_text(2, debut=10))
+    bilan = split_incremental(source, sortie, JOUR)
+
+    assert not bilan.resumed
+    assert bilan.count == 2
+    assert len(_markdown(sortie)) == 2
+
+
+def test_ajout_a_l_archive(tmp_path):
+    source = str(tmp_path / "chat.txt")
+    sortie = str(tmp_path / "output")
+    archive = str(tmp_path / "archive.zip")
+    _ecrire(source, chat_text(3))
+    premier = split_incremental(source, sortie, JOUR)
+    with zipfile.ZipFile(archive, "w") as zipf:
+        for nom in premier.written:
+            zipf.write(os.path.join(sortie, nom), nom)
+
+    _ecrire(source, chat_text(5))
+    second = split_incremental(source, sortie, JOUR)
+    append_to_archive(archive, sortie, [os.path.join(sortie, nom) for nom in second.written])
+
+    with zipfile.ZipFile(archive) as zipf:
+        assert zipf.testzip() is None
+        assert sorted(zipf.namelist()) == _markdown(sortie)
+        assert STATE_FILENAME not in zipf.namelist()
@@ -0,0 +1,29 @@
+"""Moteur de découpe par projection mémoire (chatsplit.mmapscan)"""
+
+from chatsplit.parser import ANSWER_MARKER, QUESTION_MARKER, parse_chat_file, scan_chat_file
+
+EXPORT = (
+    f"préambule\n{QUESTION_MARKER}\nQuestion 1 ?\n{ANSWER_MARKER}\nRéponse 1.\r\n"
+    f"{ANSWER_MARKER}\nsuite\n{QUESTION_MARKER}\nQuestion 2 sans réponse\n"
+    f"{QUESTION_MARKER} {ANSWER_MARKER}\nQuestion 3\n{ANSWER_MARKER}\n\nRéponse 3"
+)
+
+
+def test_meme_resultat_que_le_parseur_ligne_a_ligne(tmp_path):
+    chemin = str(tmp_path / "chat.txt")
+    with open(chemin, "w", encoding="utf-8", newline="") as f:
+        f.write(EXPORT)
+
+    attendu = list(parse_chat_file(chemin, engine="lines"))
+    assert len(attendu) == 3
+    assert list(parse_chat_file(chemin, engine="mmap")) == attendu
+
+
+def test_reprise_a_une_position(tmp_path):
+    chemin = str(tmp_path / "chat.txt")
+    with open(chemin, "w", encoding="utf-8", newline="") as f:
+        f.write(EXPORT)
+
+    echanges = list(scan_chat_file(chemin, engine="lines"))
+    depuis = list(scan_chat_file(chemin, echanges[1].offset, engine="mmap"))
+    assert depuis == echanges[1:]
@@ -0,0 +1,67 @@
+"""Mesure des étapes d'un traitement (chatsplit.profiling)"""
+
+import json
+import pstats
+
+import pytest
+
+from chatsplit import profiling
+from chatsplit.profiling import JobProfile, capture, parse_profiler
+
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+
+def test_rapport_avec_les_rapports_du_pool():
+    horloge = Horloge()
+    profil = JobProfile(clock=horloge)
+    with profil.stage("prepare"):
+        horloge.maintenant = 0.5
+    profil.count("bytes_read", 3 * 1024 * 1024)
+    # rapports de deux processus du pool, passés en JSON
+    for rapport in ({"stages": {"parse": 1.25}, "counters": {"exchanges": 10}},) * 2:
+        profil.merge(json.loads(json.dumps(rapport)))
+    profil.merge({})
+    horloge.maintenant = 2.0
+    profil.finish()
+
+    assert profil.to_dict() == {
+        "elapsed": 2.0,
+        "stages": {"prepare": 0.5, "parse": 2.5},
+        "counters": {"bytes_read": 3 * 1024 * 1024, "exchanges": 20},
+        "message": "total 2.00 s · prepare 0.50 s · parse 2.50 s · bytes_read 3.0 Mo · exchanges 20",
+    }
+
+
+def test_capture_cprofile(tmp_path):
+    with capture("cProfile", str(tmp_path / "profil")) as chemin:
+        sorted(range(1000), key=lambda n: -n)
+
+    assert chemin == str(tmp_path / "profil.prof")
+    statistiques = pstats.Stats(chemin)
+    assert any(fonction[2] == "<lambda>" for fonction in statistiques.stats)
+
+
+def test_sans_profileur(tmp_path):
+    with capture(None, str(tmp_path / "profil")) as chemin:
+        pass
+    assert chemin is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("nom", ["gprof", "perf", "cprofile2"])
+def test_profileur_inconnu(nom):
+    assert parse_profiler("") is None
+    with pytest.raises(ValueError, match="Profileur inconnu"):
+        parse_profiler(nom)
+
+
+def test_profileur_indisponible(monkeypatch):
+    monkeypatch.setattr(profiling, "pyinstrument", None)
+    with pytest.raises(ValueError, match="indisponible"):
+        parse_profiler("pyinstrument")
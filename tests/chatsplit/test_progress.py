@@ -0,0 +1,47 @@
+"""Suivi de la progression (chatsplit.progress)"""
+
+from chatsplit.progress import CHECK_INTERVAL, ProgressTracker
+
+
+class Horloge:
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+
+def test_emission_a_intervalle_fixe_meme_avec_peu_d_echanges():
+    horloge = Horloge()
+    emis = []
+    suivi = ProgressTracker(emis.append, 1000, 1, interval=1.0, clock=horloge)
+    suivi.start_file("chat.txt")
+
+    suivi.exchange(100)
+    horloge.maintenant = 0.5
+    suivi.exchange(200)
+    assert emis == []
+
+    # un seul échange après l'intervalle suffit
+    horloge.maintenant = 1.2
+    suivi.exchange(900)
+    assert [(p.bytes_done, p.exchanges, p.percent) for p in emis] == [(900, 3, 90)]
+
+    horloge.maintenant = 1.5
+    suivi.exchange(950)
+    assert len(emis) == 1
+
+
+def test_points_de_controle_limites_dans_le_temps():
+    horloge = Horloge()
+    controles = []
+    suivi = ProgressTracker(
+        None, clock=horloge, checkpoint=lambda: controles.append(horloge.maintenant)
+    )
+
+    for _ in range(1000):
+        suivi.exchange()
+    horloge.maintenant = CHECK_INTERVAL
+    suivi.exchange()
+
+    assert controles == [0.0, CHECK_INTERVAL]
@@ -0,0 +1,98 @@
+"""Dossiers de travail et mise en place de la sortie (chatsplit.staging)"""
+
+import os
+import socket
+import time
+
+from chatsplit import staging
+
+
+def _voisins(tmp_path):
+    return sorted(nom for nom in os.listdir(tmp_path) if nom.startswith("."))
+
+
+def _attendre_suppressions(tmp_path, restants):
+    for _ in range(100):
+        if len(_voisins(tmp_path)) <= restants:
+            break
+        time.sleep(0.01)
+
+
+def test_dossier_de_travail_d_un_job_en_cours_conserve(tmp_path):
+    output = str(tmp_path / "output")
+    premier = staging.make_staging_dir(output)
+    second = staging.make_staging_dir(output)
+
+    _attendre_suppressions(tmp_path, 1)
+    assert os.path.isdir(premier) and os.path.isdir(second)
+
+
+def test_dossiers_abandonnes_supprimes(tmp_path):
+    output = str(tmp_path / "output")
+    prefixe = f".output.{staging._STAGING}-"
+    # processus disparu sur ce serveur, corbeille, autre serveur ancien ou récent
+    (tmp_path / f"{prefixe}aaaaaaaa-999999999-{socket.gethostname()}").mkdir()
+    (tmp_path / f".output.{staging._TRASH}-bbbbbbbb").mkdir()
+    ancien = tmp_path / f"{prefixe}cccccccc-1-autre-serveur"
+    ancien.mkdir()
+    os.utime(ancien, (0, 0))
+    recent = tmp_path / f"{prefixe}dddddddd-1-autre-serveur"
+    recent.mkdir()
+
+    nouveau = staging.make_staging_dir(output)
+    _attendre_suppressions(tmp_path, 2)
+
+    assert _voisins(tmp_path) == sorted([recent.name, os.path.basename(nouveau)])
+
+
+def _output(tmp_path, contenu):
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "fichier.md").write_text(contenu, encoding="utf-8")
+    return str(output)
+
+
+def test_echange_atomique(tmp_path):
+    output = _output(tmp_path, "ancien")
+    travail = staging.make_staging_dir(output)
+    with open(os.path.join(travail, "fichier.md"), "w", encoding="utf-8") as f:
+        f.write("nouveau")
+
+    suppression = staging.swap_into_place(travail, output)
+    suppression.join()
+
+    with open(os.path.join(output, "fichier.md"), encoding="utf-8") as f:
+        assert f.read() == "nouveau"
+    assert _voisins(tmp_path) == []
+
+
+def test_echange_sans_renameat2(tmp_path, monkeypatch):
+    monkeypatch.setattr(staging, "_renameat2", None)
+    output = _output(tmp_path, "ancien")
+    travail = staging.make_staging_dir(output)
+
+    assert not staging.exchange(travail, output)
+    staging.swap_into_place(travail, output).join()
+    assert os.listdir(output) == []
+    assert _voisins(tmp_path) == []
+
+
+def test_fichier_remplace_seulement_a_la_fin(tmp_path):
+    archive = tmp_path / "20260101.zip"
+    archive.write_bytes(b"precedente")
+
+    try:
+        with staging.replacing_file(str(archive)) as temporaire:
+            with open(temporaire, "wb") as f:
+                f.write(b"tronquee")
+            raise KeyboardInterrupt
+    except KeyboardInterrupt:
+        pass
+    assert archive.read_bytes() == b"precedente"
+    assert os.listdir(tmp_path) == [archive.name]
+
+    with staging.replacing_file(str(archive)) as temporaire:
+        with open(temporaire, "wb") as f:
+            f.write(b"nouvelle")
+    assert archive.read_bytes() == b"nouvelle"
+    assert os.listdir(tmp_path) == [archive.name]
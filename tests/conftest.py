@@ -0,0 +1,71 @@
+"""Options de ligne de commande et fixtures communes des tests"""
+
+import importlib
+import os
+import sys
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DESKTOP = os.path.join(RACINE, "filchat-0.0")
+
+
+def pytest_addoption(parser):
+    groupe = parser.getgroup("filchat", "benchmarks FilChat")
+    groupe.addoption(
+        "--bench-sizes",
+        default=os.environ.get("FILCHAT_BENCH_SIZES", "1"),
+        help="tailles des exports synthétiques en Mo, séparées par des virgules (1,50,500)",
+    )
+    groupe.addoption(
+        "--bench-rounds",
+        type=int,
+        default=int(os.environ.get("FILCHAT_BENCH_ROUNDS", "3")),
+        help="nombre de mesures par benchmark",
+    )
+
+
+def _load_desktop_modules():
+    """Modules de l'application de bureau (filchat-0.0)
+
+    Le site web et l'application de bureau ont chacun un paquet `filchat` :
+    celui de filchat-0.0 est importé à part, puis les modules du site
+    éventuellement chargés (pytest-django) sont remis en place.
+    """
+    sauvegarde = {
+        nom: module
+        for nom, module in sys.modules.items()
+        if nom == "filchat" or nom.startswith("filchat.")
+    }
+    for nom in sauvegarde:
+        del sys.modules[nom]
+    sys.path.insert(0, DESKTOP)
+    try:
+        chatprocessor = importlib.import_module("filchat.models.chatprocessor")
+        processingjob = importlib.import_module("filchat.models.processingjob")
+        cli = importlib.import_module("filchat.cli")
+    finally:
+        sys.path.remove(DESKTOP)
+        for nom in [n for n in sys.modules if n == "filchat" or n.startswith("filchat.")]:
+            del sys.modules[nom]
+        sys.modules.update(sauvegarde)
+    return chatprocessor, processingjob, cli
+
+
+@pytest.fixture(scope="session")
+def desktop_modules():
+    """Modules chatprocessor, processingjob et cli de l'application de bureau"""
+    return _load_desktop_modules()
+
+
+@pytest.fixture(scope="session")
+def desktop(desktop_modules):
+    """(ChatProcessor, ProcessingJob) de l'application de bureau"""
+    chatprocessor, processingjob, _ = desktop_modules
+    return chatprocessor.ChatProcessor, processingjob.ProcessingJob
+
+
+@pytest.fixture(scope="session")
+def desktop_cli(desktop_modules):
+    """Module filchat.cli de l'application de bureau (ligne de commande)"""
+    return desktop_modules[2]
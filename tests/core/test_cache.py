@@ -0,0 +1,111 @@
+"""Cache des éléments communs aux pages (core.cache)"""
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.template import Context, Template
+from django.test import RequestFactory
+from wagtail.models import Site
+
+from core import cache, errorpages
+from core.footer_models import FooterText
+from filchat.models import FilchatPage
+
+
+@pytest.fixture(autouse=True)
+def cache_vide():
+    """Entrées des tests précédents périmées (leurs données ont été annulées en base)"""
+    cache.invalidate()
+
+
+def autre_processus(monkeypatch):
+    """Cache par défaut d'un autre processus : une mémoire distincte"""
+    monkeypatch.setattr(cache, "cache", LocMemCache("autre-processus", {}))
+
+
+def test_invalidation_vue_par_un_autre_processus(monkeypatch):
+    assert cache.cached("menu", "test", lambda: "avant") == "avant"
+    with monkeypatch.context() as m:
+        autre_processus(m)
+        cache.invalidate()
+    assert cache.cached("menu", "test", lambda: "après") == "après"
+
+
+def test_generation_commune_aux_processus(monkeypatch):
+    generation = cache.generation()
+    autre_processus(monkeypatch)
+    assert cache.generation() == generation
+
+
+CHROME = Template(
+    "{% get_site_root as racine %}{{ racine.title }}"
+    "{% get_menu_items racine as pages %}{% for page in pages %}|{{ page.title }}{% endfor %}"
+    "{% get_footer_text %}"
+)
+
+
+def rendu():
+    """Menu et pied de page, pour une nouvelle requête sur le site par défaut"""
+    return CHROME.render(Context({"request": RequestFactory().get("/")}))
+
+
+@pytest.fixture
+def menu():
+    racine = Site.objects.get(is_default_site=True).root_page
+    return racine.add_child(instance=FilchatPage(title="Rubrique", slug="rubrique", show_in_menus=True))
+
+
+def publier_pied_de_page(texte):
+    pied = FooterText(body=f"<p>{texte}</p>")
+    pied.save()
+    pied.save_revision().publish()
+    return pied
+
+
+@pytest.mark.django_db
+def test_menu_et_pied_de_page_sans_requete_sql(menu, django_assert_num_queries):
+    publier_pied_de_page("Mentions")
+    premier = rendu()
+    assert "Rubrique" in premier and "Mentions" in premier
+
+    with django_assert_num_queries(0):
+        assert rendu() == premier
+
+
+@pytest.mark.django_db
+def test_publication_du_pied_de_page(menu):
+    assert "Mentions" not in rendu()
+    pied = publier_pied_de_page("Mentions")
+    assert "Mentions" in rendu()
+
+    pied.unpublish()
+    assert "Mentions" not in rendu()
+
+
+@pytest.mark.django_db
+def test_modification_du_site(menu):
+    rendu()
+    generation = cache.generation()
+    site = Site.objects.get(is_default_site=True)
+    site.site_name = "Autre nom"
+    site.save()
+    assert cache.generation() != generation
+
+
+@pytest.mark.django_db
+def test_suppression_d_une_page_du_menu(menu):
+    assert "Rubrique" in rendu()
+    menu.delete()
+    assert "Rubrique" not in rendu()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_un_seul_rendu_des_pages_d_erreur_par_transaction(menu, monkeypatch):
+    rendus = []
+    monkeypatch.setattr(errorpages, "build_all", lambda: rendus.append(1))
+    for n in range(3):
+        menu.add_child(instance=FilchatPage(title=f"Sous-page {n}", slug=f"sous-page-{n}"))
+
+    with transaction.atomic():
+        menu.delete()
+    assert rendus == [1]
@@ -0,0 +1,76 @@
+"""Pages d'erreur pré-rendues et page de secours (core.errorpages)"""
+
+import os
+
+import pytest
+
+from core import errorpages
+
+
+@pytest.fixture(autouse=True)
+def error_pages(settings, tmp_path, monkeypatch):
+    """Dossier des pages d'erreur temporaire, sans page gardée en mémoire"""
+    settings.CORE_ERROR_PAGES_DIR = str(tmp_path / "errors")
+    monkeypatch.setattr(errorpages, "_pages", {})
+    monkeypatch.setattr(errorpages, "_echecs", {})
+    return settings.CORE_ERROR_PAGES_DIR
+
+
+@pytest.fixture
+def rendu_en_echec(monkeypatch):
+    """Rendu impossible (base indisponible) ; retourne la liste des essais"""
+    essais = []
+
+    def render(code):
+        essais.append(code)
+        raise RuntimeError("base indisponible")
+
+    monkeypatch.setattr(errorpages, "render", render)
+    return essais
+
+
+def ecrire(code, contenu):
+    os.makedirs(errorpages.directory(), exist_ok=True)
+    with open(errorpages.path(code), "wb") as f:
+        f.write(contenu)
+
+
+def test_page_enregistree_servie_sans_rendu(rendu_en_echec):
+    ecrire(404, b"<p>introuvable</p>")
+    assert errorpages.content(404) == b"<p>introuvable</p>"
+    assert rendu_en_echec == []
+
+
+def test_page_relue_apres_reecriture_par_un_autre_processus():
+    ecrire(404, b"ancienne")
+    assert errorpages.content(404) == b"ancienne"
+    ecrire(404, b"nouvelle")
+    date = os.stat(errorpages.path(404)).st_mtime_ns
+    os.utime(errorpages.path(404), ns=(date + 10**9, date + 10**9))
+    assert errorpages.content(404) == b"nouvelle"
+
+
+def test_page_de_secours_si_le_rendu_echoue(rendu_en_echec):
+    assert errorpages.content(500) == errorpages.fallback(500)
+    assert not os.path.exists(errorpages.path(500))
+    assert rendu_en_echec == [500]
+
+
+def test_pas_de_nouvel_essai_avant_le_delai(rendu_en_echec, monkeypatch):
+    instant = 1000.0
+    monkeypatch.setattr(errorpages.time, "monotonic", lambda: instant)
+    errorpages.content(500)
+    errorpages.content(500)
+    assert rendu_en_echec == [500]
+
+    instant += errorpages.RETRY_DELAY
+    assert errorpages.content(500) == errorpages.fallback(500)
+    assert rendu_en_echec == [500, 500]
+
+
+@pytest.mark.django_db
+def test_vue_d_erreur(client):
+    response = client.get("/page-inexistante-pour-le-test/")
+    assert response.status_code == 404
+    assert response.content == errorpages.content(404)
+    assert os.path.exists(errorpages.path(404))
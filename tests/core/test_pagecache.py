@@ -0,0 +1,95 @@
+"""Cache des pages complètes servies aux visiteurs anonymes (core.pagecache)"""
+
+import copy
+import re
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+from django.urls import reverse
+from wagtail.models import Site
+
+from core import cache, pagecache
+from filchat.models import FilchatPage
+
+pytestmark = pytest.mark.django_db
+
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]*)"')
+
+
+@pytest.fixture(autouse=True)
+def page_cache(settings, tmp_path):
+    """Cache fichier dans un dossier temporaire, cache mémoire vide"""
+    caches_test = copy.deepcopy(settings.CACHES)
+    caches_test[pagecache.FILE_ALIAS]["LOCATION"] = str(tmp_path / "pages")
+    settings.CACHES = caches_test
+    caches[pagecache.MEMORY_ALIAS].clear()
+    yield
+    caches[pagecache.MEMORY_ALIAS].clear()
+
+
+@pytest.fixture
+def pages():
+    """Page parente et page fille publiées sous la racine du site par défaut"""
+    racine = Site.objects.get(is_default_site=True).root_page
+    parent = racine.add_child(instance=FilchatPage(title="Parent", slug="parent"))
+    fille = parent.add_child(instance=FilchatPage(title="Fille", slug="fille"))
+    return parent, fille
+
+
+def test_page_servie_depuis_le_cache(client, pages):
+    _, fille = pages
+    premiere = client.get(fille.url)
+    assert premiere.status_code == 200
+    assert premiere["X-Page-Cache"] == "miss"
+
+    seconde = client.get(fille.url)
+    assert seconde["X-Page-Cache"] == "hit"
+    assert CSRF_INPUT.sub("", seconde.content.decode()) == CSRF_INPUT.sub(
+        "", premiere.content.decode()
+    )
+
+
+def test_visiteur_connecte_hors_cache(client, pages, django_user_model):
+    _, fille = pages
+    client.get(fille.url)
+    client.force_login(django_user_model.objects.create_user("visiteur"))
+    assert "X-Page-Cache" not in client.get(fille.url)
+
+
+def test_jeton_csrf_du_visiteur(pages):
+    _, fille = pages
+    Client().get(fille.url)
+
+    visiteur = Client(enforce_csrf_checks=True)
+    response = visiteur.get(fille.url)
+    assert response["X-Page-Cache"] == "hit"
+    contenu = response.content.decode()
+    assert pagecache.CSRF_PLACEHOLDER.decode() not in contenu
+    jeton = CSRF_INPUT.search(contenu).group(1)
+    # le jeton servi depuis le cache est accepté pour ce visiteur
+    envoi = visiteur.post(reverse("filchat:home"), {"csrfmiddlewaretoken": jeton})
+    assert envoi.status_code != 403
+
+
+def test_publication_purge_la_page_et_ses_ancetres(client, pages):
+    parent, fille = pages
+    for page in pages:
+        client.get(page.url)
+        assert client.get(page.url)["X-Page-Cache"] == "hit"
+
+    fille.title = "Fille modifiée"
+    fille.save_revision().publish()
+
+    assert client.get(fille.url)["X-Page-Cache"] == "miss"
+    assert client.get(parent.url)["X-Page-Cache"] == "miss"
+
+
+def test_publication_hors_menu_garde_le_cache_commun(pages):
+    _, fille = pages
+    generation = cache.generation()
+
+    fille.title = "Fille modifiée"
+    fille.save_revision().publish()
+
+    assert cache.generation() == generation
@@ -0,0 +1,87 @@
+"""Ligne de commande de l'application de bureau (filchat-0.0/filchat/cli.py)"""
+
+import json
+import os
+import re
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from tests.chats import chat_text
+
+
+@pytest.fixture
+def entree(tmp_path, monkeypatch):
+    """Dossier d'entrée de deux exports ; répertoire courant temporaire"""
+    monkeypatch.chdir(tmp_path)
+    dossier = tmp_path / "input"
+    dossier.mkdir()
+    for nom in ("premier.txt", "second.txt"):
+        (dossier / nom).write_bytes(chat_text(50))
+    return str(dossier)
+
+
+def _archive_du_jour():
+    return os.path.join(os.getcwd(), f"{datetime.now().strftime('%Y%m%d')}.zip")
+
+
+def test_argument_o_historique(desktop_cli, entree):
+    assert desktop_cli.main([entree, "O", "-q"]) == 0
+
+    assert sorted(os.listdir("output")) == ["premier", "second"]
+    with zipfile.ZipFile(_archive_du_jour()) as zipf:
+        assert zipf.testzip() is None
+        noms = zipf.namelist()
+    assert len(noms) == 100
+    assert {nom.split("/")[0] for nom in noms} == {"premier", "second"}
+
+
+def test_sans_archive(desktop_cli, entree):
+    assert desktop_cli.main([entree, "-q"]) == 0
+    assert len(os.listdir(os.path.join("output", "premier"))) == 50
+    assert not os.path.exists(_archive_du_jour())
+
+
+def test_archive_seule(desktop_cli, entree):
+    assert desktop_cli.main([entree, "--archive-only", "-q"]) == 0
+
+    # aucun fichier Markdown : tout est dans l'archive
+    assert not os.path.isdir("output") or os.listdir("output") == []
+    with zipfile.ZipFile(_archive_du_jour()) as zipf:
+        assert zipf.testzip() is None
+        assert len(zipf.namelist()) == 100
+
+
+def test_compression_invalide(desktop_cli, entree, capsys):
+    assert desktop_cli.main([entree, "--compression", "inconnue", "-q"]) == 2
+    assert capsys.readouterr().err.startswith("Erreur : ")
+    assert not os.path.exists("output")
+
+
+def test_dossier_absent(desktop_cli, tmp_path, capsys):
+    assert desktop_cli.main([str(tmp_path / "absent"), "-q"]) == 2
+    assert "n'existe pas" in capsys.readouterr().err
+
+
+def test_statistiques_et_rapport(desktop_cli, entree, capsys):
+    assert desktop_cli.main([entree, "-q", "--stats", "--report", "rapport.json"]) == 0
+
+    lignes = capsys.readouterr().out.splitlines()
+    assert lignes[0].startswith("Durée        : ")
+    assert lignes[1].startswith("Fichiers     : 2 (")
+    assert lignes[2].startswith("Volume lu    : ")
+    assert lignes[3].startswith("Echanges     : 100 (")
+    assert "Etapes       :" in lignes
+    etapes = lignes[lignes.index("Etapes       :") + 1 :]
+    # "  nom             : valeur", noms alignés sur 16 caractères
+    assert all(re.fullmatch(r"  [\w ]{16}: \S.*", ligne) for ligne in etapes)
+    assert "  prepare         : " in "\n".join(etapes)
+    assert "  exchanges       : 100" in etapes
+
+    with open("rapport.json", encoding="utf-8") as f:
+        rapport = json.load(f)
+    assert set(rapport) == {"elapsed", "stages", "counters", "message"}
+    assert rapport["counters"]["exchanges"] == 100
+    assert rapport["counters"]["files_written"] == 100
+    assert rapport["message"].startswith("total ")
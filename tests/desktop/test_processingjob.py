@@ -0,0 +1,128 @@
+"""Annulation, pause et archive du jour d'un ProcessingJob (application de bureau)"""
+
+import json
+import os
+import threading
+import zipfile
+
+import pytest
+
+from chatsplit.control import JobCancelled, JobControl
+from tests.chats import chat_text, conversation
+
+
+@pytest.fixture
+def dossiers(tmp_path, monkeypatch):
+    """Dossier d'entrée de deux exports, output existant ; répertoire courant temporaire"""
+    monkeypatch.chdir(tmp_path)
+    entree = tmp_path / "input"
+    entree.mkdir()
+    for nom in ("premier.txt", "second.txt"):
+        (entree / nom).write_bytes(chat_text(50))
+    output = tmp_path / "output"
+    output.mkdir()
+    (output / "ancien.md").write_text("ancien", encoding="utf-8")
+    return str(entree), str(output)
+
+
+def _temporaires(dossier):
+    return [nom for nom in os.listdir(dossier) if nom.endswith(".tmp") or ".staging-" in nom]
+
+
+def test_annulation_archive_seule_garde_l_archive_precedente(desktop, dossiers):
+    _, ProcessingJob = desktop
+    entree, output = dossiers
+    control = JobControl()
+    job = ProcessingJob(entree, output, archive_only=True, control=control)
+    with open(job.archive_path(), "wb") as f:
+        f.write(b"archive precedente")
+
+    control.cancel()
+    with pytest.raises(JobCancelled):
+        job.execute()
+
+    with open(job.archive_path(), "rb") as f:
+        assert f.read() == b"archive precedente"
+    assert not _temporaires(os.getcwd())
+
+
+def test_archive_seule_remplace_l_archive_du_jour(desktop, dossiers):
+    _, ProcessingJob = desktop
+    entree, output = dossiers
+    job = ProcessingJob(entree, output, archive_only=True)
+    with open(job.archive_path(), "wb") as f:
+        f.write(b"archive precedente")
+
+    stats = job.execute()
+
+    assert stats.exchanges == 100
+    with zipfile.ZipFile(job.archive_path()) as zipf:
+        assert zipf.testzip() is None
+        assert len(zipf.namelist()) == 100
+
+
+def test_annulation_en_cours_de_fichier_garde_l_output(desktop, dossiers):
+    _, ProcessingJob = desktop
+    entree, output = dossiers
+    control = JobControl()
+    job = ProcessingJob(entree, output, force_clean=True, control=control)
+
+    def messages(message):
+        if message.startswith("📄"):
+            control.cancel()
+
+    with pytest.raises(JobCancelled):
+        job.execute(messages)
+    job.wait_cleanup()
+
+    assert os.listdir(output) == ["ancien.md"]
+    assert not _temporaires(os.path.dirname(output))
+
+
+def test_pause_puis_reprise(desktop, dossiers):
+    _, ProcessingJob = desktop
+    entree, output = dossiers
+    control = JobControl()
+    job = ProcessingJob(entree, output, force_clean=True, generate_archive=True, control=control)
+    control.pause()
+    threading.Timer(0.3, control.resume).start()
+
+    stats = job.execute()
+    job.wait_cleanup()
+
+    assert stats.files == 2 and stats.exchanges == 100
+    assert sorted(os.listdir(output)) == ["premier", "second"]
+    assert os.path.isfile(job.archive_path())
+
+
+def test_exports_json_et_fil_txt_de_meme_nom(desktop, tmp_path, monkeypatch):
+    _, ProcessingJob = desktop
+    monkeypatch.chdir(tmp_path)
+    entree = tmp_path / "input"
+    entree.mkdir()
+    (entree / "premier.txt").write_bytes(chat_text(3))
+    (entree / "conversations.json").write_text(
+        json.dumps([conversation("Premier", 2, "a")]), encoding="utf-8"
+    )
+    (entree / "autre.jsonl").write_text(
+        json.dumps(conversation("Premier", 1, "b")) + "\n", encoding="utf-8"
+    )
+    (entree / "Autre.txt").write_bytes(chat_text(4))
+    output = tmp_path / "output"
+
+    stats = ProcessingJob(str(entree), str(output)).execute()
+
+    # chaque fichier a son dossier : aucun .md n'est écrasé
+    assert stats.exchanges == 3 + 2 + 1 + 4
+    fichiers = {
+        os.path.relpath(os.path.join(racine, nom), output)
+        for racine, _, noms in os.walk(output)
+        for nom in noms
+    }
+    assert len(fichiers) == stats.exchanges
+    assert {os.path.dirname(f) for f in fichiers} == {
+        "premier",
+        "conversations/premier",
+        "autre",
+        "autre-2/premier",
+    }
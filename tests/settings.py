@@ -0,0 +1,35 @@
+"""Réglages Django des tests (pytest-django)
+
+Base SQLite de test, ou PostgreSQL avec DATABASE_PROFILE=postgres et
+DATABASE_URL (voir config.database). Les fichiers (media, caches) sont
+écrits sous tests/output ; les tests qui en dépendent les redirigent vers
+leur dossier temporaire.
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SECRET_KEY", "tests")
+os.environ.setdefault("WAGTAIL_SITE_NAME", "FilChat")
+
+from config.database import database_from_env, sqlite_database  # noqa: E402
+from config.settings.base import *  # noqa: E402,F401,F403
+
+SORTIE = os.path.join(BASE_DIR, "tests", "output")
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+MIDDLEWARE = [m for m in MIDDLEWARE if "debug_toolbar" not in m]
+
+# base de test dans un fichier : les tests à plusieurs threads partagent la même base
+_sqlite = sqlite_database(os.path.join(SORTIE, "db.sqlite3"), conn_max_age=0)
+_sqlite["TEST"] = {"NAME": os.path.join(SORTIE, "test-db.sqlite3")}
+DATABASES = {"default": database_from_env(_sqlite)}
+
+MEDIA_ROOT = os.path.join(SORTIE, "media")
+CACHE_DIR = os.path.join(SORTIE, "cache")
+CORE_ERROR_PAGES_DIR = os.path.join(CACHE_DIR, "errors")
+CACHES["pages"]["LOCATION"] = os.path.join(CACHE_DIR, "pages")
+
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+COMPRESS_ENABLED = False
@@ -0,0 +1,29 @@
+"""Fixtures des tests du site (pytest-django)"""
+
+import os
+
+import pytest
+from django.core.files.base import ContentFile
+
+from filchat.models import FilChat
+from tests.chats import chat_text
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    """MEDIA_ROOT dans un dossier temporaire"""
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    os.makedirs(settings.MEDIA_ROOT)
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture
+def make_chat_file(media):
+    """Crée un FilChat à partir du contenu d'un export"""
+
+    def creer(contenu=None, nom="chat.txt", **champs):
+        chat_file = FilChat(**champs)
+        chat_file.file.save(nom, ContentFile(chat_text() if contenu is None else contenu))
+        return chat_file
+
+    return creer
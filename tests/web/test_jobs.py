@@ -0,0 +1,79 @@
+"""File de traitement en base (filchat.jobs)"""
+
+import os
+import threading
+
+import pytest
+from django.conf import settings
+from django.db import connection
+
+from filchat import jobs
+from filchat.models import FilChat
+
+
+@pytest.mark.django_db
+def test_claim_next_reserve_le_plus_ancien(make_chat_file):
+    premier = make_chat_file(nom="a.txt")
+    second = make_chat_file(nom="b.txt")
+
+    reserve = jobs.claim_next()
+    assert reserve.pk == premier.pk
+    assert reserve.status == FilChat.Status.RUNNING
+
+    assert jobs.claim_next().pk == second.pk
+    assert jobs.claim_next() is None
+
+
+@pytest.mark.django_db
+def test_requeue_running(make_chat_file):
+    chat_file = make_chat_file()
+    jobs.claim_next()
+
+    assert jobs.requeue_running() == 1
+    chat_file.refresh_from_db()
+    assert chat_file.status == FilChat.Status.QUEUED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_claim_next_concurrent_sans_doublon(make_chat_file):
+    attendus = {make_chat_file(nom=f"chat-{n}.txt").pk for n in range(12)}
+    reserves = []
+    depart = threading.Barrier(4)
+
+    def worker():
+        depart.wait()
+        try:
+            while (chat_file := jobs.claim_next()) is not None:
+                reserves.append(chat_file.pk)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # chaque traitement est réservé une fois, et une seule
+    assert sorted(reserves) == sorted(attendus)
+
+
+@pytest.mark.django_db
+def test_run_job_cree_l_archive(make_chat_file):
+    chat_file = make_chat_file()
+    chat_file = jobs.run_job(jobs.claim_next())
+
+    assert chat_file.status == FilChat.Status.DONE, chat_file.error
+    assert chat_file.progress == 100
+    assert os.path.isfile(os.path.join(settings.MEDIA_ROOT, chat_file.archive))
+    assert chat_file.report["counters"]["exchanges"] == 3
+
+
+@pytest.mark.django_db
+def test_run_job_erreur(make_chat_file):
+    chat_file = make_chat_file()
+    os.remove(chat_file.file.path)
+
+    chat_file = jobs.run_job(jobs.claim_next())
+    assert chat_file.status == FilChat.Status.FAILED
+    assert chat_file.error
@@ -0,0 +1,149 @@
+"""Cache des résultats par empreinte (filchat.cache)"""
+
+import hashlib
+import os
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from filchat import cache, jobs
+from filchat.models import FilChat, OutputCache
+
+from tests.chats import chat_text
+
+pytestmark = pytest.mark.django_db
+
+
+def test_envoi_d_un_bloc_sans_calcul_d_empreinte(client, media):
+    contenu = chat_text()
+    fichier = os.path.join(media, 'chat.txt')
+    with open(fichier, 'wb') as f:
+        f.write(contenu)
+    with open(fichier, 'rb') as f:
+        client.post(reverse('filchat:home'), {'file': f, 'compression': 'deflate'})
+
+    chat_file = FilChat.objects.get()
+    # l'empreinte est calculée par le worker, pas pendant la requête
+    assert chat_file.sha256 == ''
+    assert chat_file.status == FilChat.Status.QUEUED
+
+    chat_file = jobs.run_job(jobs.claim_next())
+    assert chat_file.sha256 == hashlib.sha256(contenu).hexdigest()
+    assert OutputCache.objects.filter(sha256=chat_file.sha256).exists()
+
+
+def test_contenu_deja_traite(make_chat_file):
+    premier = jobs.run_job(make_chat_file(nom='a.txt'))
+    second = jobs.submit(make_chat_file(nom='b.txt', sha256=premier.sha256))
+
+    assert second.status == FilChat.Status.DONE
+    assert second.archive == premier.archive
+
+
+def test_traitements_simultanes_du_meme_contenu(make_chat_file, monkeypatch):
+    premier = make_chat_file(nom='a.txt')
+    second = make_chat_file(nom='b.txt')
+    archive_chat = jobs.archive_chat
+
+    def archive_pendant_un_autre_traitement(*args, **kwargs):
+        monkeypatch.setattr(jobs, 'archive_chat', archive_chat)
+        jobs.run_job(premier)
+        return archive_chat(*args, **kwargs)
+
+    monkeypatch.setattr(jobs, 'archive_chat', archive_pendant_un_autre_traitement)
+    second = jobs.run_job(second)
+    premier.refresh_from_db()
+
+    assert premier.status == second.status == FilChat.Status.DONE
+    # le second réutilise le résultat publié par le premier, resté intact
+    assert second.archive == premier.archive
+    assert os.path.isfile(os.path.join(settings.MEDIA_ROOT, premier.archive))
+    # le dossier de travail du second est écarté
+    resultat = os.path.dirname(os.path.join(settings.MEDIA_ROOT, premier.archive))
+    prefixe = f".{os.path.basename(resultat)}.staging-"
+    assert not [nom for nom in os.listdir(os.path.dirname(resultat)) if nom.startswith(prefixe)]
+
+
+def _entree(sha256, taille, age):
+    dossier = cache.output_dir_for_hash(sha256)
+    os.makedirs(dossier)
+    archive = os.path.join(dossier, 'archive.zip')
+    with open(archive, 'wb') as f:
+        f.write(b'x' * taille)
+    entry = cache.store(sha256, os.path.relpath(archive, settings.MEDIA_ROOT))
+    OutputCache.objects.filter(pk=entry.pk).update(
+        last_used_at=timezone.now() - timedelta(hours=age)
+    )
+    return entry
+
+
+def test_eviction_des_moins_recemment_utilises(media, settings):
+    settings.FILCHAT_OUTPUT_CACHE_MAX_SIZE = 2500
+    ancien = _entree('a' * 64, 1000, age=3)
+    utilise = _entree('b' * 64, 1000, age=2)
+    cache.lookup(utilise.sha256)
+    nouveau = _entree('c' * 64, 1000, age=0)
+
+    restants = set(OutputCache.objects.values_list('sha256', flat=True))
+    assert restants == {utilise.sha256, nouveau.sha256}
+    assert not os.path.exists(os.path.join(media, 'output', ancien.sha256))
+
+
+def test_entree_sans_archive(media):
+    entry = _entree('d' * 64, 10, age=0)
+    os.remove(os.path.join(media, entry.archive))
+
+    assert cache.lookup(entry.sha256) is None
+    assert not OutputCache.objects.exists()
+
+
+def _archive_supprimee(make_chat_file):
+    """Traitement terminé dont l'archive a été supprimée du cache"""
+    chat_file = jobs.run_job(make_chat_file())
+    cache.remove_files(OutputCache.objects.get(sha256=chat_file.sha256))
+    return chat_file
+
+
+def test_telechargement_d_une_archive_supprimee(client, make_chat_file):
+    chat_file = _archive_supprimee(make_chat_file)
+
+    response = client.get(reverse('filchat:download_file', kwargs={'file_id': chat_file.id}))
+
+    # une requête GET (robot, préchargement) ne relance aucun traitement
+    assert response.url == reverse('filchat:process_file', kwargs={'file_id': chat_file.id})
+    sha256 = chat_file.sha256
+    chat_file.refresh_from_db()
+    assert chat_file.status == FilChat.Status.DONE
+    assert chat_file.sha256 == sha256
+    page = client.get(response.url)
+    assert reverse('filchat:reprocess_file', kwargs={'file_id': chat_file.id}) in page.content.decode()
+
+
+def test_relance_garde_l_empreinte(client, make_chat_file):
+    chat_file = _archive_supprimee(make_chat_file)
+    sha256 = chat_file.sha256
+    url = reverse('filchat:reprocess_file', kwargs={'file_id': chat_file.id})
+
+    assert client.get(url).status_code == 405
+    client.post(url)
+
+    chat_file.refresh_from_db()
+    assert chat_file.status == FilChat.Status.QUEUED
+    assert chat_file.sha256 == sha256
+    assert not OutputCache.objects.exists()
+
+    # le nouveau résultat est de nouveau partagé par les contenus identiques
+    chat_file = jobs.run_job(jobs.claim_next())
+    assert chat_file.status == FilChat.Status.DONE, chat_file.error
+    assert OutputCache.objects.get().sha256 == sha256
+    assert jobs.submit(make_chat_file(nom='copie.txt', sha256=sha256)).status == FilChat.Status.DONE
+
+
+def test_relance_inutile(client, make_chat_file):
+    chat_file = jobs.run_job(make_chat_file())
+    client.post(reverse('filchat:reprocess_file', kwargs={'file_id': chat_file.id}))
+    chat_file.refresh_from_db()
+    assert chat_file.status == FilChat.Status.DONE
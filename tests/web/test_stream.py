@@ -0,0 +1,53 @@
+"""Archive générée à la volée depuis le fichier source (filchat.views.stream_file)"""
+
+import io
+import json
+import zipfile
+from datetime import date
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+from chatsplit.markdown import markdown_filename
+from tests.chats import chat_text, conversation
+
+pytestmark = pytest.mark.django_db
+
+
+def _archive(client, chat_file):
+    response = client.get(reverse('filchat:stream_file', kwargs={'file_id': chat_file.id}))
+    assert isinstance(response, StreamingHttpResponse)
+    assert response['Content-Type'] == 'application/zip'
+    return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+
+def test_export_txt(client, make_chat_file):
+    chat_file = make_chat_file(chat_text(5))
+
+    with _archive(client, chat_file) as zipf:
+        assert zipf.testzip() is None
+        jour = date.today()
+        assert zipf.namelist() == [markdown_filename(n, jour) for n in range(1, 6)]
+        assert 'Question 4 ?' in zipf.read(markdown_filename(5, jour)).decode('utf-8')
+
+
+def test_export_json(client, make_chat_file):
+    export = [conversation('Premier fil', 2, 'a'), conversation('Second fil', 1, 'b')]
+    chat_file = make_chat_file(json.dumps(export).encode('utf-8'), nom='conversations.json')
+
+    with _archive(client, chat_file) as zipf:
+        assert zipf.testzip() is None
+        jour = date.today()
+        assert zipf.namelist() == [
+            f'premier_fil/{markdown_filename(1, jour)}',
+            f'premier_fil/{markdown_filename(2, jour)}',
+            f'second_fil/{markdown_filename(1, jour)}',
+        ]
+        assert 'Réponse 1.' in zipf.read(f'premier_fil/{markdown_filename(2, jour)}').decode('utf-8')
+
+
+def test_fichier_source_absent(client, make_chat_file):
+    chat_file = make_chat_file()
+    chat_file.file.delete(save=False)
+    assert client.get(reverse('filchat:stream_file', kwargs={'file_id': chat_file.id})).status_code == 404
@@ -0,0 +1,104 @@
+"""Envoi par morceaux et reprise (filchat.uploads)"""
+
+import hashlib
+import os
+import zlib
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from filchat import uploads
+from filchat.models import ChunkedUpload, FilChat
+
+from tests.chats import chat_text
+
+pytestmark = pytest.mark.django_db
+
+CONTENU = chat_text(200)
+
+
+def _start(client, contenu=CONTENU):
+    reponse = client.post(
+        reverse('filchat:upload_start'), {'filename': 'chat.txt', 'size': len(contenu)}
+    )
+    assert reponse.status_code == 201
+    return reverse('filchat:upload_chunk', args=[reponse.json()['upload_id']])
+
+
+def _put(client, url, offset, morceau, **extra):
+    return client.generic(
+        'PUT', f"{url}?offset={offset}", morceau, 'application/octet-stream', **extra
+    )
+
+
+def _complete(client, url, checksum):
+    return client.post(url + 'complete/', {'checksum': checksum, 'compression': 'deflate'})
+
+
+def test_reprise_apres_coupure(client, media):
+    url = _start(client)
+    assert _put(client, url, 0, CONTENU[:1000]).status_code == 200
+
+    # coupure : le client demande où reprendre, et un autre processus reçoit la suite
+    assert client.get(url).json()['offset'] == 1000
+    uploads._running.clear()
+    assert _put(client, url, 1000, CONTENU[1000:]).json()['offset'] == len(CONTENU)
+
+    reponse = _complete(client, url, f"crc32:{zlib.crc32(CONTENU):08x}")
+    assert reponse.status_code == 200
+    chat_file = FilChat.objects.get(id=reponse.json()['file_id'])
+    # le SHA-256 calculé au fil des morceaux est enregistré
+    assert chat_file.sha256 == hashlib.sha256(CONTENU).hexdigest()
+    with open(chat_file.file.path, 'rb') as f:
+        assert f.read() == CONTENU
+
+
+def test_morceau_renvoye(client, media):
+    url = _start(client)
+    _put(client, url, 0, CONTENU[:1000])
+    _put(client, url, 500, CONTENU[500:2000])
+    _put(client, url, 2000, CONTENU[2000:])
+
+    somme = f"sha256:{hashlib.sha256(CONTENU).hexdigest()}"
+    assert _complete(client, url, somme).status_code == 200
+
+
+def test_morceau_en_avance(client, media):
+    url = _start(client)
+    reponse = _put(client, url, 1000, CONTENU[1000:2000])
+    assert reponse.status_code == 409
+    assert reponse.json()['offset'] == 0
+
+
+def test_longueur_absente_ou_vide(client, media):
+    url = _start(client)
+    assert _put(client, url, 0, CONTENU[:10], CONTENT_LENGTH='').status_code == 411
+    assert _put(client, url, 0, b'', CONTENT_LENGTH='0').status_code == 400
+    assert client.get(url).json()['offset'] == 0
+
+
+def test_somme_de_controle_invalide(client, media):
+    url = _start(client)
+    _put(client, url, 0, CONTENU)
+
+    reponse = _complete(client, url, "crc32:00000000")
+    assert reponse.status_code == 422
+    # l'envoi doit être recommencé
+    assert reponse.json()['offset'] == 0
+
+
+def test_purge_des_envois_abandonnes(client, media):
+    _start(client)
+    url = _start(client)
+    _put(client, url, 0, CONTENU[:1000])
+    ancien = ChunkedUpload.objects.get(id=url.rstrip('/').rsplit('/', 1)[1])
+    ChunkedUpload.objects.filter(pk=ancien.pk).update(
+        updated_at=timezone.now() - timedelta(days=2)
+    )
+
+    assert uploads.purge_abandoned(ttl=3600) == 1
+    assert not ChunkedUpload.objects.filter(pk=ancien.pk).exists()
+    assert not os.path.exists(uploads.absolute_path(ancien))
+    assert ChunkedUpload.objects.count() == 1
@@ -0,0 +1,93 @@
+"""Comparatif vitesse / taille des compressions d'archive
+
+    python tools/bench_compression.py media/uploads/*.txt
+    python tools/bench_compression.py --synthetic 50
+
+Affiche un tableau Markdown (à recopier dans documentation/filchat.md).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatsplit.compression import choices, open_archive_writer  # noqa: E402
+from chatsplit.parser import (ANSWER_MARKER, QUESTION_MARKER,  # noqa: E402
+                              parse_chat_file)
+
+MOTS = (
+    "le la les un une des et à de du pour avec sans dans sur fichier archive "
+    "question réponse python django markdown compression export conversation "
+    "données serveur obsidian coffre découpe ligne texte exemple"
+).split()
+
+
+def synthetic_export(chemin: str, taille_mo: int, graine: int = 0):
+    """Génère un export de chat d'environ `taille_mo` Mo"""
+    alea = random.Random(graine)
+    cible = taille_mo * 1024 * 1024
+    with open(chemin, "w", encoding="utf-8") as f:
+        while f.tell() < cible:
+            question = " ".join(alea.choices(MOTS, k=alea.randint(5, 40)))
+            reponse = "\n\n".join(
+                " ".join(alea.choices(MOTS, k=alea.randint(20, 120)))
+                for _ in range(alea.randint(1, 8))
+            )
+            f.write(f"{QUESTION_MARKER}\n{question}\n{ANSWER_MARKER}\n{reponse}\n")
+
+
+def bench(fichiers):
+    echanges = [
+        (f"{n}-{i}", q, r)
+        for n, fichier in enumerate(fichiers)
+        for i, (q, r) in enumerate(parse_chat_file(fichier))
+    ]
+    brut = sum(len(q.encode()) + len(r.encode()) for _, q, r in echanges)
+
+    lignes = [
+        "| Compression | Durée (s) | Mo/s | Taille (Mo) | Ratio |",
+        "|---|---:|---:|---:|---:|",
+    ]
+    with tempfile.TemporaryDirectory() as dossier:
+        for compression in choices():
+            chemin = os.path.join(dossier, f"bench{compression.extension}")
+            debut = time.perf_counter()
+            with open_archive_writer(chemin, compression) as writer:
+                for index, q, r in echanges:
+                    writer.write(f"{index}.md", q, r)
+            duree = time.perf_counter() - debut
+            taille = os.path.getsize(chemin)
+            lignes.append(
+                f"| {compression} | {duree:.2f} | {brut / duree / 2**20:.1f} "
+                f"| {taille / 2**20:.2f} | {taille / brut:.1%} |"
+            )
+            os.remove(chemin)
+    print(f"{len(echanges)} échanges, {brut / 2**20:.1f} Mo de texte\n")
+    print("\n".join(lignes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fichiers", nargs="*", help="exports .txt à archiver")
+    parser.add_argument(
+        "--synthetic", type=int, metavar="MO", help="génère un export de MO Mo"
+    )
+    args = parser.parse_args()
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as dossier:
+            chemin = os.path.join(dossier, "synthetique.txt")
+            synthetic_export(chemin, args.synthetic)
+            bench([chemin])
+    elif args.fichiers:
+        bench(args.fichiers)
+    else:
+        parser.error("indiquez des fichiers ou --synthetic MO")
+
+
+if __name__ == "__main__":
+    main()